@@ -0,0 +1,66 @@
+"""Local stand-in for the OpenAI embeddings endpoint, with a fixed response delay.
+
+Vectors are derived from a hash of the text, so the same text always embeds the same way and
+the bench can build a local index from the catalog that the fake query embeddings search.
+"""
+import json
+import time
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+DIMENSIONS = 1536
+
+
+# Function to make a deterministic pseudo-embedding for a text
+def fake_embedding(text):
+    seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "big")
+    vector = np.random.default_rng(seed).standard_normal(DIMENSIONS).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class FakeEmbeddingsServer:
+    """Answers POST /v1/embeddings after latency seconds; set OPENAI_API_BASE to api_base to use it."""
+
+    def __init__(self, latency=0.25, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                texts = body.get("input", [])
+                texts = [texts] if isinstance(texts, str) else texts
+                server.requests += 1
+                time.sleep(server.latency)
+                payload = json.dumps({
+                    "object": "list",
+                    "model": body.get("model"),
+                    "data": [{"object": "embedding", "index": i, "embedding": fake_embedding(text).tolist()}
+                             for i, text in enumerate(texts)],
+                    "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.api_base = f"http://{host}:{self.httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,156 @@
+import json
+import time
+import asyncio
+import itertools
+import websockets
+
+from bench.frames import FRAME_SECONDS, stamp_frame, frame_age_ms
+
+# Transcription models that stream partial transcripts; anything else (whisper-1) sends the whole text at the end
+STREAMING_TRANSCRIPTION_MODELS = ("gpt-4o-transcribe", "gpt-4o-mini-transcribe")
+
+
+class Script:
+    """What the fake Realtime server does on every connection."""
+
+    def __init__(self, response_frames=50, turn_interval=4.0, transcript="what is the interest rate for a fixed loan",
+                 barge_in_every=3, transcription_ms=600):
+        self.response_frames = response_frames    # audio deltas per response (20 ms each)
+        self.turn_interval = turn_interval        # seconds between simulated caller turns
+        self.transcript = transcript              # caller text; each turn appends a case number so answers aren't cached
+        self.barge_in_every = barge_in_every      # every Nth turn starts while a response is still playing (0 = never)
+        self.transcription_ms = transcription_ms  # from speech_stopped to transcription.completed
+
+
+class FakeRealtimeServer:
+    """Local stand-in for the OpenAI Realtime WebSocket API, driven by a Script."""
+
+    def __init__(self, script, host="127.0.0.1", port=0):
+        self.script = script
+        self.host = host
+        self.port = port
+        self.server = None
+        self.connections = 0
+        self.inbound_latency_ms = []
+        self.appends = 0
+        self.truncates = 0
+        self._ids = itertools.count(1)
+
+    async def start(self):
+        self.server = await websockets.serve(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def handle(self, ws):
+        self.connections += 1
+        response_task = None
+        transcription_model = "whisper-1"
+
+        async def send(event):
+            event.setdefault("event_id", f"event_{next(self._ids)}")
+            await ws.send(json.dumps(event))
+
+        async def respond():
+            response_id = f"resp_{next(self._ids)}"
+            item_id = f"item_{next(self._ids)}"
+            started = time.monotonic()
+            for i in range(self.script.response_frames):
+                await send({
+                    "type": "response.audio.delta",
+                    "response_id": response_id,
+                    "item_id": item_id,
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": stamp_frame()
+                })
+                # Pace the deltas at real time
+                await asyncio.sleep(max(0.0, started + (i + 1) * FRAME_SECONDS - time.monotonic()))
+            await send({
+                "type": "response.done",
+                "response": {
+                    "id": response_id,
+                    "output": [{
+                        "id": item_id,
+                        "type": "message",
+                        "role": "assistant",
+                        "content": [{"type": "audio", "transcript": "This is a scripted answer."}]
+                    }]
+                }
+            })
+
+        def start_response():
+            nonlocal response_task
+            if response_task is not None:
+                response_task.cancel()
+            response_task = asyncio.create_task(respond())
+
+        async def caller_turns():
+            for turn in itertools.count(1):
+                await asyncio.sleep(self.script.turn_interval)
+                barge_in = self.script.barge_in_every and turn % self.script.barge_in_every == 0
+                if response_task is not None and not response_task.done() and not barge_in:
+                    continue
+                await send({"type": "input_audio_buffer.speech_started", "audio_start_ms": 0, "item_id": f"item_{next(self._ids)}"})
+                if response_task is not None:
+                    response_task.cancel()
+                await asyncio.sleep(0.5)
+                await send({"type": "input_audio_buffer.speech_stopped", "audio_end_ms": 500})
+                item_id = f"item_{next(self._ids)}"
+                text = f"{self.script.transcript} case {next(self._ids)}"
+                window = self.script.transcription_ms / 1000
+                if transcription_model in STREAMING_TRANSCRIPTION_MODELS:
+                    words = text.split(" ")
+                    for i, word in enumerate(words):
+                        await asyncio.sleep(window / len(words))
+                        await send({
+                            "type": "conversation.item.input_audio_transcription.delta",
+                            "item_id": item_id,
+                            "content_index": 0,
+                            "delta": word if i == 0 else f" {word}"
+                        })
+                else:
+                    await asyncio.sleep(window)
+                    await send({
+                        "type": "conversation.item.input_audio_transcription.delta",
+                        "item_id": item_id,
+                        "content_index": 0,
+                        "delta": text
+                    })
+                await send({
+                    "type": "conversation.item.input_audio_transcription.completed",
+                    "item_id": item_id,
+                    "content_index": 0,
+                    "transcript": text
+                })
+
+        turns_task = asyncio.create_task(caller_turns())
+        try:
+            await send({"type": "session.created", "session": {}})
+            async for message in ws:
+                event = json.loads(message)
+                if event["type"] == "session.update":
+                    transcription = event["session"].get("input_audio_transcription") or {}
+                    transcription_model = transcription.get("model", transcription_model)
+                elif event["type"] == "input_audio_buffer.append":
+                    self.appends += 1
+                    self.inbound_latency_ms.append(frame_age_ms(event["audio"]))
+                elif event["type"] == "response.create":
+                    start_response()
+                elif event["type"] == "conversation.item.truncate":
+                    self.truncates += 1
+                    if response_task is not None:
+                        response_task.cancel()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            turns_task.cancel()
+            if response_task is not None:
+                response_task.cancel()
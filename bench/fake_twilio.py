@@ -0,0 +1,107 @@
+import json
+import time
+import base64
+import asyncio
+import itertools
+import websockets
+
+from bench.frames import FRAME_SECONDS, ULAW_SILENCE, FRAME_BYTES, stamp_frame, frame_age_ms
+
+
+class CallStats:
+    """Counters shared by every fake call in a run."""
+
+    def __init__(self):
+        self.outbound_latency_ms = []
+        self.frames_sent = 0
+        self.frames_received = 0
+        self.marks = 0
+        self.clears = 0
+        self.errors = 0
+        self.completed = 0
+
+
+class FakeTwilioCall:
+    """Plays the Twilio side of a media stream: replays u-law frames at real-time pacing and echoes marks."""
+
+    def __init__(self, url, call_sid, duration, frames=None):
+        self.url = url
+        self.call_sid = call_sid
+        self.stream_sid = f"MZ{call_sid[2:]}"
+        self.duration = duration
+        self.frames = frames or [ULAW_SILENCE * FRAME_BYTES]
+
+    def _event(self, sequence, event, **fields):
+        # Same field order as Twilio so the server's fast path sees realistic frames
+        return json.dumps({"event": event, "sequenceNumber": str(sequence), **fields, "streamSid": self.stream_sid}, separators=(",", ":"))
+
+    async def run(self, stats):
+        sequence = itertools.count(1)
+        try:
+            async with websockets.connect(self.url, extra_headers={"x-twilio-call-sid": self.call_sid}) as ws:
+                await ws.send(json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"}))
+                await ws.send(self._event(next(sequence), "start", start={
+                    "streamSid": self.stream_sid,
+                    "callSid": self.call_sid,
+                    "tracks": ["inbound"],
+                    "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": 8000, "channels": 1}
+                }))
+                receiver = asyncio.create_task(self._receive(ws, stats, sequence))
+
+                started = time.monotonic()
+                total_frames = int(self.duration / FRAME_SECONDS)
+                for chunk in range(total_frames):
+                    frame = self.frames[chunk % len(self.frames)]
+                    await ws.send(self._event(next(sequence), "media", media={
+                        "track": "inbound",
+                        "chunk": str(chunk + 1),
+                        "timestamp": str(chunk * 20),
+                        "payload": stamp_frame(frame)
+                    }))
+                    stats.frames_sent += 1
+                    await asyncio.sleep(max(0.0, started + (chunk + 1) * FRAME_SECONDS - time.monotonic()))
+
+                await ws.send(self._event(next(sequence), "stop", stop={"callSid": self.call_sid}))
+                receiver.cancel()
+            stats.completed += 1
+        except Exception as e:
+            stats.errors += 1
+            print(f"Call {self.call_sid} failed: {e}")
+
+    async def _receive(self, ws, stats, sequence):
+        # Outbound audio "plays" in real time: a mark is echoed once the audio queued before it has played
+        playback_end = time.monotonic()
+        pending_marks = {}
+
+        async def echo(mark, delay):
+            await asyncio.sleep(delay)
+            await ws.send(self._event(next(sequence), "mark", mark=mark))
+            pending_marks.pop(mark["name"], None)
+
+        try:
+            async for message in ws:
+                event = json.loads(message)
+                if event["event"] == "media":
+                    now = time.monotonic()
+                    playback_end = max(now, playback_end) + len(base64.b64decode(event["media"]["payload"])) / (FRAME_BYTES / FRAME_SECONDS)
+                    stats.frames_received += 1
+                    age = frame_age_ms(event["media"]["payload"])
+                    # Pre-rendered audio (e.g. the canned greeting) isn't stamped by the fake OpenAI server
+                    if age >= 0:
+                        stats.outbound_latency_ms.append(age)
+                elif event["event"] == "mark":
+                    stats.marks += 1
+                    delay = max(0.0, playback_end - time.monotonic())
+                    pending_marks[event["mark"]["name"]] = (event["mark"], asyncio.create_task(echo(event["mark"], delay)))
+                elif event["event"] == "clear":
+                    stats.clears += 1
+                    # Twilio stops playback and echoes every outstanding mark right away
+                    playback_end = time.monotonic()
+                    for mark, task in list(pending_marks.values()):
+                        task.cancel()
+                        await ws.send(self._event(next(sequence), "mark", mark=mark))
+                    pending_marks.clear()
+        finally:
+            # Marks still "playing" when the call ends or the socket closes are never echoed
+            for _, task in pending_marks.values():
+                task.cancel()
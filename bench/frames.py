@@ -0,0 +1,44 @@
+import time
+import base64
+import struct
+import numpy as np
+
+FRAME_BYTES = 160  # 20 ms of 8 kHz g711 u-law
+FRAME_SECONDS = 0.02
+ULAW_SILENCE = b"\xff"
+
+
+def stamp_frame(frame=None):
+    """Returns a base64 frame whose first 8 bytes carry the send time, for end-to-end latency."""
+    frame = frame or ULAW_SILENCE * FRAME_BYTES
+    return base64.b64encode(struct.pack(">Q", time.monotonic_ns()) + frame[8:]).decode("ascii")
+
+
+def frame_age_ms(payload):
+    """Milliseconds since a frame built by stamp_frame was sent."""
+    sent = struct.unpack(">Q", base64.b64decode(payload)[:8])[0]
+    return (time.monotonic_ns() - sent) / 1e6
+
+
+def load_ulaw_frames(path):
+    """Splits a raw 8 kHz u-law recording into 20 ms frames (the last partial frame is dropped)."""
+    with open(path, "rb") as file:
+        data = file.read()
+    return [data[i:i + FRAME_BYTES] for i in range(0, len(data) - FRAME_BYTES + 1, FRAME_BYTES)]
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def encode_ulaw(samples):
+    """Encodes 16-bit PCM samples (any int array) as G.711 u-law bytes."""
+    pcm = np.clip(np.asarray(samples, dtype=np.int32), -32635, 32635)
+    sign = (pcm < 0).astype(np.int32) << 7
+    magnitude = np.abs(pcm) + 0x84
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
@@ -0,0 +1,214 @@
+"""Concurrent-call load benchmark for the /media-stream relay.
+
+Runs the FastAPI app in a background thread, points it at a local fake Realtime
+server and ramps up fake Twilio calls against it:
+
+    python -m bench.load_test --calls 100 --ramp 10 --duration 20
+
+No network access or real credentials are needed.
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import resource
+import tempfile
+import threading
+import contextlib
+
+from bench.fake_openai import FakeRealtimeServer, Script
+from bench.fake_embeddings import FakeEmbeddingsServer, fake_embedding
+from bench.fake_twilio import FakeTwilioCall, CallStats
+from bench.frames import load_ulaw_frames, percentile
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (Linux), falling back to peak RSS."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ServerThread(threading.Thread):
+    """Runs the callbot app under uvicorn on its own event loop and samples that loop's lag."""
+
+    def __init__(self, port, lag_interval=0.01):
+        super().__init__(daemon=True)
+        self.port = port
+        self.lag_interval = lag_interval
+        self.lag_ms = []
+        self.cpu_seconds = 0.0
+        self.server = None
+
+    def run(self):
+        import uvicorn
+        import main as callbot
+
+        logging.getLogger().setLevel(logging.WARNING)
+        # Don't let a handler that never returns keep the run from finishing
+        config = uvicorn.Config(callbot.app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="on",
+                                timeout_graceful_shutdown=5)
+        self.server = uvicorn.Server(config)
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        lag_task = asyncio.create_task(self._monitor_lag())
+        try:
+            await self.server.serve()
+        finally:
+            lag_task.cancel()
+
+    async def _monitor_lag(self):
+        # thread_time() here is the CPU used by the server's event-loop thread so far
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            self.lag_ms.append((time.perf_counter() - start - self.lag_interval) * 1000)
+            self.cpu_seconds = time.thread_time()
+
+    def wait_started(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while not (self.server and self.server.started):
+            if time.monotonic() > deadline or not self.is_alive():
+                raise RuntimeError("callbot server did not start")
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.join(timeout=10)
+
+
+async def run_calls(args, server_port, stats):
+    frames = load_ulaw_frames(args.audio) if args.audio else None
+    url = f"ws://127.0.0.1:{server_port}/media-stream"
+    delay = args.ramp / args.calls if args.calls else 0
+    tasks = []
+    for i in range(args.calls):
+        call = FakeTwilioCall(url, f"CA{i:032d}", args.duration, frames)
+        tasks.append(asyncio.create_task(call.run(stats)))
+        await asyncio.sleep(delay)
+    await asyncio.gather(*tasks)
+
+
+def build_local_index(path, catalog):
+    """Local vector index of the catalog, embedded the way the fake embeddings server embeds queries."""
+    import numpy as np
+    from local_index import LocalVectorIndex
+
+    with open(catalog, "r") as file:
+        lines = [line.strip() for line in file if line.strip()]
+    vectors = np.vstack([fake_embedding(line) for line in lines])
+    LocalVectorIndex.build([f"product_{i}" for i in range(len(lines))], vectors,
+                           [{"product_info": line} for line in lines]).save(path)
+
+
+def summarize_turns(stages, counters):
+    """Turn latency means from the app's own histograms (their percentiles are bucket bounds)."""
+    parts = [f"{name}={stages[name].sum / stages[name].count:.0f}ms" for name in
+             ("transcription", "embedding", "retrieval", "turn_total") if stages[name].count]
+    return (f"turns={stages['turn_total'].count} mean " + " ".join(parts) +
+            f" speculative used={counters.get('speculative_used', 0)} discarded={counters.get('speculative_discarded', 0)}")
+
+
+def summarize(name, samples):
+    return (f"{name:<24} n={len(samples):<8} p50={percentile(samples, 50):7.2f}ms "
+            f"p90={percentile(samples, 90):7.2f}ms p99={percentile(samples, 99):7.2f}ms "
+            f"max={max(samples, default=0.0):7.2f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20, help="number of concurrent calls to ramp up to")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which calls are started")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds each call streams audio")
+    parser.add_argument("--audio", help="raw 8 kHz u-law file to replay instead of silence")
+    parser.add_argument("--response-frames", type=int, default=50, help="audio deltas per scripted response")
+    parser.add_argument("--turn-interval", type=float, default=4.0, help="seconds between scripted caller turns")
+    parser.add_argument("--transcription-ms", type=int, default=600, help="scripted speech_stopped -> transcription.completed time")
+    parser.add_argument("--embedding-ms", type=int, default=250, help="fake embeddings endpoint response time")
+    parser.add_argument("--verbose", action="store_true", help="keep the server's per-event output")
+    args = parser.parse_args(argv)
+
+    async def start_fake_openai():
+        script = Script(args.response_frames, args.turn_interval, transcription_ms=args.transcription_ms)
+        return await FakeRealtimeServer(script).start()
+
+    loop = asyncio.new_event_loop()
+    fake_openai = loop.run_until_complete(start_fake_openai())
+
+    # main.py reads its configuration at import time, so set it before the server thread imports it
+    os.environ["OPENAI_REALTIME_URL"] = fake_openai.url
+    for key in ("OPENAI_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "PINECONE_API_KEY"):
+        os.environ.setdefault(key, "bench")
+    os.environ.setdefault("HOSTNAME", "https://bench.invalid")
+    os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+    os.environ.setdefault("RETRIEVAL_TIMEOUT", "0.5")
+    # Everything the app writes (call rows, sessions, canned audio) goes to a throwaway directory, not the repo
+    workdir = tempfile.TemporaryDirectory(prefix="callbot-bench-")
+    os.environ.setdefault("CALL_DB_PATH", os.path.join(workdir.name, "callbot.db"))
+    os.environ.setdefault("SESSION_DB_PATH", os.path.join(workdir.name, "sessions.db"))
+    os.environ.setdefault("CANNED_AUDIO_DIR", os.path.join(workdir.name, "canned_audio"))
+    # Query embeddings come from a local fake and are searched in a throwaway local index of the catalog
+    fake_embeddings = FakeEmbeddingsServer(args.embedding_ms / 1000).start()
+    os.environ["OPENAI_API_BASE"] = fake_embeddings.api_base
+    os.environ.setdefault("LOCAL_INDEX_PATH", os.path.join(workdir.name, "product_index"))
+    build_local_index(os.environ["LOCAL_INDEX_PATH"], os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "product_info.txt"))
+
+    stats = CallStats()
+    server_port = free_port()
+    server = ServerThread(server_port)
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    with output:
+        server.start()
+        server.wait_started()
+        # Baselines are taken once the app is imported and started, so they only cover the calls
+        rss_before = rss_mb()
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        cpu_before = server.cpu_seconds
+        started = time.monotonic()
+        loop.run_until_complete(run_calls(args, server_port, stats))
+        rss_after = rss_mb()
+        elapsed = time.monotonic() - started
+        server_cpu = server.cpu_seconds - cpu_before
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+        # Keep the fake OpenAI loop running while the server shuts down so it can answer the close handshakes
+        loop.run_until_complete(asyncio.to_thread(server.stop))
+        loop.run_until_complete(fake_openai.stop())
+    loop.close()
+    fake_embeddings.stop()
+    workdir.cleanup()
+    callbot = sys.modules["main"]
+
+    process_cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    calls = max(args.calls, 1)
+
+    print(f"calls={args.calls} completed={stats.completed} errors={stats.errors} wall={elapsed:.1f}s "
+          f"fast_relay={os.getenv('FAST_RELAY', 'true')}")
+    print(f"frames: twilio->server={stats.frames_sent} server->openai={fake_openai.appends} "
+          f"openai->twilio={stats.frames_received} marks={stats.marks} clears={stats.clears} truncates={fake_openai.truncates}")
+    print(summarize("relay twilio->openai", fake_openai.inbound_latency_ms))
+    print(summarize("relay openai->twilio", stats.outbound_latency_ms))
+    print(summarize("server event-loop lag", server.lag_ms))
+    print(summarize_turns(callbot.metrics.stages, callbot.metrics.counters) +
+          f" transcription_model={callbot.TRANSCRIPTION_MODEL}")
+    print(f"server loop CPU: {server_cpu:.2f}s total, {server_cpu / calls * 1000:.1f}ms/call, "
+          f"{server_cpu / elapsed * 100:.1f}% of one core")
+    print(f"process CPU (incl. fake peers): {process_cpu:.2f}s, {process_cpu / calls * 1000:.1f}ms/call")
+    print(f"RSS: {rss_before:.1f}MB -> {rss_after:.1f}MB, {(rss_after - rss_before) / calls * 1024:.0f}KB/call")
+    return 0 if stats.errors == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
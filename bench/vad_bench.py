@@ -0,0 +1,108 @@
+"""Measure the local VAD's barge-in delay, false triggers and per-frame cost on recorded or synthetic frames.
+
+    python -m bench.vad_bench                                   # synthetic call audio with known speech onsets
+    python -m bench.vad_bench --audio call.ulaw --onsets 1.2,4.8   # a raw 8 kHz u-law recording
+"""
+import sys
+import time
+import base64
+import argparse
+import numpy as np
+
+from bench.frames import FRAME_BYTES, encode_ulaw, load_ulaw_frames, percentile
+from vad import LocalVAD, FRAME_MS
+
+SAMPLE_RATE = 8000
+
+
+def synthetic_call(seconds=30.0, seed=7):
+    """Line noise with speech-like bursts plus hiss and click distractors; returns (u-law bytes, onset times)."""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    signal = rng.normal(0, 32768 * 10 ** (-50 / 20), total)
+    onsets = []
+    t = 1.0
+    while t < seconds - 2:
+        kind = rng.choice(["speech", "speech", "hiss", "click"])
+        start = int(t * SAMPLE_RATE)
+        if kind == "speech":
+            length = int(rng.uniform(0.4, 1.5) * SAMPLE_RATE)
+            n = np.arange(length) / SAMPLE_RATE
+            f0 = rng.uniform(110, 220)
+            voiced = sum(np.sin(2 * np.pi * f0 * h * n) / h for h in range(1, 8))
+            envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * n)
+            level = 32768 * 10 ** (rng.uniform(-24, -14) / 20)
+            signal[start:start + length] += level * envelope * voiced / np.max(np.abs(voiced))
+            onsets.append(t)
+        elif kind == "hiss":
+            length = int(0.5 * SAMPLE_RATE)
+            signal[start:start + length] += rng.normal(0, 32768 * 10 ** (-25 / 20), length)
+        else:
+            length = int(0.01 * SAMPLE_RATE)
+            signal[start:start + length] += 32768 * 10 ** (-12 / 20) * rng.choice([-1, 1], length)
+        t += rng.uniform(1.5, 3.0)
+    return encode_ulaw(signal), onsets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audio", help="raw 8 kHz u-law recording (default: synthetic)")
+    parser.add_argument("--onsets", help="comma-separated speech onset times in seconds, for delay and miss counts")
+    parser.add_argument("--seconds", type=float, default=30.0, help="length of the synthetic recording")
+    parser.add_argument("--threshold-db", type=float, default=-30.0)
+    parser.add_argument("--hysteresis-db", type=float, default=6.0)
+    parser.add_argument("--zcr-max", type=float, default=0.4)
+    parser.add_argument("--start-ms", type=int, default=60)
+    parser.add_argument("--stop-ms", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    if args.audio:
+        frames = load_ulaw_frames(args.audio)
+        onsets = [float(value) for value in args.onsets.split(",")] if args.onsets else []
+    else:
+        audio, onsets = synthetic_call(args.seconds)
+        frames = [audio[i:i + FRAME_BYTES] for i in range(0, len(audio) - FRAME_BYTES + 1, FRAME_BYTES)]
+
+    def make_vad():
+        return LocalVAD(args.threshold_db, args.hysteresis_db, args.zcr_max, args.start_ms, args.stop_ms)
+
+    # Per-frame path, exactly as receive_from_twilio calls it
+    payloads = [base64.b64encode(frame).decode("ascii") for frame in frames]
+    vad = make_vad()
+    timings, events = [], []
+    for index, payload in enumerate(payloads):
+        started = time.perf_counter()
+        event = vad.process(payload)
+        timings.append((time.perf_counter() - started) * 1e6)
+        if event:
+            events.append((index, event))
+
+    # Batch path: features for the whole recording in one vectorized pass
+    started = time.perf_counter()
+    batch_events = make_vad().detect(np.frombuffer(b"".join(frames), dtype=np.uint8).reshape(len(frames), FRAME_BYTES))
+    batch_us = (time.perf_counter() - started) * 1e6 / max(len(frames), 1)
+
+    starts = [index * FRAME_MS / 1000 for index, event in events if event == "start"]
+    delays, missed, matched = [], 0, set()
+    for onset in onsets:
+        hits = [start for start in starts if onset <= start <= onset + 1.0]
+        if hits:
+            delays.append((hits[0] - onset) * 1000 + FRAME_MS)
+            matched.add(hits[0])
+        else:
+            missed += 1
+    false_starts = len([start for start in starts if start not in matched]) if onsets else None
+
+    print(f"frames={len(frames)} ({len(frames) * FRAME_MS / 1000:.1f}s) starts={len(starts)} "
+          f"stops={sum(1 for _, event in events if event == 'stop')} batch_matches={batch_events == events}")
+    if onsets:
+        print(f"onsets={len(onsets)} detected={len(delays)} missed={missed} false_starts={false_starts}")
+        print(f"barge-in delay           p50={percentile(delays, 50):7.1f}ms p90={percentile(delays, 90):7.1f}ms "
+              f"max={max(delays, default=0.0):7.1f}ms")
+    print(f"per-frame process()      p50={percentile(timings, 50):7.1f}us p99={percentile(timings, 99):7.1f}us")
+    print(f"batch detect()           {batch_us:7.1f}us/frame")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from schema import CALL_DETAILS_COLUMNS, migrate
+
+# Everything but the columns SQLite fills in itself
+INSERT_COLUMNS = tuple(column for column in CALL_DETAILS_COLUMNS if column not in ("id", "created_at"))
+
+
+class CallDetailsWriter:
+    """Writes call_details rows from an asyncio queue in batches over one long-lived WAL connection."""
+
+    def __init__(self, path, batch_size=100, flush_interval=1.0, max_queue=100000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.written = 0
+        self.failed = 0
+        self._queue = None
+        self._task = None
+        self._conn = None
+        # sqlite3 connections belong to the thread that made them, so every DB call goes through this one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="call-writer")
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        await self._run_in_thread(self._connect)
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, record):
+        """Queue a call_details record; returns as soon as it is queued."""
+        await self._queue.put(record)
+
+    async def stop(self):
+        """Flush everything still queued, then close the connection."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        await self._run_in_thread(self._conn.close)
+        self._executor.shutdown(wait=True)
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "failed": self.failed,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            record = await self._queue.get()
+            if record is None:
+                break
+            batch = [record]
+            # Keep collecting until the batch is full or flush_interval has passed since the first record
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        try:
+            await self._run_in_thread(self._insert, batch)
+            self.written += len(batch)
+            logging.info("Inserted %d rows into call_details table", len(batch))
+        except Exception as e:
+            self.failed += len(batch)
+            logging.error("Error inserting %d rows into database: %s", len(batch), str(e))
+
+    async def _run_in_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        applied = migrate(self._conn)
+        if applied:
+            logging.info("Migrated %s: %s", self.path, "; ".join(applied))
+
+    def _insert(self, batch):
+        rows = [tuple(record.get(column) for column in INSERT_COLUMNS) for record in batch]
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO call_details ({', '.join(INSERT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in INSERT_COLUMNS)})",
+                rows
+            )
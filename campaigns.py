@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+import time
+import uuid
+import asyncio
+import logging
+
+
+# Function to parse an uploaded lead list
+def parse_leads(body, content_type=""):
+    """Parses CSV (with a header row containing to,name) or JSONL into a list of {to, name} dicts."""
+    text = body.decode("utf-8-sig") if isinstance(body, bytes) else body
+    stripped = text.lstrip()
+    if "json" in content_type or stripped.startswith("{"):
+        leads = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        leads = list(csv.DictReader(io.StringIO(text)))
+
+    parsed = []
+    for number, lead in enumerate(leads, start=1):
+        to = (lead.get("to") or "").strip()
+        name = (lead.get("name") or "").strip()
+        if not to or not name:
+            raise ValueError(f"Lead {number} is missing 'to' or 'name'.")
+        parsed.append({"to": to, "name": name})
+    return parsed
+
+
+class RateLimiter:
+    """Spaces acquisitions at least 1/rate seconds apart across all callers."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class Campaign:
+    """Progress of one bulk dialing run."""
+
+    MAX_ERRORS = 100
+
+    def __init__(self, leads, calls_per_second, concurrency, variant=None):
+        self.id = uuid.uuid4().hex
+        self.leads = leads
+        self.calls_per_second = calls_per_second
+        self.concurrency = concurrency
+        self.variant = variant
+        self.status = "running"
+        self.created = time.time()
+        self.finished = None
+        self.placed = 0
+        self.failed = 0
+        self.retries = 0
+        self.call_sids = []
+        self.errors = []
+        self.task = None
+
+    def record_error(self, lead, error):
+        self.failed += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append({"to": lead["to"], "error": str(error)})
+
+    def progress(self):
+        done = self.placed + self.failed
+        return {
+            "campaign_id": self.id,
+            "status": self.status,
+            "total": len(self.leads),
+            "placed": self.placed,
+            "failed": self.failed,
+            "pending": len(self.leads) - done,
+            "retries": self.retries,
+            "calls_per_second": self.calls_per_second,
+            "concurrency": self.concurrency,
+            "variant": self.variant,
+            "created": self.created,
+            "finished": self.finished,
+            "errors": self.errors,
+        }
+
+
+# Twilio errors worth retrying: throttling and server-side failures, which Twilio answers without creating the call.
+# Anything without a status (e.g. a read timeout) may have created it, so retrying could dial the lead twice.
+def is_retryable(error):
+    status = getattr(error, "status", None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+class CampaignDialer:
+    """Dispatches campaign calls through place_call with bounded concurrency, a calls-per-second limit and retries."""
+
+    def __init__(self, place_call, max_attempts=3, backoff=1.0, max_campaigns=100):
+        self.place_call = place_call
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_campaigns = max_campaigns
+        self.campaigns = {}
+
+    def start(self, leads, calls_per_second=1.0, concurrency=10, variant=None):
+        campaign = Campaign(leads, calls_per_second, concurrency, variant)
+        self.campaigns[campaign.id] = campaign
+        self._forget_finished()
+        campaign.task = asyncio.create_task(self._run(campaign))
+        return campaign
+
+    def get(self, campaign_id):
+        return self.campaigns.get(campaign_id)
+
+    def cancel(self, campaign_id):
+        campaign = self.campaigns.get(campaign_id)
+        if campaign is not None and campaign.task is not None and not campaign.task.done():
+            campaign.task.cancel()
+        return campaign
+
+    async def _run(self, campaign):
+        limiter = RateLimiter(campaign.calls_per_second)
+
+        async def dial(lead):
+            for attempt in range(1, self.max_attempts + 1):
+                await limiter.acquire()
+                try:
+                    call_sid = await self.place_call(lead["to"], lead["name"], campaign.variant)
+                    campaign.placed += 1
+                    campaign.call_sids.append(call_sid)
+                    return
+                except Exception as e:
+                    if attempt == self.max_attempts or not is_retryable(e):
+                        logging.error("Campaign %s: failed to call %s: %s", campaign.id, lead["to"], e)
+                        campaign.record_error(lead, e)
+                        return
+                    campaign.retries += 1
+                    await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+        # `concurrency` workers pull leads from one shared iterator, which bounds the calls in flight
+        leads = iter(campaign.leads)
+
+        async def worker():
+            for lead in leads:
+                await dial(lead)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(campaign.concurrency)))
+            campaign.status = "completed"
+        except asyncio.CancelledError:
+            campaign.status = "cancelled"
+        finally:
+            campaign.finished = time.time()
+            logging.info("Campaign %s %s: %d placed, %d failed", campaign.id, campaign.status, campaign.placed, campaign.failed)
+
+    def _forget_finished(self):
+        # Keep progress for the most recent campaigns only
+        finished = [c for c in self.campaigns.values() if c.finished is not None]
+        for campaign in sorted(finished, key=lambda c: c.finished)[:max(0, len(self.campaigns) - self.max_campaigns)]:
+            del self.campaigns[campaign.id]
@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import base64
+import asyncio
+import logging
+import argparse
+import websockets
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Fixed things the assistant says; main.py uses these texts so the audio and the conversation stay in sync
+UTTERANCES = {
+    "greeting": os.getenv('GREETING_TEXT', "Hello there! I am an AI voice assistant powered by Twilio and the OpenAI Realtime API. I will ask you a few questions to assist our loan officer. Are you interested in a home loan?"),
+    "no_results": "No results found in Pinecone for your query.",
+    "error": "Sorry, there was an error processing your request.",
+}
+CANNED_AUDIO_DIR = os.getenv('CANNED_AUDIO_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'canned_audio'))
+MANIFEST_NAME = 'manifest.json'
+
+FRAME_BYTES = 160  # 20 ms of 8 kHz g711 u-law
+ULAW_SILENCE = b"\xff"
+
+
+# Function to split raw u-law audio into base64 Twilio media payloads
+def to_frames(audio):
+    """20 ms base64 frames; the last one is padded with silence."""
+    frames = []
+    for start in range(0, len(audio), FRAME_BYTES):
+        frame = audio[start:start + FRAME_BYTES]
+        frame += ULAW_SILENCE * (FRAME_BYTES - len(frame))
+        frames.append(base64.b64encode(frame).decode("ascii"))
+    return frames
+
+
+class CannedAudio:
+    """Pre-rendered 20 ms frames for the fixed utterances, ready to send to Twilio as-is."""
+
+    def __init__(self, frames=None):
+        self._frames = frames or {}
+
+    def __contains__(self, name):
+        return name in self._frames
+
+    def __len__(self):
+        return len(self._frames)
+
+    def frames(self, name):
+        return self._frames.get(name)
+
+    @classmethod
+    def load(cls, directory, utterances, voice):
+        """Load the audio built for these exact texts and voice; stale or missing entries are skipped."""
+        path = os.path.join(directory, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r") as file:
+            manifest = json.load(file)
+
+        frames = {}
+        for name, text in utterances.items():
+            entry = manifest.get(name)
+            if entry is None:
+                continue
+            if entry.get("text") != text or entry.get("voice") != voice:
+                logging.warning("Canned audio for '%s' was built for a different text or voice; rebuild it with `python canned_audio.py`", name)
+                continue
+            with open(os.path.join(directory, entry["file"]), "rb") as file:
+                frames[name] = to_frames(file.read())
+        return cls(frames)
+
+
+class FileSynthesizer:
+    """Stand-in synthesizer that reads `<name>.ulaw` (raw 8 kHz u-law) from a directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    async def synthesize(self, name, text):
+        with open(os.path.join(self.directory, f"{name}.ulaw"), "rb") as file:
+            return file.read()
+
+
+class RealtimeSynthesizer:
+    """Has the Realtime model read a text aloud and returns its g711 u-law audio."""
+
+    def __init__(self, url, api_key, voice):
+        self.url = url
+        self.api_key = api_key
+        self.voice = voice
+
+    async def synthesize(self, name, text):
+        async with websockets.connect(
+            self.url,
+            extra_headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "OpenAI-Beta": "realtime=v1"
+            }
+        ) as ws:
+            await ws.send(json.dumps({
+                "type": "session.update",
+                "session": {
+                    "turn_detection": None,
+                    "output_audio_format": "g711_ulaw",
+                    "voice": self.voice,
+                    "instructions": "Read the user's message aloud exactly as written. Do not add or change anything.",
+                    "modalities": ["text", "audio"],
+                }
+            }))
+            await ws.send(json.dumps({
+                "type": "conversation.item.create",
+                "item": {
+                    "type": "message",
+                    "role": "user",
+                    "content": [{"type": "input_text", "text": text}]
+                }
+            }))
+            await ws.send(json.dumps({"type": "response.create"}))
+
+            audio = bytearray()
+            async for message in ws:
+                event = json.loads(message)
+                if event.get("type") == "response.audio.delta":
+                    audio += base64.b64decode(event["delta"])
+                elif event.get("type") == "response.done":
+                    break
+                elif event.get("type") == "error":
+                    raise RuntimeError(event.get("error"))
+            return bytes(audio)
+
+
+# Function to synthesize the utterances whose audio is missing or out of date and record them in the manifest
+async def build_canned_audio(synthesizer, directory, utterances, voice, force=False):
+    """Returns the names that were (re)built."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            manifest = json.load(file)
+
+    built = []
+    for name, text in utterances.items():
+        entry = manifest.get(name)
+        if not force and entry and entry.get("text") == text and entry.get("voice") == voice \
+                and os.path.exists(os.path.join(directory, entry["file"])):
+            continue
+        audio = await synthesizer.synthesize(name, text)
+        if not audio:
+            raise RuntimeError(f"No audio synthesized for '{name}'.")
+        with open(os.path.join(directory, f"{name}.ulaw"), "wb") as file:
+            file.write(audio)
+        manifest[name] = {"text": text, "voice": voice, "file": f"{name}.ulaw", "ms": len(audio) // 8}
+        built.append(name)
+
+    with open(path, "w") as file:
+        json.dump(manifest, file, indent=2)
+    return built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render the greeting and fallback replies as u-law audio.")
+    parser.add_argument("--out", default=CANNED_AUDIO_DIR, help="directory for the audio files and manifest")
+    parser.add_argument("--voice", default=os.getenv('VOICE', 'alloy'), help="Realtime voice (must match the callbot's)")
+    parser.add_argument("--from-dir", help="copy <name>.ulaw files from this directory instead of calling the API")
+    parser.add_argument("--force", action="store_true", help="rebuild entries that are already up to date")
+    args = parser.parse_args(argv)
+
+    if args.from_dir:
+        synthesizer = FileSynthesizer(args.from_dir)
+    else:
+        synthesizer = RealtimeSynthesizer(
+            os.getenv('OPENAI_REALTIME_URL', 'wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01'),
+            os.getenv('OPENAI_API_KEY'),
+            args.voice
+        )
+    built = asyncio.run(build_canned_audio(synthesizer, args.out, UTTERANCES, args.voice, force=args.force))
+    print(f"Built {len(built)} of {len(UTTERANCES)} utterances in {args.out}: {', '.join(built) or 'all up to date'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import re
+import numpy as np
+
+from extraction import NUMBER_WORD_PATTERN, number_value
+
+NUMERIC_COLUMNS = ("rate", "term_years", "fixed_years", "max_amount", "down_payment")
+
+_NAME = re.compile(r"^\s*([^:]+):")
+_RATE = re.compile(r"interest rate\s*(\d+(?:\.\d+)?)\s*%", re.I)
+_TERM = re.compile(r"(\d+)\s*years?\s*term", re.I)
+_FIXED = re.compile(r"fixed for\s*(\d+)\s*years?", re.I)
+_AMOUNT = re.compile(r"max loan amount\s*\$?\s*([\d,]+)", re.I)
+_DOWN = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*down payment", re.I)
+
+# Caller phrasing -> structured intent
+# Transcripts spell small numbers out ("fifteen years") as often as they use digits
+_YEARS_QUERY = re.compile(r"\b(\d+|" + NUMBER_WORD_PATTERN + r")[\s-]*years?", re.I)
+_MIN_RATE_QUERY = re.compile(r"\b(lowest|cheapest|best|minimum|smallest|low)\b[^.?!]*\b(rate|interest)", re.I)
+_MAX_RATE_QUERY = re.compile(r"\b(highest|maximum|largest)\b[^.?!]*\b(rate|interest)", re.I)
+_MAX_AMOUNT_QUERY = re.compile(r"\b(highest|largest|biggest|maximum|max|most)\b[^.?!]*\b(amount|loan size|borrow)", re.I)
+_MIN_DOWN_QUERY = re.compile(r"\b(lowest|smallest|minimum|low|least)\b[^.?!]*\bdown ?payment", re.I)
+_RATE_BELOW_QUERY = re.compile(r"\b(?:under|below|less than)\s*(\d+(?:\.\d+)?)\s*(?:%|percent)", re.I)
+_RATE_ABOVE_QUERY = re.compile(r"\b(?:over|above|more than)\s*(\d+(?:\.\d+)?)\s*(?:%|percent)", re.I)
+_AMOUNT_AT_LEAST_QUERY = re.compile(r"\b(?:at least|over|above|more than)\s*\$\s*([\d,]+)\s*(k|thousand)?", re.I)
+
+
+def _number(pattern, text, cast=float):
+    match = pattern.search(text)
+    return cast(match.group(1).replace(",", "")) if match else np.nan
+
+
+# Function to split one catalog line into its attributes
+def parse_product_line(line):
+    """Returns the structured attributes of a `Home Loan X: Interest rate R%, ...` line."""
+    name = _NAME.search(line)
+    # Whatever isn't one of the numeric attributes is kept as a free-text flag, e.g. "No prepayment penalty"
+    flags = [
+        part.strip() for part in re.split(r"[,|]", line.split(":", 1)[-1])
+        if part.strip() and not any(p.search(part) for p in (_RATE, _TERM, _FIXED, _AMOUNT, _DOWN))
+    ]
+    return {
+        "name": name.group(1).strip() if name else line,
+        "rate": _number(_RATE, line),
+        "term_years": _number(_TERM, line),
+        "fixed_years": _number(_FIXED, line),
+        "max_amount": _number(_AMOUNT, line),
+        "down_payment": _number(_DOWN, line),
+        "flags": flags,
+    }
+
+
+class ProductCatalog:
+    """Columnar view of the product catalog with a sorted index per numeric column."""
+
+    def __init__(self, ids, lines):
+        self.ids = list(ids)
+        self.lines = list(lines)
+        parsed = [parse_product_line(line) for line in self.lines]
+        self.names = [row["name"] for row in parsed]
+        self.flags = [row["flags"] for row in parsed]
+        self.columns = {column: np.array([row[column] for row in parsed], dtype=np.float64) for column in NUMERIC_COLUMNS}
+        # argsort puts NaN (attribute not listed) last; `present` is how many rows have the attribute
+        self.order = {}
+        self.sorted_values = {}
+        self.present = {}
+        for column, values in self.columns.items():
+            order = np.argsort(values, kind="stable")
+            self.order[column] = order
+            self.sorted_values[column] = values[order]
+            self.present[column] = int(np.count_nonzero(~np.isnan(values)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def range(self, column, low=None, high=None, include_low=True, include_high=True):
+        """Row indices with low <= column <= high (bounds optional), via binary search on the sorted index."""
+        values = self.sorted_values[column][:self.present[column]]
+        start = 0 if low is None else np.searchsorted(values, low, side="left" if include_low else "right")
+        end = len(values) if high is None else np.searchsorted(values, high, side="right" if include_high else "left")
+        return self.order[column][start:end]
+
+    def ranked(self, column, rows=None, descending=False, limit=None):
+        """Row indices ordered by column (rows without the attribute dropped), optionally restricted to rows."""
+        order = self.order[column][:self.present[column]]
+        if descending:
+            order = order[::-1]
+        if rows is not None:
+            mask = np.zeros(len(self.ids), dtype=bool)
+            mask[rows] = True
+            order = order[mask[order]]
+        return order[:limit] if limit is not None else order
+
+    def answer(self, query, top_k=3):
+        """Structured matches for a caller query as `{id, score, metadata}` dicts; [] if the query has no attribute intent."""
+        rows = None
+        sort = None
+
+        def restrict(candidates):
+            nonlocal rows
+            rows = candidates if rows is None else np.intersect1d(rows, candidates)
+
+        years = _YEARS_QUERY.search(query)
+        if years:
+            column = "fixed_years" if re.search(r"\bfixed\b", query, re.I) else "term_years"
+            value = float(number_value(years.group(1)))
+            restrict(self.range(column, value, value))
+        below = _RATE_BELOW_QUERY.search(query)
+        if below:
+            restrict(self.range("rate", high=float(below.group(1)), include_high=False))
+        above = _RATE_ABOVE_QUERY.search(query)
+        if above:
+            restrict(self.range("rate", low=float(above.group(1)), include_low=False))
+        amount = _AMOUNT_AT_LEAST_QUERY.search(query)
+        if amount:
+            value = float(amount.group(1).replace(",", "")) * (1000 if amount.group(2) else 1)
+            restrict(self.range("max_amount", low=value))
+
+        if _MIN_RATE_QUERY.search(query):
+            sort = ("rate", False)
+        elif _MAX_RATE_QUERY.search(query):
+            sort = ("rate", True)
+        elif _MAX_AMOUNT_QUERY.search(query):
+            sort = ("max_amount", True)
+        elif _MIN_DOWN_QUERY.search(query):
+            sort = ("down_payment", False)
+
+        if rows is None and sort is None:
+            return []
+        column, descending = sort or ("rate", False)
+        return [
+            {
+                "id": self.ids[i],
+                "score": 1.0,
+                "metadata": {"product_info": self.lines[i], "source": "catalog"}
+            }
+            for i in self.ranked(column, rows, descending=descending, limit=top_k)
+        ]
+
+
+# Function to combine structured catalog hits with vector search hits
+def merge_results(structured, vector, top_k=5):
+    """Structured hits first, then vector hits that aren't already included, capped at top_k."""
+    seen = set()
+    merged = []
+    for result in list(structured) + list(vector or []):
+        if result["id"] not in seen:
+            seen.add(result["id"])
+            merged.append(result)
+    return merged[:top_k]
@@ -1,15 +1,73 @@
 from pinecone import Pinecone
 import os
+import re
+import json
+import time
+import hashlib
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from dotenv import load_dotenv
 import openai  
+from local_index import LocalVectorIndex, normalize_embeddings
+from catalog import ProductCatalog, merge_results
+from lexical_index import BM25Index, fuse_rankings
+from embedding_cache import EmbeddingCache
+from response_cache import ResponseCache
 
 load_dotenv()
 
 pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
 
 index_name = os.getenv("INDEX_NAME", "callerbotindex")
+
+# Retrieval backend: "local" queries the in-process index and falls back to Pinecone, "pinecone" always goes remote
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "local")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", os.path.join(BASE_DIR, "data", "product_index"))
+_local_index = None
+_catalog = None
+_lexical_index = None
+# Bumped whenever the in-process catalog is rebuilt; see catalog_version()
+_catalog_generation = 0
+# mtime of the local index file the in-process index and catalog were loaded from; a different one on disk means another process re-upserted
+_loaded_index_mtime = None
+_reload_lock = threading.Lock()
+
+# Hybrid retrieval: BM25 over the catalog answers alone when decisive, otherwise it is fused with the vector hits
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+LEXICAL_MIN_SCORE = float(os.getenv("LEXICAL_MIN_SCORE", 2.0))
+
+# Catalog ingestion: texts per embedding request, vectors per upsert request, parallel requests, attempts per request
+CATALOG_PATH = os.getenv("CATALOG_PATH", os.path.join(BASE_DIR, "data", "product_info.txt"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 500))
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", 100))
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", 4))
+INGEST_RETRIES = int(os.getenv("INGEST_RETRIES", 3))
+# Ids last synced to Pinecone, so a re-run only sends what changed
+CATALOG_MANIFEST_PATH = os.getenv("CATALOG_MANIFEST_PATH", os.path.join(BASE_DIR, "data", "catalog_manifest.json"))
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+# Query embedding cache: in-memory LRU backed by SQLite; set EMBEDDING_CACHE_PATH empty to keep it in memory only
+embedding_cache = EmbeddingCache(
+    os.getenv("EMBEDDING_CACHE_PATH", os.path.join(BASE_DIR, "data", "embedding_cache.db")),
+    max_memory_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", 1024)),
+    max_disk_entries=int(os.getenv("EMBEDDING_CACHE_DISK_SIZE", 100000))
+)
 # index_name = pc.Index("callerbotindex")
 
+# Live retrieval runs on its own bounded pool so the media-stream event loop never blocks on it
+RETRIEVAL_TIMEOUT = float(os.getenv("RETRIEVAL_TIMEOUT", 3.0))
+RETRIEVAL_WORKERS = int(os.getenv("RETRIEVAL_WORKERS", 8))
+retrieval_executor = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval")
+
+# Finished answers by normalized query; dropped automatically when the catalog is re-upserted
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", 3600))
+)
+
 # Initialize OpenAI API client
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
@@ -25,81 +83,439 @@ def setup_pinecone():
     except Exception as e:
         print(f"Error while checking index: {e}")
 
+# Function to stream data from the product_info.txt file
+def iter_product_info(file_path=CATALOG_PATH):
+    """Yields one product's info per non-empty line without loading the whole file."""
+    with open(file_path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+
 # Function to read data from the product_info.txt file
-def read_product_info(file_path="/home/rudra/Desktop/callerbot/data/product_info.txt"):
+def read_product_info(file_path=CATALOG_PATH):
     """Reads product information from the provided file."""
     try:
-        with open(file_path, "r") as file:
-            # Each line in the file represents a product's info
-            product_info = [line.strip() for line in file.readlines()]
-        return product_info
+        return list(iter_product_info(file_path))
     except Exception as e:
         print(f"Error reading product info from {file_path}: {e}")
         return []
 
+# Function to call fn, retrying with exponential backoff on failure
+def with_retries(fn, *args, attempts=INGEST_RETRIES, backoff=1.0, **kwargs):
+    """Calls fn until it succeeds or attempts run out, re-raising the last error."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            delay = backoff * 2 ** (attempt - 1)
+            print(f"Attempt {attempt}/{attempts} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
 # Function to generate embeddings for product info using OpenAI
 def generate_embeddings(texts):
-    """Generate embeddings using OpenAI's model."""
+    """Generate embeddings using OpenAI's model, reusing cached ones where possible."""
     try:
         embeddings = []
         for text in texts:
-            response = openai.Embedding.create(  
-                model="text-embedding-ada-002",  
-                input=text
-            )
-            embedding = response.data[0].embedding
-            print(f"Generated Embedding: {embedding[:5]}...")  # Print first 5 values for validation
+            embedding = embedding_cache.get(text, EMBEDDING_MODEL)
+            if embedding is None:
+                response = openai.Embedding.create(  
+                    model=EMBEDDING_MODEL,  
+                    input=text,
+                    request_timeout=RETRIEVAL_TIMEOUT
+                )
+                embedding = response.data[0].embedding
+                print(f"Generated Embedding: {embedding[:5]}...")  # Print first 5 values for validation
+                embedding_cache.put(text, EMBEDDING_MODEL, embedding)
             embeddings.append(embedding)
         return embeddings
     except Exception as e:
         print(f"Error generating embeddings: {e}")
         return []
 
-# Function to upsert product info embeddings into Pinecone
-def upsert_product_info_to_pinecone():
-    """Upserts product info embeddings into the Pinecone index."""
-    product_info = read_product_info()
+# Function to embed one batch of texts in a single API request
+def embed_batch(texts):
+    """Returns one embedding per input text, in input order."""
+    response = openai.Embedding.create(model=EMBEDDING_MODEL, input=texts)
+    return [item["embedding"] for item in sorted(response["data"], key=lambda item: item["index"])]
+
+# Function to generate embeddings for many texts with batched, concurrent requests
+def generate_embeddings_batched(texts, executor, batch_size=EMBEDDING_BATCH_SIZE):
+    """Embeds texts in batches of batch_size, running the batches on executor."""
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    embeddings = []
+    for batch_embeddings in executor.map(lambda batch: with_retries(embed_batch, batch), batches):
+        embeddings.extend(batch_embeddings)
+    return embeddings
+
+# Function to derive a product's id from its catalog line, so ids don't shift when other lines change
+def product_id(line):
+    return "product_" + hashlib.sha1(line.encode("utf-8")).hexdigest()[:16]
+
+# Function to pair catalog lines with their ids
+def catalog_entries(lines):
+    """Returns (ids, lines) in catalog order with exact duplicate lines dropped."""
+    ids, unique = [], []
+    seen = set()
+    for line in lines:
+        line_id = product_id(line)
+        if line_id not in seen:
+            seen.add(line_id)
+            ids.append(line_id)
+            unique.append(line)
+    return ids, unique
+
+# Function to read the ids that were last synced to Pinecone
+def read_manifest(path=CATALOG_MANIFEST_PATH):
+    """Returns the synced ids, or None if there is no manifest for this index and embedding model."""
+    try:
+        with open(path, "r") as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return None
+    if manifest.get("index") != index_name or manifest.get("model") != EMBEDDING_MODEL:
+        print(f"Catalog manifest {path} is for another index or embedding model; ignoring it.")
+        return None
+    return manifest["ids"]
+
+def write_manifest(ids, path=CATALOG_MANIFEST_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.tmp", "w") as file:
+        json.dump({"index": index_name, "model": EMBEDDING_MODEL, "ids": ids}, file)
+    os.replace(f"{path}.tmp", path)
 
-    if not product_info:
+# Function to list the ids already in Pinecone, for a sync that has no manifest to go on
+def list_pinecone_ids(index):
+    """Returns every id in the product_info namespace.
+
+    Pod-based indexes can't list ids; there the namespace can only hold what the original
+    upsert sent, the positional ids product_1..product_N, so those are returned instead.
+    """
+    try:
+        return [line_id for page in index.list(namespace="product_info") for line_id in page]
+    except Exception as e:
+        print(f"Could not list the ids in Pinecone ({e}); assuming positional product_N ids.")
+    namespace = index.describe_index_stats().namespaces.get("product_info")
+    count = namespace.vector_count if namespace is not None else 0
+    return [f"product_{i}" for i in range(1, count + 1)]
+
+# Function to work out what a catalog sync has to do
+def plan_catalog_sync(file_path=CATALOG_PATH, full=False, index=None):
+    """Diffs the catalog against the manifest (or Pinecone itself) and the vectors already in the local index."""
+    ids, lines = catalog_entries(iter_product_info(file_path))
+
+    # Vectors of unchanged lines are reused from the local index, matched by content so positional ids from older builds still count
+    local_index = load_local_index()
+    known = {}
+    if local_index is not None and not full:
+        for row, item in enumerate(local_index.metadata):
+            known.setdefault(product_id(item["product_info"]), row)
+
+    synced = read_manifest()
+    if synced is None:
+        # No manifest yet (e.g. the first sync after upgrading): ask Pinecone what it holds, so the
+        # old positional ids are deleted instead of being left next to the new ones
+        index = index if index is not None else pc.Index(index_name)
+        synced = list(dict.fromkeys(list_pinecone_ids(index) + (list(local_index.ids) if local_index is not None else [])))
+    synced_set, current = set(synced), set(ids)
+
+    return {
+        "ids": ids,
+        "lines": lines,
+        "local_index": local_index,
+        "known": known,
+        "to_embed": [line_id for line_id in ids if line_id not in known],
+        "to_upsert": [line_id for line_id in ids if full or line_id not in synced_set or line_id not in known],
+        "to_delete": [line_id for line_id in synced if line_id not in current],
+        "synced": synced,
+    }
+
+# Function to print what a catalog sync will (or would) change
+def print_sync_plan(plan, file_path=CATALOG_PATH, limit=20):
+    lines_by_id = dict(zip(plan["ids"], plan["lines"]))
+    local_index = plan["local_index"]
+    removed_lines = {}
+    if local_index is not None:
+        removed_lines = {line_id: item["product_info"] for line_id, item in zip(local_index.ids, local_index.metadata)}
+
+    unchanged = len(plan["ids"]) - len(plan["to_upsert"])
+    print(f"Catalog sync for {file_path}: {len(plan['ids'])} products, {unchanged} unchanged, "
+          f"{len(plan['to_upsert'])} to upsert ({len(plan['to_embed'])} to embed), {len(plan['to_delete'])} to delete.")
+    for line_id in plan["to_upsert"][:limit]:
+        print(f"  + {line_id}  {lines_by_id[line_id]}")
+    if len(plan["to_upsert"]) > limit:
+        print(f"  + ... {len(plan['to_upsert']) - limit} more")
+    for line_id in plan["to_delete"][:limit]:
+        print(f"  - {line_id}  {removed_lines.get(line_id, '')}")
+    if len(plan["to_delete"]) > limit:
+        print(f"  - ... {len(plan['to_delete']) - limit} more")
+
+# Function to sync product info embeddings into Pinecone
+def upsert_product_info_to_pinecone(file_path=CATALOG_PATH, batch_size=UPSERT_BATCH_SIZE, dry_run=False, full=False):
+    """Embeds and upserts only new or changed catalog lines and deletes removed ones; returns the sync plan."""
+    started = time.time()
+    index = pc.Index(index_name)
+    try:
+        plan = plan_catalog_sync(file_path, full, index)
+    except Exception as e:
+        print(f"Error reading product info from {file_path}: {e}")
+        return None
+
+    print_sync_plan(plan, file_path)
+    if dry_run:
+        return plan
+    if not plan["ids"]:
         print("No product information found to upsert.")
-        return
+        return plan
+
+    ids, lines_by_id = plan["ids"], dict(zip(plan["ids"], plan["lines"]))
+    local_index, known = plan["local_index"], plan["known"]
+    embedded = {}
+    failed = set()
+    upserted = deleted = 0
+    undeleted = []
 
-    # Generate embeddings for the product information
-    embeddings = generate_embeddings(product_info)
+    def upsert_batch(vectors):
+        with_retries(index.upsert, vectors=vectors, namespace="product_info")
+        return len(vectors)
 
-    if not embeddings:
-        print("Failed to generate embeddings.")
-        return
+    def delete_batch(batch):
+        with_retries(index.delete, ids=batch, namespace="product_info")
+        return len(batch)
 
-    # Prepare the data for upsert
-    vectors = []
-    for i, embedding in enumerate(embeddings):
-        vectors.append({
-            "id": f"product_{i+1}",  # Unique ID for each product
-            "values": embedding,
-            "metadata": {"product_info": product_info[i]}  # Storing the original product information as metadata
-        })
+    def vector_for(line_id):
+        if line_id in embedded:
+            return embedded[line_id]
+        return local_index.matrix[known[line_id]]
 
+    with ThreadPoolExecutor(max_workers=INGEST_CONCURRENCY) as executor:
+        # Embed enough lines at a time to keep every worker busy
+        chunk_size = EMBEDDING_BATCH_SIZE * INGEST_CONCURRENCY
+        to_embed = plan["to_embed"]
+        for start in range(0, len(to_embed), chunk_size):
+            chunk = to_embed[start:start + chunk_size]
+            try:
+                embeddings = generate_embeddings_batched([lines_by_id[line_id] for line_id in chunk], executor)
+            except Exception as e:
+                print(f"Failed to generate embeddings: {e}")
+                return None
+            embedded.update(zip(chunk, embeddings))
+
+        to_upsert = plan["to_upsert"]
+        batches = [to_upsert[i:i + batch_size] for i in range(0, len(to_upsert), batch_size)]
+        futures = [
+            executor.submit(upsert_batch, [
+                {
+                    "id": line_id,
+                    "values": [float(value) for value in vector_for(line_id)],
+                    "metadata": {"product_info": lines_by_id[line_id]}  # Storing the original product information as metadata
+                }
+                for line_id in batch
+            ])
+            for batch in batches
+        ]
+        for future, batch in zip(futures, batches):
+            try:
+                upserted += future.result()
+            except Exception as e:
+                failed.update(batch)
+                print(f"Error while upserting into Pinecone: {e}")
+
+        to_delete = plan["to_delete"]
+        batches = [to_delete[i:i + batch_size] for i in range(0, len(to_delete), batch_size)]
+        futures = [executor.submit(delete_batch, batch) for batch in batches]
+        for future, batch in zip(futures, batches):
+            try:
+                deleted += future.result()
+            except Exception as e:
+                undeleted.extend(batch)
+                print(f"Error while deleting from Pinecone: {e}")
+
+    print(f"Successfully upserted {upserted} and deleted {deleted} product information vectors in Pinecone "
+          f"in {time.time() - started:.1f}s ({len(failed)} upserts and {len(undeleted)} deletes failed).")
+
+    # Failed upserts of new lines and failed deletes stay pending in the manifest, so the next run retries them
+    synced_set = set(plan["synced"])
+    write_manifest([line_id for line_id in ids if line_id not in failed or line_id in synced_set] + undeleted)
+
+    # Keep the in-process indexes and catalog table in sync with the catalog
+    matrix = np.vstack([normalize_embeddings(vector_for(line_id)) for line_id in ids])
+    save_local_index(ids, matrix, [{"product_info": lines_by_id[line_id]} for line_id in ids])
+    set_catalog(ids, plan["lines"])
+    return plan
+
+# Function to persist the catalog embeddings for the local retrieval backend
+def save_local_index(ids, embeddings, metadata, path=LOCAL_INDEX_PATH):
+    """Writes the upserted vectors to disk and reloads the in-process index."""
+    global _local_index, _loaded_index_mtime
     try:
-        # Connect to the index
-        index = pc.Index(index_name)
-        
-        # Upsert the vectors into Pinecone (adjust namespace as needed)
-        index.upsert(vectors=vectors, namespace="product_info")
-        print(f"Successfully upserted {len(vectors)} product information vectors into Pinecone.")
+        local_index = LocalVectorIndex.build(ids, embeddings, metadata)
+        local_index.save(path)
+        _loaded_index_mtime = index_mtime(path)
+        _local_index = LocalVectorIndex.load(path)
+        print(f"Saved local index with {len(local_index)} vectors to {path}.")
     except Exception as e:
-        print(f"Error while upserting into Pinecone: {e}")
+        print(f"Error while saving local index: {e}")
+
+# Function to load (memory-map) the local index once per process
+def load_local_index(path=LOCAL_INDEX_PATH):
+    """Returns the in-process index, or None if it has not been built yet."""
+    global _local_index, _loaded_index_mtime
+    if _local_index is None and LocalVectorIndex.exists(path):
+        try:
+            _loaded_index_mtime = index_mtime(path)
+            _local_index = LocalVectorIndex.load(path)
+            print(f"Loaded local index with {len(_local_index)} vectors from {path}.")
+        except Exception as e:
+            print(f"Error loading local index from {path}: {e}")
+    return _local_index
+
+# Function to load the structured catalog table and lexical index once per process
+def load_catalog(path=CATALOG_PATH):
+    """Returns the parsed product catalog, or None if the catalog file can't be read."""
+    if _catalog is None:
+        try:
+            set_catalog(*catalog_entries(iter_product_info(path)))
+            print(f"Loaded catalog with {len(_catalog)} products from {path}.")
+        except Exception as e:
+            print(f"Error loading catalog from {path}: {e}")
+    return _catalog
+
+# Function to (re)build the in-memory catalog structures from the indexed lines
+def set_catalog(ids, lines):
+    global _catalog, _lexical_index, _catalog_generation
+    _catalog = ProductCatalog(ids, lines)
+    _lexical_index = BM25Index(ids, lines)
+    _catalog_generation += 1
+
+# Function to read the modification time of the local index (None if it hasn't been built)
+def index_mtime(path=LOCAL_INDEX_PATH):
+    try:
+        return os.stat(f"{path}.json").st_mtime_ns
+    except OSError:
+        return None
+
+# Function to tell whether another process has re-written the local index since this one loaded it
+def catalog_stale(path=LOCAL_INDEX_PATH):
+    mtime = index_mtime(path)
+    return mtime is not None and mtime != _loaded_index_mtime
+
+# Function to pick up a catalog that another process (e.g. `python database.py`) re-upserted
+def reload_catalog(path=LOCAL_INDEX_PATH):
+    """Reloads the local index and rebuilds the catalog table and BM25 index from the lines it was built from."""
+    global _local_index, _loaded_index_mtime
+    with _reload_lock:
+        mtime = index_mtime(path)
+        if mtime is None or mtime == _loaded_index_mtime:
+            return
+        try:
+            local_index = LocalVectorIndex.load(path)
+            set_catalog(local_index.ids, [item["product_info"] for item in local_index.metadata])
+            _local_index = local_index
+            print(f"Reloaded local index and catalog with {len(local_index)} products from {path}.")
+        except Exception as e:
+            print(f"Error reloading local index from {path}: {e}")
+        # Recorded even on failure so a broken file isn't re-read on every query; the next upsert changes it again
+        _loaded_index_mtime = mtime
 
-# Function to retrieve product info embeddings from Pinecone
-def get_product_info_from_pinecone(query="loan product details", top_k=5):
-    """Query the existing Pinecone index."""
+# Function to identify the catalog answers are computed from
+def catalog_version(path=LOCAL_INDEX_PATH):
+    """Changes when this process rebuilds its catalog or any process re-writes the local index (every upsert does).
+
+    A re-written index is reloaded first, so answers computed under the new version come from the new catalog.
+    """
+    if catalog_stale(path):
+        reload_catalog(path)
+    return (_catalog_generation, index_mtime(path))
+
+# Function to build the response cache key: case, spacing and punctuation don't change the answer
+def answer_key(query, top_k):
+    return (" ".join(re.sub(r"[^\w\s']", " ", query.lower()).split()), top_k)
+
+# Function to turn retrieval results into the text the assistant reads out
+def format_answer(results):
+    """Returns None when there is nothing to say, so the caller can use its own fallback."""
+    if not results:
+        return None
+    return "Here are the results from Pinecone: " + ", ".join([result['metadata']['product_info'] for result in results])
+
+# Function to answer a query through the response cache
+def get_product_answer(query="loan product details", top_k=5, timings=None):
+    """Returns {"results": [...], "answer": text or None}; the dict is shared with the cache, so don't modify it."""
+    key = answer_key(query, top_k)
+    version = catalog_version()
+    cached = response_cache.get(key, version)
+    if cached is not None:
+        if timings is not None:
+            timings["path"] = "cached"
+        return cached
+    return compute_answer(query, top_k, timings, key, version)
+
+def compute_answer(query, top_k, timings, key, version):
+    """Look up and format an answer, and cache it under key for the catalog version it was computed from."""
+    results, complete = lookup_product_info(query, top_k, timings)
+    answer = {"results": results, "answer": format_answer(results)}
+    # A lookup that lost its vector half (e.g. the embedding request failed) is served but not remembered
+    if complete:
+        response_cache.put(key, answer, version)
+    return answer
+
+# Function to retrieve product info (the results half of a cached answer)
+def get_product_info_from_pinecone(query="loan product details", top_k=5, timings=None):
+    """Query the catalog table and the vector index.
+
+    If timings is a dict, the embedding finish time and the path taken ("cached", "lexical" or "vector") are recorded in it.
+    """
+    return get_product_answer(query, top_k, timings)["results"]
+
+# Function to retrieve product info, combining structured catalog matches with vector matches
+def lookup_product_info(query, top_k=5, timings=None):
+    """Uncached retrieval; returns (results, complete) where complete is False if the vector search failed."""
+    # Attribute questions ("lowest rate for 15 years") are answered exactly from the catalog table
+    catalog = load_catalog()
+    structured = catalog.answer(query, top_k=top_k) if catalog is not None else []
+
+    # Keyword-heavy queries that match the catalog decisively skip the embedding round-trip
+    lexical = []
+    if HYBRID_RETRIEVAL and _lexical_index is not None:
+        lexical = _lexical_index.search(query, top_k=top_k)
+        if _lexical_index.is_decisive(query, lexical, min_score=LEXICAL_MIN_SCORE):
+            if timings is not None:
+                timings["path"] = "lexical"
+            return merge_results(structured, lexical, top_k), True
+
+    if timings is not None:
+        timings["path"] = "vector"
+    results = vector_search(query, top_k, timings)
+    if results is None:
+        return merge_results(structured, lexical, top_k) or None, False
+    if lexical:
+        results = fuse_rankings(results, lexical, top_k=top_k)
+    return merge_results(structured, results, top_k), True
+
+# Function to retrieve product info embeddings from the local index or Pinecone
+def vector_search(query, top_k=5, timings=None):
+    """Query the vector index by embedding similarity."""
     try:
         # Generate query embedding
         query_embedding = generate_embeddings([query])  # Note: Expecting a list input
+        if timings is not None:
+            timings["embedded"] = time.perf_counter()
         if not query_embedding or not isinstance(query_embedding[0], list):
             print("Failed to generate query embedding or invalid embedding format.")
             return None
 
+        # Answer from the in-process index when it is available
+        if RETRIEVAL_BACKEND == "local":
+            local_index = load_local_index()
+            if local_index is not None:
+                return local_index.query(query_embedding[0], top_k=top_k)
+
         # Connect to Pinecone index
         index = pc.Index(index_name)
 
@@ -127,6 +543,28 @@ def get_product_info_from_pinecone(query="loan product details", top_k=5):
         print(f"Error querying Pinecone: {e}")
         return None
 
+# Async wrapper used from the FastAPI handlers
+async def get_product_info_async(query="loan product details", top_k=5, timeout=RETRIEVAL_TIMEOUT, timings=None):
+    """Runs get_product_info_from_pinecone on the retrieval pool; raises asyncio.TimeoutError after timeout seconds."""
+    return (await get_product_answer_async(query, top_k, timeout, timings))["results"]
+
+async def get_product_answer_async(query="loan product details", top_k=5, timeout=RETRIEVAL_TIMEOUT, timings=None):
+    """get_product_answer without blocking the event loop; cache hits are answered without a thread hop."""
+    key = answer_key(query, top_k)
+    loop = asyncio.get_running_loop()
+    # Reloading a re-upserted catalog reads files, so it happens on the retrieval pool
+    if catalog_stale():
+        version = await loop.run_in_executor(retrieval_executor, catalog_version)
+    else:
+        version = catalog_version()
+    cached = response_cache.get(key, version)
+    if cached is not None:
+        if timings is not None:
+            timings["path"] = "cached"
+        return cached
+    future = loop.run_in_executor(retrieval_executor, compute_answer, query, top_k, timings, key, version)
+    return await asyncio.wait_for(future, timeout)
+
 # def get_product_info_from_pinecone(query="loan product details"):
 #     """Function to retrieve product info from Pinecone."""
 #     # try:
@@ -152,8 +590,14 @@ def get_product_info_from_pinecone(query="loan product details", top_k=5):
 #         print(f"Error while querying Pinecone: {e}")
 #         return []
 
-# If you want to run the upsert_product_info_to_pinecone function, you can call it here
-# upsert_product_info_to_pinecone()  # Uncomment to run the upsert when required
-
-# Run the setup_pinecone function
-# setup_pinecone()
+# Run `python database.py [catalog_path]` to (re)index the product catalog
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Sync the product catalog into Pinecone and the local index.")
+    parser.add_argument("catalog", nargs="?", default=CATALOG_PATH, help="catalog file, one product per line")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be upserted and deleted")
+    parser.add_argument("--full", action="store_true", help="re-embed and re-upsert every line")
+    args = parser.parse_args()
+    if not args.dry_run:
+        setup_pinecone()
+    upsert_product_info_to_pinecone(args.catalog, dry_run=args.dry_run, full=args.full)
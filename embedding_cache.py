@@ -0,0 +1,125 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+
+
+# Function to build the cache key for a text: case and whitespace don't change what the caller asked
+def normalize_text(text):
+    """Lowercase and collapse whitespace so repeated utterances share a cache entry."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: an in-memory LRU in front of a SQLite table that survives restarts."""
+
+    def __init__(self, path, max_memory_entries=1024, max_disk_entries=100000):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_trim = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, text)
+                )
+            ''')
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+            self._conn.commit()
+
+    def get(self, text, model):
+        """Return the cached embedding for text under model, or None on a miss."""
+        key = (model, normalize_text(text))
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return embedding
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND text = ?", key
+                ).fetchone()
+                if row is not None:
+                    embedding = array("f", row[0]).tolist()
+                    self._conn.execute(
+                        "UPDATE embeddings SET last_used = ? WHERE model = ? AND text = ?",
+                        (time.time(), *key)
+                    )
+                    self._conn.commit()
+                    self._remember(key, embedding)
+                    self.disk_hits += 1
+                    return embedding
+
+            self.misses += 1
+            return None
+
+    def put(self, text, model, embedding):
+        """Store an embedding in both tiers."""
+        key = (model, normalize_text(text))
+        with self._lock:
+            self._remember(key, embedding)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (model, text, vector, last_used) VALUES (?, ?, ?, ?)",
+                    (*key, array("f", embedding).tobytes(), time.time())
+                )
+                self._conn.commit()
+                self._writes_since_trim += 1
+                # Trimming needs a COUNT(*), so only do it every so often
+                if self._writes_since_trim >= 100:
+                    self._trim_disk()
+                    self._writes_since_trim = 0
+
+    def stats(self):
+        """Hit/miss counters and current sizes, e.g. for logging or a metrics endpoint."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _remember(self, key, embedding):
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _trim_disk(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+            self._conn.commit()
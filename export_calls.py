@@ -0,0 +1,108 @@
+"""Stream call_details rows to CSV or JSONL, a page at a time.
+
+    python export_calls.py                                   # CSV on stdout
+    python export_calls.py --format jsonl --out calls.jsonl --since 2024-06-01
+    python export_calls.py --contact +15551234567
+"""
+import os
+import sys
+import csv
+import json
+import sqlite3
+import argparse
+
+from schema import CALL_DETAILS_COLUMNS, require_current
+
+CALL_DB_PATH = os.getenv('CALL_DB_PATH', 'callbot.db')
+
+
+# Function to page through call_details in id order, or in date order when filtering by date
+def iter_calls(conn, since=None, until=None, contact_number=None, page_size=1000):
+    """Yields rows as tuples in CALL_DETAILS_COLUMNS order.
+
+    Each page is a separate query that resumes after the last row seen (keyset paging), so memory
+    stays at one page, every page is an index seek, and no read transaction is held open against
+    the callbot's writer between pages.
+    """
+    filters, params = [], []
+    if until:
+        filters.append("created_at < ?")
+        params.append(until)
+    if contact_number:
+        filters.append("contact_number = ?")
+        params.append(contact_number)
+    # A date range is read through the created_at index; anything else in primary key order
+    by_date = bool(since or until)
+    key = ("created_at", "id") if by_date else ("id",)
+    positions = [CALL_DETAILS_COLUMNS.index(column) for column in key]
+    select = f"SELECT {', '.join(CALL_DETAILS_COLUMNS)} FROM call_details"
+    order = f"ORDER BY {', '.join(key)} LIMIT ?"
+    after = f"({', '.join(key)}) > ({', '.join('?' for _ in key)})"
+
+    # The first page starts at since; later pages start after the last key, which is the only
+    # lower bound SQLite should seek on
+    start, start_params = (["created_at >= ?"], [since]) if since else ([], [])
+    last = None
+    while True:
+        lower, lower_params = ([after], list(last)) if last else (start, start_params)
+        where = filters + lower
+        query = f"{select} {'WHERE ' + ' AND '.join(where) if where else ''} {order}"
+        rows = conn.execute(query, params + lower_params + [page_size]).fetchall()
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last = tuple(rows[-1][position] for position in positions)
+
+
+# Function to write rows as CSV with a header line
+def write_csv(rows, out):
+    writer = csv.writer(out)
+    writer.writerow(CALL_DETAILS_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+# Function to write rows as one JSON object per line
+def write_jsonl(rows, out):
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(CALL_DETAILS_COLUMNS, row))) + "\n")
+        count += 1
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=CALL_DB_PATH, help="call database (default: CALL_DB_PATH or callbot.db)")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    parser.add_argument("--out", help="output file (default: stdout)")
+    parser.add_argument("--since", help="only calls created at or after this UTC date/time, e.g. 2024-06-01")
+    parser.add_argument("--until", help="only calls created before this UTC date/time")
+    parser.add_argument("--contact", help="only calls to or from this number")
+    parser.add_argument("--page-size", type=int, default=1000, help="rows fetched per query")
+    args = parser.parse_args(argv)
+
+    # Read-only, so an export can run next to a live callbot without taking the write lock
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        require_current(conn)
+        rows = iter_calls(conn, args.since, args.until, args.contact, args.page_size)
+        if args.out:
+            with open(args.out, "w", newline="", encoding="utf-8") as out:
+                count = WRITERS[args.format](rows, out)
+        else:
+            count = WRITERS[args.format](rows, sys.stdout)
+    finally:
+        conn.close()
+    print(f"Exported {count} calls", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+import os
+import re
+import json
+import asyncio
+import logging
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+import openai
+
+EXTRACTED_FIELDS = ("interested_in_home_loan", "time_period_of_loan", "location_of_home", "any_other_home_loan")
+
+KNOWN_CITIES = (
+    "New Delhi", "Delhi", "Mumbai", "Bangalore", "Bengaluru", "Hyderabad", "Chennai", "Kolkata", "Pune",
+    "Ahmedabad", "Jaipur", "Lucknow", "Chandigarh", "Noida", "Gurgaon", "Gurugram", "Kochi", "Indore",
+    "Bhopal", "Patna", "Nagpur", "Surat", "Thane", "Navi Mumbai", "Ghaziabad", "Faridabad", "Varanasi",
+    "New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "San Francisco", "Seattle", "Boston",
+    "Dallas", "Austin", "Miami", "Atlanta", "Denver", "London", "Toronto", "Dubai", "Singapore",
+)
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "twenty": 20, "twenty five": 25,
+    "twenty-five": 25, "thirty": 30,
+}
+
+# Regex alternation of the number words, longest first so "twenty five" wins over "twenty"
+NUMBER_WORD_PATTERN = "|".join(sorted(map(re.escape, NUMBER_WORDS), key=len, reverse=True))
+
+
+# Function to read a number written as digits or as a word from NUMBER_WORDS
+def number_value(text):
+    text = text.lower()
+    return int(text) if text.isdigit() else NUMBER_WORDS[text]
+
+
+YES_PATTERN = re.compile(r"\b(yes|yeah|yep|yup|sure|definitely|of course|absolutely|i am|i'm interested|i do|i have)\b", re.I)
+NO_PATTERN = re.compile(r"\b(no|nope|nah|not really|not interested|i'm not|i am not|i don't|i do not|never)\b", re.I)
+YEARS_PATTERN = re.compile(
+    r"\b(\d{1,2}|" + NUMBER_WORD_PATTERN + r")[\s-]*(?:years?|yrs?)\b",
+    re.I
+)
+# A years phrase only counts as the loan period when the agent asked for it or the caller said it about the loan
+TERM_QUESTION = re.compile(r"\b(how long|how many years|tenure|term|period|duration)\b", re.I)
+LOAN_CONTEXT = re.compile(r"\b(loans?|mortgage|term|tenure|repay\w*|emis?|borrow\w*)\b", re.I)
+CITY_PATTERN = re.compile(r"\b(" + "|".join(sorted(map(re.escape, KNOWN_CITIES), key=len, reverse=True)) + r")\b", re.I)
+INTEREST_QUESTION = re.compile(r"interested", re.I)
+OTHER_LOAN_QUESTION = re.compile(r"\b(other|existing|another|current)\b.*\bloans?\b", re.I)
+OTHER_LOAN_STATEMENT = re.compile(r"\b(already have|existing|another|other|current|running)\b[^.?!]*\bloans?\b", re.I)
+
+
+def _yes_no(text):
+    # Check "no" first so "not interested" isn't read as "interested"
+    if NO_PATTERN.search(text):
+        return "No"
+    if YES_PATTERN.search(text):
+        return "Yes"
+    return None
+
+
+def _loan_years(text):
+    """The years phrase nearest a loan word in the same sentence, so "lived here 10 years" isn't a loan period."""
+    for sentence in re.split(r"[.;!?]", text):
+        context = [match.start() for match in LOAN_CONTEXT.finditer(sentence)]
+        candidates = [
+            (min(abs(match.start() - position) for position in context), match.group(1))
+            for match in YEARS_PATTERN.finditer(sentence)
+        ] if context else []
+        if candidates:
+            return number_value(min(candidates)[1])
+    return None
+
+
+def _years_after(turns):
+    """Years from the first user reply to an agent turn asking how long the loan is for."""
+    for i, (role, text) in enumerate(turns):
+        if role == "Agent" and TERM_QUESTION.search(text):
+            for next_role, next_text in turns[i + 1:]:
+                if next_role == "User":
+                    match = YEARS_PATTERN.search(next_text)
+                    if match:
+                        return number_value(match.group(1))
+                    break
+    return None
+
+
+def _answer_after(turns, question):
+    """Yes/No from the first user reply to an agent turn matching question."""
+    for i, (role, text) in enumerate(turns):
+        if role == "Agent" and question.search(text):
+            for next_role, next_text in turns[i + 1:]:
+                if next_role == "User":
+                    answer = _yes_no(next_text)
+                    if answer:
+                        return answer
+                    break
+    return None
+
+
+class FieldExtractor(ABC):
+    """Fills call_details fields from a list of (role, text) transcript turns."""
+
+    @abstractmethod
+    def extract(self, turns):
+        """Returns a dict with any of EXTRACTED_FIELDS it could determine."""
+
+
+class RegexExtractor(FieldExtractor):
+    """Keyword and pattern based extraction; fast enough to run on every call."""
+
+    def extract(self, turns):
+        user_text = [text for role, text in turns if role == "User"]
+        fields = {}
+
+        interested = _answer_after(turns, INTEREST_QUESTION)
+        if interested is None:
+            for text in user_text:
+                if re.search(r"\binterested\b", text, re.I):
+                    interested = _yes_no(text) or "Yes"
+                    break
+        if interested:
+            fields["interested_in_home_loan"] = interested
+
+        years = _years_after(turns)
+        if years is None:
+            years = next((years for years in map(_loan_years, user_text) if years is not None), None)
+        if years is not None:
+            fields["time_period_of_loan"] = f"{years} years"
+
+        for text in user_text:
+            match = CITY_PATTERN.search(text)
+            if match:
+                city = match.group(1).lower()
+                fields["location_of_home"] = next(known for known in KNOWN_CITIES if known.lower() == city)
+                break
+
+        other_loan = _answer_after(turns, OTHER_LOAN_QUESTION)
+        if other_loan is None:
+            for text in user_text:
+                # Judge negation per clause, so "not interested, I already have a loan" still reads as Yes
+                clause = next((clause for clause in re.split(r"[,.;!?]", text) if OTHER_LOAN_STATEMENT.search(clause)), None)
+                if clause is not None:
+                    other_loan = "No" if NO_PATTERN.search(clause) else "Yes"
+                    break
+        if other_loan:
+            fields["any_other_home_loan"] = other_loan
+
+        return fields
+
+
+# Function to unwrap a model reply that put its JSON in a ```json code fence
+def strip_code_fence(reply):
+    match = re.match(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", reply, re.S | re.I)
+    return match.group(1) if match else reply
+
+
+# Function used by LLMExtractor by default; swap it out (e.g. in tests) by passing another callable
+def openai_complete(prompt):
+    """Returns the model's reply to prompt as text."""
+    response = openai.ChatCompletion.create(
+        model=os.getenv("EXTRACTION_MODEL", "gpt-4o-mini"),
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0,
+    )
+    return response["choices"][0]["message"]["content"]
+
+
+class LLMExtractor(FieldExtractor):
+    """Asks a language model for the fields; complete(prompt) -> str must return a JSON object."""
+
+    PROMPT = (
+        "From this phone call transcript between a home loan assistant (Agent) and a caller (User), "
+        "return a JSON object with the keys interested_in_home_loan (\"Yes\"/\"No\"), "
+        "time_period_of_loan (e.g. \"15 years\"), location_of_home (city) and any_other_home_loan (\"Yes\"/\"No\"). "
+        "Use null for anything the caller did not say.\n\n{transcript}"
+    )
+
+    def __init__(self, complete=openai_complete):
+        self.complete = complete
+
+    def extract(self, turns):
+        transcript = "\n".join(f"{role}: {text}" for role, text in turns)
+        try:
+            reply = json.loads(strip_code_fence(self.complete(self.PROMPT.format(transcript=transcript))))
+        except Exception as e:
+            logging.error("LLM extraction failed: %s", str(e))
+            return {}
+        return {field: reply[field] for field in EXTRACTED_FIELDS if reply.get(field)}
+
+
+class ChainedExtractor(FieldExtractor):
+    """Runs extractors in order; later ones only run if fields are still missing and only fill those."""
+
+    def __init__(self, *extractors):
+        self.extractors = extractors
+
+    def extract(self, turns):
+        fields = {}
+        for extractor in self.extractors:
+            if all(field in fields for field in EXTRACTED_FIELDS):
+                break
+            for field, value in extractor.extract(turns).items():
+                fields.setdefault(field, value)
+        return fields
+
+
+# Module-level so the process pool can pickle it
+def run_extractor(extractor, turns):
+    return extractor.extract(turns)
+
+
+class ExtractionPipeline:
+    """Queue of finished calls; workers extract fields on a process pool and hand the record to on_result."""
+
+    def __init__(self, extractor, on_result, workers=None, max_queue=10000):
+        self.extractor = extractor
+        self.on_result = on_result
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.processed = 0
+        self.failed = 0
+        self._queue = None
+        self._tasks = []
+        self._pool = None
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        # Forking a server that already runs threads (retrieval pool, DB writer) can leave a child stuck
+        # on a lock one of them held, so workers start from a clean forkserver (spawn where there is none)
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, record, turns):
+        """Queue a call_details record and its (role, text) turns; returns immediately."""
+        await self._queue.put((record, turns))
+
+    async def stop(self):
+        """Finish every queued call, then shut the pool down."""
+        if not self._tasks:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._pool.shutdown(wait=True)
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            record, turns = await self._queue.get()
+            try:
+                fields = await loop.run_in_executor(self._pool, run_extractor, self.extractor, turns)
+                self.processed += 1
+            except Exception as e:
+                logging.error("Error extracting call details: %s", str(e))
+                fields = {}
+                self.failed += 1
+            try:
+                record.update({field: fields.get(field) for field in EXTRACTED_FIELDS})
+                await self.on_result(record)
+            except Exception as e:
+                logging.error("Error storing extracted call details: %s", str(e))
+            finally:
+                self._queue.task_done()
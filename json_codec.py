@@ -0,0 +1,25 @@
+import json
+
+# Use orjson when it is installed; the stdlib encoder is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def loads(data):
+        """Parse a JSON text or bytes message."""
+        return orjson.loads(data)
+
+    def dumps(obj):
+        """Serialize obj to a compact JSON str (text frames, not bytes)."""
+        return orjson.dumps(obj).decode("utf-8")
+else:
+    def loads(data):
+        """Parse a JSON text or bytes message."""
+        return json.loads(data)
+
+    def dumps(obj):
+        """Serialize obj to a compact JSON str (text frames, not bytes)."""
+        return json.dumps(obj, separators=(",", ":"))
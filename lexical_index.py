@@ -0,0 +1,99 @@
+import re
+import math
+from collections import Counter, defaultdict
+
+STOPWORDS = frozenset(
+    "a an and are any about can could do does for from have i im i'm in is it me my of on or please "
+    "tell the there to what whats what's which with you your".split()
+)
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+# "Home Loan AM:" names a product; its letters ("am", "an", "at") would match ordinary words in a question
+_NAME_PREFIX = re.compile(r"^\s*[^:]{1,40}:")
+
+
+# Function to split text into lowercase index terms
+def tokenize(text):
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+# Function to drop the leading product name from a catalog line before it is indexed
+def strip_name(text):
+    return _NAME_PREFIX.sub("", text, count=1)
+
+
+class BM25Index:
+    """Inverted index over the catalog lines scored with BM25."""
+
+    def __init__(self, ids, texts, metadata=None, k1=1.2, b=0.75):
+        self.ids = list(ids)
+        self.positions = {id: doc for doc, id in enumerate(self.ids)}
+        self.texts = list(texts)
+        self.metadata = list(metadata) if metadata is not None else [{"product_info": text} for text in self.texts]
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # term -> [(doc, term frequency)]
+        self.doc_terms = []
+        lengths = []
+        for doc, text in enumerate(self.texts):
+            counts = Counter(tokenize(strip_name(text)))
+            self.doc_terms.append(frozenset(counts))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((doc, tf))
+        self.lengths = lengths
+        self.avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+        n = len(self.texts)
+        self.idf = {term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5)) for term, docs in self.postings.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def scores(self, terms):
+        """BM25 score per document that contains at least one of terms."""
+        scores = defaultdict(float)
+        for term in set(terms):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc] / self.avg_length)
+                scores[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query, top_k=5):
+        """Top matches as `{id, score, metadata}` dicts, best first."""
+        scores = self.scores(tokenize(query))
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [{"id": self.ids[doc], "score": score, "metadata": self.metadata[doc]} for doc, score in ranked]
+
+    def is_decisive(self, query, results, min_score=2.0, min_idf=0.5, min_coverage=0.75, min_margin=0.3):
+        """True when the best match covers most of the query and clearly beats the partial matches.
+
+        Query terms the catalog never uses count as misses, so "what about my credit card debt"
+        doesn't hang on "credit" alone. Terms that occur in almost every line (e.g. "interest",
+        "rate") carry little idf and are ignored, so generic questions still go to the vector index.
+        Lines that contain every matched term tie (three products have "no prepayment penalty"),
+        so the margin is taken over the best result that is missing one of them.
+        """
+        if not results or results[0]["score"] < min_score:
+            return False
+        terms = [term for term in set(tokenize(query)) if self.idf.get(term, min_idf) >= min_idf]
+        best = self.doc_terms[self.positions[results[0]["id"]]]
+        hits = {term for term in terms if term in best}
+        if not hits or len(hits) < min_coverage * len(terms):
+            return False
+        for result in results[1:]:
+            if not hits <= self.doc_terms[self.positions[result["id"]]]:
+                return results[0]["score"] >= (1 + min_margin) * result["score"]
+        return True
+
+
+# Function to fuse several ranked result lists (reciprocal rank fusion)
+def fuse_rankings(*rankings, k=60, top_k=5):
+    """Combines `{id, score, metadata}` lists by summing 1 / (k + rank); the fused value becomes the score."""
+    fused = {}
+    for ranking in rankings:
+        for rank, result in enumerate(ranking or [], start=1):
+            entry = fused.setdefault(result["id"], dict(result, score=0.0))
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda result: result["score"], reverse=True)[:top_k]
@@ -0,0 +1,76 @@
+import os
+import json
+import numpy as np
+
+
+# Function to L2-normalize a batch of embeddings so a dot product is a cosine similarity
+def normalize_embeddings(embeddings):
+    """Return a float32 matrix of row-normalized embeddings."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalVectorIndex:
+    """In-process cosine similarity index over the product catalog embeddings."""
+
+    def __init__(self, matrix, ids, metadata):
+        self.matrix = matrix
+        self.ids = ids
+        self.metadata = metadata
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids, embeddings, metadata):
+        """Build an index from raw embeddings and their ids/metadata."""
+        return cls(normalize_embeddings(embeddings), list(ids), list(metadata))
+
+    def save(self, path):
+        """Write the index as `<path>.npy` (vectors) and `<path>.json` (ids and metadata)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write to temporary files and rename them over the old ones, so a process that has the old
+        # vectors memory-mapped keeps reading them instead of a truncated file
+        with open(f"{path}.npy.tmp", "wb") as file:
+            np.save(file, np.ascontiguousarray(self.matrix, dtype=np.float32))
+        with open(f"{path}.json.tmp", "w") as file:
+            json.dump({"ids": self.ids, "metadata": self.metadata}, file)
+        os.replace(f"{path}.npy.tmp", f"{path}.npy")
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load an index saved with `save`, memory-mapping the vectors by default."""
+        matrix = np.load(f"{path}.npy", mmap_mode="r" if mmap else None)
+        with open(f"{path}.json", "r") as file:
+            payload = json.load(file)
+        return cls(matrix, payload["ids"], payload["metadata"])
+
+    @classmethod
+    def exists(cls, path):
+        return os.path.exists(f"{path}.npy") and os.path.exists(f"{path}.json")
+
+    def query(self, vector, top_k=5):
+        """Return the top_k matches as `{id, score, metadata}` dicts, best first."""
+        if not len(self.ids):
+            return []
+        query = normalize_embeddings(vector)[0]
+        scores = self.matrix @ query
+        top_k = min(top_k, len(scores))
+        # argpartition keeps this O(n) before sorting just the top_k candidates
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [
+            {
+                "id": self.ids[i],
+                "score": float(scores[i]),
+                "metadata": self.metadata[i]
+            }
+            for i in ranked
+        ]
@@ -1,21 +1,34 @@
 import os
 import json
-import base64
 import asyncio
 import websockets
+from functools import partial
 from fastapi import FastAPI, WebSocket, Request, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 
 from fastapi.websockets import WebSocketDisconnect
-from twilio.twiml.voice_response import VoiceResponse, Connect, Say, Stream
 from twilio.rest import Client
 
-from database import get_product_info_from_pinecone
+from database import get_product_answer_async, load_local_index, load_catalog, embedding_cache, response_cache
+import json_codec
+from metrics import metrics, TurnTimer
+from session_store import Session, create_session_store
+from call_writer import CallDetailsWriter
+from campaigns import CampaignDialer, parse_leads
+from extraction import ExtractionPipeline, RegexExtractor, LLMExtractor, ChainedExtractor
+from speculative import SpeculativeRetriever, normalize_query
+from relay import extract_media, input_audio_append, MediaFrameTemplate
+from realtime_pool import RealtimePool
+from send_queue import SendQueue
+from playback import PlaybackTracker
+from vad import LocalVAD
+from canned_audio import CannedAudio, UTTERANCES, CANNED_AUDIO_DIR
+from twiml_cache import TwimlCache, stream_url_for, etag_matches
 
 from dotenv import load_dotenv
 import logging
-import sqlite3
-import time
+import uuid
+from urllib.parse import urlencode
 
 load_dotenv()
 
@@ -25,6 +38,8 @@ PORT = int(os.getenv('PORT', 5050))
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
+HOSTNAME = os.getenv('HOSTNAME')
+OPENAI_REALTIME_URL = os.getenv('OPENAI_REALTIME_URL', 'wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01')
 
 
 SYSTEM_MESSAGE = (
@@ -33,7 +48,7 @@ SYSTEM_MESSAGE = (
     "You will ask the caller a few questions to assist the loan officer. "
     "Always stay positive and do not go outside loan assistance while talking with the customer."
 )
-VOICE = 'alloy'
+VOICE = os.getenv('VOICE', 'alloy')
 LOG_EVENT_TYPES = [
     'response.content.done',
     'rate_limits.updated',
@@ -46,16 +61,114 @@ LOG_EVENT_TYPES = [
     'conversation.item.input_audio_transcription.completed'
 ]
 SHOW_TIMING_MATH = False
+# Forward audio payloads untouched using pre-rendered frames instead of parsing and re-encoding every 20ms frame
+FAST_RELAY = os.getenv('FAST_RELAY', 'true').lower() == 'true'
 MAKE_WEBHOOK_URL = os.getenv('MAKE_WEBHOOK_URL')
-sessions = {}
+# Default pacing for /campaigns; both can be overridden per campaign
+CAMPAIGN_CALLS_PER_SECOND = float(os.getenv('CAMPAIGN_CALLS_PER_SECOND', 1.0))
+CAMPAIGN_CONCURRENCY = int(os.getenv('CAMPAIGN_CONCURRENCY', 10))
+EXTRACTION_LLM = os.getenv('EXTRACTION_LLM', 'false').lower() == 'true'
+# Look up partial transcripts early; the result is kept if the final transcript is at least SPECULATIVE_THRESHOLD similar
+SPECULATIVE_RETRIEVAL = os.getenv('SPECULATIVE_RETRIEVAL', 'true').lower() == 'true'
+SPECULATIVE_MIN_WORDS = int(os.getenv('SPECULATIVE_MIN_WORDS', 3))
+SPECULATIVE_THRESHOLD = float(os.getenv('SPECULATIVE_THRESHOLD', 0.85))
+# Each restart as the partial transcript grows is another embedding request
+SPECULATIVE_MAX_STARTS = int(os.getenv('SPECULATIVE_MAX_STARTS', 4))
+# Caller speech-to-text model; gpt-4o-transcribe and gpt-4o-mini-transcribe stream partial transcripts,
+# whisper-1 sends the whole text at once when it is done, so speculative retrieval has nothing to start early on
+TRANSCRIPTION_MODEL = os.getenv('TRANSCRIPTION_MODEL', 'gpt-4o-mini-transcribe')
+# What callers hear before the assistant picks up; TWIML_GREETINGS_PATH is a JSON file of named greeting variants
+TWIML_STREAM_URL = os.getenv('TWIML_STREAM_URL') or (stream_url_for(HOSTNAME) if HOSTNAME else None)
+TWIML_VOICE = os.getenv('TWIML_VOICE', 'alice')
+TWIML_GREETING = os.getenv('TWIML_GREETING', "Hello! You are now connected to an AI voice assistant for Home Loan queries.")
+TWIML_CONNECTING_MESSAGE = os.getenv('TWIML_CONNECTING_MESSAGE', "Please wait while we connect you to the assistant.")
+TWIML_GREETINGS_PATH = os.getenv('TWIML_GREETINGS_PATH')
+# Greeting and fallback replies pre-rendered by `python canned_audio.py`; anything missing is generated live
+canned_audio = CannedAudio.load(CANNED_AUDIO_DIR, UTTERANCES, VOICE)
+# Realtime sockets kept connected and initialized ahead of calls; 0 connects per call
+REALTIME_POOL_SIZE = int(os.getenv('REALTIME_POOL_SIZE', 2))
+# A session's clock starts when the socket connects, so a pooled socket's age comes off the call's session limit
+REALTIME_POOL_MAX_AGE = float(os.getenv('REALTIME_POOL_MAX_AGE', 90))
+REALTIME_POOL_CHECK_INTERVAL = float(os.getenv('REALTIME_POOL_CHECK_INTERVAL', 15))
+# Per-direction audio queue bound (messages) and what to do with audio when it is full: coalesce, drop_oldest or drop_newest
+SEND_QUEUE_SIZE = int(os.getenv('SEND_QUEUE_SIZE', 100))
+SEND_QUEUE_POLICY = os.getenv('SEND_QUEUE_POLICY', 'coalesce')
+# Optional barge-in detection on the caller's audio, before OpenAI's server VAD reports it (see bench/vad_bench.py to tune)
+LOCAL_VAD = os.getenv('LOCAL_VAD', 'false').lower() == 'true'
+LOCAL_VAD_THRESHOLD_DB = float(os.getenv('LOCAL_VAD_THRESHOLD_DB', -30.0))
+LOCAL_VAD_HYSTERESIS_DB = float(os.getenv('LOCAL_VAD_HYSTERESIS_DB', 6.0))
+LOCAL_VAD_ZCR_MAX = float(os.getenv('LOCAL_VAD_ZCR_MAX', 0.4))
+LOCAL_VAD_START_MS = int(os.getenv('LOCAL_VAD_START_MS', 60))
+LOCAL_VAD_STOP_MS = int(os.getenv('LOCAL_VAD_STOP_MS', 300))
+# Ask Twilio to echo a mark after this much response audio (and at the end of every response); 0 marks responses only
+MARK_INTERVAL_MS = int(os.getenv('MARK_INTERVAL_MS', 500))
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', os.cpu_count() or 1))
+# Calls placed by /make-call that haven't connected their media stream yet.
+# Use SESSION_BACKEND=sqlite when running more than one worker so any worker can pick the call up.
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+SESSION_DB_PATH = os.getenv('SESSION_DB_PATH', 'sessions.db')
+SESSION_TTL = int(os.getenv('SESSION_TTL', 300))
+SESSION_MAX = int(os.getenv('SESSION_MAX', 10000))
+sessions = create_session_store(SESSION_BACKEND, SESSION_DB_PATH, ttl=SESSION_TTL, max_size=SESSION_MAX)
+# Finished calls are written to call_details in batches by a single background writer
+CALL_DB_PATH = os.getenv('CALL_DB_PATH', 'callbot.db')
+call_writer = CallDetailsWriter(
+    CALL_DB_PATH,
+    batch_size=int(os.getenv('CALL_WRITER_BATCH_SIZE', 100)),
+    flush_interval=float(os.getenv('CALL_WRITER_FLUSH_INTERVAL', 1.0))
+)
+
+# Send queues of the calls in progress, by session, for /metrics
+active_streams = {}
 
 app = FastAPI()
 
 if not all([OPENAI_API_KEY, TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER]):
     raise ValueError("Missing Twilio or OpenAI configuration in the .env file.")
 
+# Twilio fetches /twiml from HOSTNAME and, unless TWIML_STREAM_URL is set, streams to it; without it calls would go to wss:///media-stream
+if not HOSTNAME:
+    raise ValueError("Missing HOSTNAME in the .env file.")
+
 
 client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+twiml_cache = TwimlCache(TWIML_STREAM_URL, TWIML_GREETING, TWIML_CONNECTING_MESSAGE, TWIML_VOICE, variants_path=TWIML_GREETINGS_PATH)
+
+@app.on_event("startup")
+async def load_retrieval_index():
+    """Memory-map the local product index and parse the catalog so the first caller doesn't pay for loading them."""
+    load_local_index()
+    load_catalog()
+
+@app.on_event("startup")
+async def start_session_reaper():
+    """Expire sessions for calls that never connected their media stream."""
+    app.state.session_reaper = asyncio.create_task(sessions.run_reaper())
+
+@app.on_event("shutdown")
+async def stop_session_reaper():
+    app.state.session_reaper.cancel()
+
+@app.on_event("startup")
+async def start_post_call_workers():
+    await call_writer.start()
+    await extraction_pipeline.start()
+
+@app.on_event("shutdown")
+async def stop_post_call_workers():
+    """Finish queued extractions and drain call_details rows before the process exits."""
+    # Extraction feeds the writer, so let it finish first
+    await extraction_pipeline.stop()
+    await call_writer.stop()
+
+@app.on_event("startup")
+async def start_realtime_pool():
+    await realtime_pool.start()
+
+@app.on_event("shutdown")
+async def stop_realtime_pool():
+    await realtime_pool.stop()
+
 @app.get("/", response_class=JSONResponse)
 async def index_page():
     return {"message": "Twilio Outgoing Call Server is running!"}
@@ -74,55 +187,118 @@ async def index_page():
 #     response.append(connect)
 #     return HTMLResponse(content=str(response), media_type="application/xml")
 
+@app.get("/metrics", response_class=JSONResponse)
+async def get_metrics():
+    """Per-stage turn latency histograms, active sessions and frame throughput."""
+    snapshot = metrics.snapshot()
+    snapshot["embedding_cache"] = embedding_cache.stats()
+    snapshot["response_cache"] = response_cache.stats()
+    snapshot["pending_sessions"] = await sessions.stats_async()
+    snapshot["call_writer"] = call_writer.stats()
+    snapshot["extraction"] = extraction_pipeline.stats()
+    snapshot["realtime_pool"] = realtime_pool.stats()
+    snapshot["twiml"] = twiml_cache.stats()
+    snapshot["streams"] = {
+        session.call_sid: {direction: queue.stats() for direction, queue in queues.items()}
+        for session, queues in list(active_streams.items())
+    }
+    return snapshot
+
 # @app.get("/query-pinecone", response_class=JSONResponse)
 @app.api_route("/query-pinecone", methods=["GET", "POST"], response_class=JSONResponse)
 async def query_pinecone(query: str):
     """Endpoint to query Pinecone and return results."""
-    results = get_product_info_from_pinecone(query)
-    return {"results": results}
+    try:
+        answer = await get_product_answer_async(query)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out querying product info.")
+    return answer
 
 # @app.post("/make-call")
 @app.api_route("/make-call", methods=["GET", "POST"])
-async def make_outgoing_call(to: str, name: str):
+async def make_outgoing_call(to: str, name: str, variant: str = None):
     """Initiate an outgoing call and connect it to the AI assistant."""
     if not to or not name:
         raise HTTPException(status_code=400, detail="The 'to' phone number and 'name' are required.")
-
-    # Generate TwiML for the call
-    twiml_url = f"{os.getenv('HOSTNAME')}/twiml"
+    if variant and not twiml_cache.has_variant(variant):
+        raise HTTPException(status_code=400, detail=f"Unknown greeting variant '{variant}'.")
 
     try:
-        call = client.calls.create(
-            to=to,
-            from_=TWILIO_PHONE_NUMBER,
-            url=twiml_url
-        )
-        sessions[call.sid] = {"name": name, "contact_number": to, "transcript": '', "streamSid": None}
-        return {"message": "Call initiated successfully", "call_sid": call.sid}
+        call_sid = await place_call(to, name, variant)
+        return {"message": "Call initiated successfully", "call_sid": call_sid}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error initiating call: {e}")
 
+async def place_call(to, name, variant=None):
+    """Create the Twilio call off the event loop and remember who we are calling.
 
-# @app.get("/twiml", response_class=HTMLResponse)
-@app.api_route("/twiml", methods=["GET", "POST"], response_class=HTMLResponse)
-async def twiml_response():
-    """Generate TwiML response for the outgoing call."""
-    response = VoiceResponse()
-    response.say(
-        "Hello! You are now connected to an AI voice assistant for Home Loan queries.",
-        voice="alice"
+    Only calls.create can raise; once the call exists its SID is returned even if the session
+    can't be saved, so the campaign dialer never retries (and re-dials) a call that was placed.
+    """
+    # Generate TwiML for the call
+    twiml_url = f"{HOSTNAME}/twiml"
+    if variant:
+        twiml_url += "?" + urlencode({"variant": variant})
+    call = await asyncio.to_thread(
+        client.calls.create,
+        to=to,
+        from_=TWILIO_PHONE_NUMBER,
+        url=twiml_url
     )
-    response.pause(length=1)
-    response.say("Please wait while we connect you to the assistant.", voice="alice")
+    try:
+        await sessions.put_async(Session(call.sid, name=name, contact_number=to))
+    except Exception as e:
+        # The call still goes ahead, just without the caller's name and number on its record
+        logging.error("Error saving session for call %s: %s", call.sid, str(e))
+    return call.sid
+
+campaign_dialer = CampaignDialer(place_call, max_attempts=int(os.getenv('CAMPAIGN_MAX_ATTEMPTS', 3)))
+
+@app.post("/campaigns")
+async def create_campaign(request: Request, calls_per_second: float = CAMPAIGN_CALLS_PER_SECOND, concurrency: int = CAMPAIGN_CONCURRENCY, variant: str = None):
+    """Start dialing a CSV (to,name header) or JSONL list of leads posted as the request body."""
+    if calls_per_second <= 0 or concurrency <= 0:
+        raise HTTPException(status_code=400, detail="calls_per_second and concurrency must be positive.")
+    if variant and not twiml_cache.has_variant(variant):
+        raise HTTPException(status_code=400, detail=f"Unknown greeting variant '{variant}'.")
+    try:
+        leads = parse_leads(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid lead list: {e}")
+    if not leads:
+        raise HTTPException(status_code=400, detail="The lead list is empty.")
+
+    campaign = campaign_dialer.start(leads, calls_per_second=calls_per_second, concurrency=concurrency, variant=variant)
+    return {"message": "Campaign started", "campaign_id": campaign.id, "total": len(leads)}
+
+@app.get("/campaigns")
+async def list_campaigns():
+    return {"campaigns": [campaign.progress() for campaign in campaign_dialer.campaigns.values()]}
+
+@app.get("/campaigns/{campaign_id}")
+async def get_campaign(campaign_id: str):
+    campaign = campaign_dialer.get(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found.")
+    return campaign.progress()
+
+@app.post("/campaigns/{campaign_id}/cancel")
+async def cancel_campaign(campaign_id: str):
+    campaign = campaign_dialer.cancel(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found.")
+    return {"message": "Campaign cancelled", "campaign_id": campaign_id}
 
-    # Connect the call to the WebSocket for media streaming
-    connect = Connect()
-    # connect.stream(url=f"wss://{os.getenv('HOSTNAME')}/media-stream")
-    connect.stream(url="wss://daaf-2409-40c4-1176-7686-1d75-947e-41f6-a5f3.ngrok-free.app/media-stream")
-    response.append(connect)
-    
-    return HTMLResponse(content=str(response), media_type="application/xml")
+
+# @app.get("/twiml", response_class=HTMLResponse)
+@app.api_route("/twiml", methods=["GET", "POST"], response_class=HTMLResponse)
+async def twiml_response(request: Request, variant: str = None):
+    """Serve the pre-rendered TwiML for the outgoing call."""
+    body, etag = twiml_cache.get(variant)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/xml", headers={"ETag": etag})
 
 @app.websocket("/media-stream")
 async def handle_media_stream(websocket: WebSocket):
@@ -130,298 +306,416 @@ async def handle_media_stream(websocket: WebSocket):
     print("Client connected")
     await websocket.accept()
 
-    session_id = websocket.headers.get('x-twilio-call-sid', f'session_{int(time.time())}')
-    session = sessions.get(session_id, {"transcript": '', "streamSid": None})
-    sessions[session_id] = session
+    session_id = websocket.headers.get('x-twilio-call-sid')
+    session = await sessions.claim_async(session_id) if session_id else None
+    if session is None:
+        session_id = session_id or f'session_{uuid.uuid4().hex}'
+        session = Session(session_id)
 
-    async with websockets.connect(
-        'wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01',
-        extra_headers={
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "OpenAI-Beta": "realtime=v1"
-        }
-    ) as openai_ws:
-        await initialize_session(openai_ws)
-
-        # Connection specific state
-        stream_sid = None
-        latest_media_timestamp = 0
-        last_assistant_item = None
-        mark_queue = []
-        response_start_timestamp_twilio = None
-        
-        # # @openai_ws.on('message')
-        # @websocket.on_event("message")
-        # async def on_openai_message(data):
-        #     try:
-        #         response = json.loads(data)
-
-        #         if response['type'] == 'response.audio.delta' and response.get('delta'):
-        #             await websocket.send_json({
-        #                 "event": "media",
-        #                 "streamSid": stream_sid,
-        #                 "media": {"payload": response['delta']}
-        #             })
-
-        #         if response['type'] == 'response.done':
-        #             agent_message = response['response']['output'][0].get('content', [{}])[0].get('transcript', 'Agent message not found')
-        #             session['transcript'] += f'Agent: {agent_message}\n'
-        #             logging.info('Agent (%s): %s', session_id, agent_message)
-
-        #         if response['type'] == 'conversation.item.input_audio_transcription.completed' and response.get('transcript'):
-        #             user_message = response['transcript'].strip()
-        #             session['transcript'] += f'User: {user_message}\n'
-        #             logging.info('User (%s): %s', session_id, user_message)
-
-        #         if response['type'] in LOG_EVENT_TYPES:
-        #             logging.info('Received event: %s', response)
-
-        #     except Exception as e:
-        #         logging.error('Error processing OpenAI message: %s, Raw message: %s', str(e), data)
-
-
-        async def receive_from_twilio():
-            """Receive audio data from Twilio and send it to the OpenAI Realtime API."""
-            nonlocal stream_sid, latest_media_timestamp
-            try:
-                async for message in websocket.iter_text():
-                    data = json.loads(message)
-                    if data['event'] == 'media' and openai_ws.open:
-                        latest_media_timestamp = int(data['media']['timestamp'])
-                        audio_append = {
-                            "type": "input_audio_buffer.append",
-                            "audio": data['media']['payload']
-                        }
-                        await openai_ws.send(json.dumps(audio_append))
-                    elif data['event'] == 'start':
-                        stream_sid = data['start']['streamSid']
-                        print(f"Incoming stream has started {stream_sid}")
-                        response_start_timestamp_twilio = None
-                        latest_media_timestamp = 0
-                        last_assistant_item = None
-                    elif data['event'] == 'mark':
-                        if mark_queue:
-                            mark_queue.pop(0)
-            except WebSocketDisconnect:
-                print("Client disconnected.")
-                if openai_ws.open:
-                    await openai_ws.close()
-                await on_close(session_id, session, openai_ws)
+    metrics.session_started()
+    try:
+        # Pooled sockets already have the session configured; only the greeting is per call
+        async with realtime_pool.connection() as openai_ws:
+            # A pre-rendered greeting is played when the stream starts instead
+            if "greeting" not in canned_audio:
+                await send_initial_conversation_item(openai_ws)
+
+            # Connection specific state
+            stream_sid = None
+            last_assistant_item = None
+            interrupted_item = None
+            playback = PlaybackTracker(MARK_INTERVAL_MS)
+            vad = LocalVAD(LOCAL_VAD_THRESHOLD_DB, LOCAL_VAD_HYSTERESIS_DB, LOCAL_VAD_ZCR_MAX, LOCAL_VAD_START_MS, LOCAL_VAD_STOP_MS) if LOCAL_VAD else None
+            media_frame = MediaFrameTemplate(stream_sid)
+            turn_timer = TurnTimer()
+            speculative = SpeculativeRetriever(
+                lambda query, timings: get_product_answer_async(query, timings=timings),
+                min_words=SPECULATIVE_MIN_WORDS,
+                threshold=SPECULATIVE_THRESHOLD,
+                max_starts=SPECULATIVE_MAX_STARTS,
+                stats=metrics.counters
+            )
+
+            # Both directions go through bounded queues drained by their own tasks, so a slow peer only backs up its own side
+            def render_twilio_media(payload):
+                if FAST_RELAY:
+                    # The delta is already base64 g711_ulaw, splice it into the pre-rendered frame
+                    return media_frame.render(payload)
+                return json_codec.dumps({
+                    "event": "media",
+                    "streamSid": stream_sid,
+                    "media": {
+                        "payload": payload
+                    }
+                })
 
-        async def send_to_twilio():
-            """Receive events from the OpenAI Realtime API, send audio back to Twilio."""
-            nonlocal stream_sid, last_assistant_item, response_start_timestamp_twilio
-            try:
-                async for openai_message in openai_ws:
-                    response = json.loads(openai_message)
-                    if response['type'] in LOG_EVENT_TYPES:
-                        print(f"Received event: {response['type']}", response)
-
-                    if response.get('type') == 'response.audio.delta' and 'delta' in response:
-                        audio_payload = base64.b64encode(base64.b64decode(response['delta'])).decode('utf-8')
-                        audio_delta = {
-                            "event": "media",
-                            "streamSid": stream_sid,
-                            "media": {
-                                "payload": audio_payload
-                            }
-                        }
-                        await websocket.send_json(audio_delta)
-
-                        if response_start_timestamp_twilio is None:
-                            response_start_timestamp_twilio = latest_media_timestamp
-                            if SHOW_TIMING_MATH:
-                                print(f"Setting start timestamp for new response: {response_start_timestamp_twilio}ms")
-
-                        # Update last_assistant_item safely
-                        if response.get('item_id'):
-                            # last_assistant_item = response['item_id']
-                            last_assistant_item = response.get('item_id')
-
-                        await send_mark(websocket, stream_sid)
-
-                    # # Handle customer query
-                    # if response.get('type') == 'conversation.item.input_audio_transcription.completed' and response.get('transcript'):
-                    #     user_message = response['transcript'].strip()
-                    #     query = user_message.lower().replace("query", "").strip()
-                    #     pinecone_results = get_product_info_from_pinecone(query)
-                    #     response_text = "Here are the results from Pinecone: " + ", ".join([result['metadata']['product_info'] for result in pinecone_results])
-                    #     print(f"User query: {user_message}, Pinecone results: {response_text}")
-                    #     await send_response_to_twilio(response_text)
-
-
-                    # Handle customer query
-                    if response.get('type') == 'conversation.item.input_audio_transcription.completed' and response.get('transcript'):
-                        user_message = response['transcript'].strip()
-                        print(f"User Message: {user_message}")
-                        logging.info(f"User Message: {user_message}")
-
-                        # Add user message to the transcript
-                        session['transcript'] += f"\nUser: {user_message}"
-                        print(f"Updated Transcript: {session['transcript']}")
-                        logging.info(f"Updated Transcript: {session['transcript']}")
-
-                        query = user_message.lower().replace("query", "").strip()
-                        logging.info(f"Query: {query}")
-
-                        try:
-                            pinecone_results = get_product_info_from_pinecone(query)
-                            logging.info(f"Pinecone Results: {pinecone_results}")
-
-                            if pinecone_results:
-                                response_text = "Here are the results from Pinecone: " + ", ".join([result['metadata']['product_info'] for result in pinecone_results])
-                            else:
-                                response_text = "No results found in Pinecone for your query."
-
-                            print(f"Pinecone Query Results for '{query}': {response_text}")
-                            logging.info(f"Pinecone Query Results for '{query}': {response_text}")
-
-                            await send_response_to_twilio(response_text)
-                        except Exception as e:
-                            logging.error(f"Error querying Pinecone: {e}")
-                            await send_response_to_twilio("Sorry, there was an error processing your request.")
-
-                    # Log user speech
-                    if response.get('type') == 'input_audio_buffer.speech_stopped' and response.get('transcript'):
-                        user_transcript = response['transcript'].strip()
-                        print(f"User Transcript: {user_transcript}")
-                        session['transcript'] += f"\nUser: {user_transcript}"
-                        print(f"Updated Transcript: {session['transcript']}")
-                        logging.info(f"Updated Transcript: {session['transcript']}")
-
-                    # Trigger an interruption. Your use case might work better using `input_audio_buffer.speech_stopped`, or combining the two.
-                    if response.get('type') == 'input_audio_buffer.speech_started':
-                        print("Speech started detected.")
-                        if last_assistant_item:
-                            print(f"Interrupting response with id: {last_assistant_item}")
-                            await handle_speech_started_event()
-            except Exception as e:
-                print(f"Error in send_to_twilio: {e}")
-                await on_close(session_id, session, openai_ws)
+            def render_openai_audio(payload):
+                if FAST_RELAY:
+                    return input_audio_append(payload)
+                return json_codec.dumps({
+                    "type": "input_audio_buffer.append",
+                    "audio": payload
+                })
 
-        async def send_response_to_twilio(response_text):
-            """Send a text response to Twilio."""
-            response_item = {
-                "type": "conversation.item.create",
-                "item": {
-                    "type": "message",
-                    "role": "assistant",
-                    "content": [
-                        {
-                            "type": "input_text",
-                            "text": response_text
-                        }
-                    ]
+            to_openai = SendQueue(openai_ws.send, render_openai_audio, max_size=SEND_QUEUE_SIZE, policy=SEND_QUEUE_POLICY, stats=metrics.counters)
+            to_twilio = SendQueue(websocket.send_text, render_twilio_media, max_size=SEND_QUEUE_SIZE, policy=SEND_QUEUE_POLICY, stats=metrics.counters)
+            active_streams[session] = {"to_openai": to_openai, "to_twilio": to_twilio}
+
+            # # @openai_ws.on('message')
+            # @websocket.on_event("message")
+            # async def on_openai_message(data):
+            #     try:
+            #         response = json.loads(data)
+
+            #         if response['type'] == 'response.audio.delta' and response.get('delta'):
+            #             await websocket.send_json({
+            #                 "event": "media",
+            #                 "streamSid": stream_sid,
+            #                 "media": {"payload": response['delta']}
+            #             })
+
+            #         if response['type'] == 'response.done':
+            #             agent_message = response['response']['output'][0].get('content', [{}])[0].get('transcript', 'Agent message not found')
+            #             session.transcript.add("Agent", agent_message)
+            #             logging.info('Agent (%s): %s', session_id, agent_message)
+
+            #         if response['type'] == 'conversation.item.input_audio_transcription.completed' and response.get('transcript'):
+            #             user_message = response['transcript'].strip()
+            #             session.transcript.add("User", user_message)
+            #             logging.info('User (%s): %s', session_id, user_message)
+
+            #         if response['type'] in LOG_EVENT_TYPES:
+            #             logging.info('Received event: %s', response)
+
+            #     except Exception as e:
+            #         logging.error('Error processing OpenAI message: %s, Raw message: %s', str(e), data)
+
+
+            async def receive_from_twilio():
+                """Receive audio data from Twilio and send it to the OpenAI Realtime API."""
+                nonlocal stream_sid, media_frame, last_assistant_item, session_id
+                try:
+                    async for message in websocket.iter_text():
+                        # Fast path: forward the media payload without parsing or re-serializing the frame
+                        if FAST_RELAY:
+                            media = extract_media(message)
+                            if media is not None:
+                                audio_payload, _ = media
+                                to_openai.put_audio(audio_payload)
+                                metrics.frames_in.add()
+                                if vad is not None:
+                                    await detect_barge_in(audio_payload)
+                                continue
+
+                        data = json_codec.loads(message)
+                        if data['event'] == 'media':
+                            to_openai.put_audio(data['media']['payload'])
+                            metrics.frames_in.add()
+                            if vad is not None:
+                                await detect_barge_in(data['media']['payload'])
+                        elif data['event'] == 'start':
+                            stream_sid = data['start']['streamSid']
+                            media_frame = MediaFrameTemplate(stream_sid)
+                            session.stream_sid = stream_sid
+                            # Twilio sends the call SID in the start event; pick up the /make-call details by it
+                            call_sid = data['start'].get('callSid')
+                            if call_sid and call_sid != session.call_sid:
+                                pending = await sessions.claim_async(call_sid)
+                                if pending is not None:
+                                    session.call_sid = session_id = call_sid
+                                    # Turns are logged under the transcript's call SID, so switch it from the placeholder too
+                                    session.transcript.call_sid = call_sid
+                                    session.name = pending.name
+                                    session.contact_number = pending.contact_number
+                            print(f"Incoming stream has started {stream_sid}")
+                            playback.reset()
+                            last_assistant_item = None
+                            play_canned("greeting")
+                        elif data['event'] == 'mark':
+                            playback.acknowledge(data['mark'].get('name'))
+                except WebSocketDisconnect:
+                    print("Client disconnected.")
+
+            async def send_to_twilio():
+                """Receive events from the OpenAI Realtime API, send audio back to Twilio."""
+                nonlocal stream_sid, last_assistant_item
+                try:
+                    async for openai_message in openai_ws:
+                        response = json_codec.loads(openai_message)
+                        if response['type'] in LOG_EVENT_TYPES:
+                            print(f"Received event: {response['type']}", response)
+
+                        # Deltas already in flight for an item the caller talked over
+                        if response.get('type') == 'response.audio.delta' and interrupted_item and response.get('item_id') == interrupted_item:
+                            continue
+
+                        if response.get('type') == 'response.audio.delta' and 'delta' in response:
+                            # Update last_assistant_item safely; a new item's audio starts where the queued audio ends
+                            if response.get('item_id') and response['item_id'] != last_assistant_item:
+                                last_assistant_item = response['item_id']
+
+                            # Playback is accounted for once the queue sends the delta, so audio it drops doesn't count
+                            to_twilio.put_audio(response['delta'], partial(audio_sent, response['delta'], response.get('item_id')))
+                            metrics.frames_out.add()
+                            turn_timer.audio_delta()
+
+                        if response.get('type') == 'response.audio.done':
+                            to_twilio.put(None, lambda: mark_message(playback.end_of_response()))
+
+                        # # Handle customer query
+                        # if response.get('type') == 'conversation.item.input_audio_transcription.completed' and response.get('transcript'):
+                        #     user_message = response['transcript'].strip()
+                        #     query = user_message.lower().replace("query", "").strip()
+                        #     pinecone_results = get_product_info_from_pinecone(query)
+                        #     response_text = "Here are the results from Pinecone: " + ", ".join([result['metadata']['product_info'] for result in pinecone_results])
+                        #     print(f"User query: {user_message}, Pinecone results: {response_text}")
+                        #     await send_response_to_twilio(response_text)
+
+
+                        # Start looking up the partial transcript while the caller's audio is still being transcribed
+                        if SPECULATIVE_RETRIEVAL and response.get('type') == 'conversation.item.input_audio_transcription.delta' and response.get('delta'):
+                            speculative.add_partial(response.get('item_id'), response['delta'])
+
+                        # Handle customer query
+                        if response.get('type') == 'conversation.item.input_audio_transcription.completed' and response.get('transcript'):
+                            turn_timer.mark('transcribed')
+                            user_message = response['transcript'].strip()
+                            print(f"User Message: {user_message}")
+
+                            # Add user message to the transcript (logs just this turn)
+                            session.transcript.add("User", user_message)
+
+                            query = normalize_query(user_message)
+                            logging.info(f"Query: {query}")
+
+                            try:
+                                timings = {}
+                                answer = await speculative.result(query, timings, response.get('item_id'))
+                                # Cached and lexical answers never embed the query; their embedding stage counts as 0 so every turn is in the percentiles
+                                turn_timer.mark('embedded', timings.get('embedded', turn_timer.marks.get('transcribed')))
+                                turn_timer.mark('retrieved')
+                                path = f"retrieval_{timings.get('path', 'vector')}"
+                                metrics.counters[path] = metrics.counters.get(path, 0) + 1
+                                logging.info(f"Pinecone Results: {answer['results']}")
+
+                                # The answer text is assembled (and cached) with the results
+                                response_text = answer['answer'] or UTTERANCES["no_results"]
+
+                                print(f"Pinecone Query Results for '{query}': {response_text}")
+                                logging.info(f"Pinecone Query Results for '{query}': {response_text}")
+
+                                if answer['answer']:
+                                    await send_response_to_twilio(response_text)
+                                else:
+                                    await send_utterance("no_results")
+                            except asyncio.TimeoutError:
+                                logging.error(f"Timed out querying Pinecone for '{query}'")
+                                await send_utterance("error")
+                            except Exception as e:
+                                logging.error(f"Error querying Pinecone: {e}")
+                                await send_utterance("error")
+
+                        if response.get('type') == 'input_audio_buffer.speech_stopped':
+                            turn_timer.mark('speech_stopped')
+
+                        # Log user speech
+                        if response.get('type') == 'input_audio_buffer.speech_stopped' and response.get('transcript'):
+                            user_transcript = response['transcript'].strip()
+                            print(f"User Transcript: {user_transcript}")
+                            session.transcript.add("User", user_transcript)
+
+                        # Record what the agent said
+                        if response.get('type') == 'response.done':
+                            for item in response.get('response', {}).get('output', []):
+                                for content in item.get('content', []):
+                                    if content.get('transcript'):
+                                        session.transcript.add("Agent", content['transcript'])
+
+                        # Trigger an interruption. Your use case might work better using `input_audio_buffer.speech_stopped`, or combining the two.
+                        if response.get('type') == 'input_audio_buffer.speech_started':
+                            print("Speech started detected.")
+                            if last_assistant_item or audio_pending():
+                                print(f"Interrupting response with id: {last_assistant_item}")
+                                await handle_speech_started_event()
+                except Exception as e:
+                    print(f"Error in send_to_twilio: {e}")
+
+            async def send_response_to_twilio(response_text):
+                """Send a text response to Twilio."""
+                response_item = {
+                    "type": "conversation.item.create",
+                    "item": {
+                        "type": "message",
+                        "role": "assistant",
+                        "content": [
+                            {
+                                "type": "input_text",
+                                "text": response_text
+                            }
+                        ]
+                    }
                 }
-            }
-            await openai_ws.send(json.dumps(response_item))
-            await openai_ws.send(json.dumps({"type": "response.create"}))        
+                to_openai.put(json_codec.dumps(response_item))
+                to_openai.put(json_codec.dumps({"type": "response.create"}))
+                turn_timer.mark('response_created')
+
+            def play_canned(name):
+                """Stream a pre-rendered utterance to Twilio and add it to the conversation; False if there is no audio for it."""
+                frames = canned_audio.frames(name)
+                if not frames or not stream_sid:
+                    return False
+                # Sent as ready messages so the overflow policy never drops part of them; a clear still flushes them
+                for frame in frames:
+                    to_twilio.put(media_frame.render(frame), partial(audio_sent, frame))
+                    metrics.frames_out.add()
+                to_twilio.put(None, lambda: mark_message(playback.end_of_response()))
+                turn_timer.audio_delta()
+
+                # The model didn't say this, so tell it what the caller heard
+                to_openai.put(json_codec.dumps({
+                    "type": "conversation.item.create",
+                    "item": {
+                        "type": "message",
+                        "role": "assistant",
+                        "content": [{"type": "text", "text": UTTERANCES[name]}]
+                    }
+                }))
+                session.transcript.add("Agent", UTTERANCES[name])
+                return True
+
+            async def send_utterance(name):
+                """Say one of the fixed UTTERANCES, from the audio cache when possible."""
+                if not play_canned(name):
+                    await send_response_to_twilio(UTTERANCES[name])
         
-        async def handle_speech_started_event():
-            """Handle interruption when the caller's speech starts."""
-            nonlocal response_start_timestamp_twilio, last_assistant_item
-            print("Handling speech started event.")
-            if mark_queue and response_start_timestamp_twilio is not None:
-                elapsed_time = latest_media_timestamp - response_start_timestamp_twilio
-                if SHOW_TIMING_MATH:
-                    print(f"Calculating elapsed time for truncation: {latest_media_timestamp} - {response_start_timestamp_twilio} = {elapsed_time}ms")
-
-                if last_assistant_item:
+            async def detect_barge_in(audio_payload):
+                """Interrupt playback as soon as the local VAD hears the caller start talking."""
+                if vad.process(audio_payload) == "start" and audio_pending():
+                    print("Speech started detected locally.")
+                    metrics.counters["local_barge_ins"] = metrics.counters.get("local_barge_ins", 0) + 1
+                    await handle_speech_started_event(cancel_response=True)
+
+            async def handle_speech_started_event(cancel_response=False):
+                """Handle interruption when the caller's speech starts."""
+                nonlocal last_assistant_item, interrupted_item
+                print("Handling speech started event.")
+                if audio_pending():
+                    # The server VAD cancels the response itself; a local detection has to ask for it
+                    if cancel_response:
+                        to_openai.put(json_codec.dumps({"type": "response.cancel"}))
+                    elapsed_time = playback.item_elapsed_ms(last_assistant_item)
                     if SHOW_TIMING_MATH:
-                        print(f"Truncating item with ID: {last_assistant_item}, Truncated at: {elapsed_time}ms")
+                        print(f"Playback position for truncation: {playback.position():.0f}ms of {playback.sent_ms:.0f}ms sent, {elapsed_time}ms into the item")
 
-                    truncate_event = {
-                        "type": "conversation.item.truncate",
-                        "item_id": last_assistant_item,
-                        "content_index": 0,
-                        "audio_end_ms": elapsed_time
-                    }
-                    await openai_ws.send(json.dumps(truncate_event))
+                    if last_assistant_item:
+                        if SHOW_TIMING_MATH:
+                            print(f"Truncating item with ID: {last_assistant_item}, Truncated at: {elapsed_time}ms")
 
-                await websocket.send_json({
-                    "event": "clear",
-                    "streamSid": stream_sid
-                })
-
-                mark_queue.clear()
-                last_assistant_item = None
-                response_start_timestamp_twilio = None
-
-        async def send_mark(connection, stream_sid):
-            if stream_sid:
-                mark_event = {
-                    "event": "mark",
-                    "streamSid": stream_sid,
-                    "mark": {"name": "responsePart"}
-                }
-                await connection.send_json(mark_event)
-                mark_queue.append('responsePart')
-
-        await asyncio.gather(receive_from_twilio(), send_to_twilio())
-
-        # @websocket.on('close')
-        @websocket.on_event("close")
-        async def on_close(session_id, session, openai_ws):
-            logging.info('on_close called with session_id: %s', session_id)
-            if openai_ws.ready_state == openai_ws.OPEN:
-                await openai_ws.close()
-            logging.info('Client disconnected (%s).', session_id)
-            logging.info('Full Transcript:')
-            logging.info(session['transcript'])
-
-            logging.info('Final Caller Number: %s', session['contact_number'])
-
-            # Extract required information from the transcript
-            # This is a placeholder. You need to implement the actual extraction logic.
-            interested_in_home_loan = "Yes"
-            time_period_of_loan = "15 years"
-            location_of_home = "New Delhi"
-            any_other_home_loan = "No"
-
-            logging.info("Storing data in database")
-            await store_in_database({
-                "name": session['name'],
-                "contact_number": session['contact_number'],
-                "interested_in_home_loan": interested_in_home_loan,
-                "time_period_of_loan": time_period_of_loan,
-                "location_of_home": location_of_home,
-                "any_other_home_loan": any_other_home_loan,
-                # "transcript": session['transcript']
-            })
-
-            del sessions[session_id]
-
-        @openai_ws.on('error')
-        # @websocket.on_event("error")
-        async def on_error(error):
-            logging.error('Error in the OpenAI WebSocket: %s', str(error))
-            await on_close(session_id, session, openai_ws)
-
-        async def send_error_response():
-            await openai_ws.send_json({
-                "type": "response.create",
-                "response": {
-                    "modalities": ["text", "audio"],
-                    "instructions": "I apologize, but I'm having trouble processing your request right now. Is there anything else I can help you with?",
-                }
-            })
+                        truncate_event = {
+                            "type": "conversation.item.truncate",
+                            "item_id": last_assistant_item,
+                            "content_index": 0,
+                            "audio_end_ms": elapsed_time
+                        }
+                        to_openai.put(json_codec.dumps(truncate_event))
+
+                    # Audio still waiting in our queue would play after the clear, so drop it too
+                    to_twilio.clear()
+                    to_twilio.put(json_codec.dumps({
+                        "event": "clear",
+                        "streamSid": stream_sid
+                    }))
+
+                    playback.reset()
+                    interrupted_item = last_assistant_item
+                    last_assistant_item = None
+
+            def audio_sent(payload, item_id=None):
+                """Account for audio the queue has sent to Twilio; returns the mark to send right behind it, if one is due."""
+                if item_id is not None and item_id != playback.item_id:
+                    # A new item's audio starts where the audio already sent ends
+                    playback.start_item(item_id)
+                    if SHOW_TIMING_MATH:
+                        print(f"New response item {item_id} starts at {playback.sent_ms:.0f}ms of stream audio")
+                return mark_message(playback.add_audio(payload))
+
+            def audio_pending():
+                """True while Twilio is playing our audio or some is still queued to be sent."""
+                return playback.playing() or len(to_twilio) > 0
+
+            def mark_message(name):
+                if stream_sid and name:
+                    return json_codec.dumps({
+                        "event": "mark",
+                        "streamSid": stream_sid,
+                        "mark": {"name": name}
+                    })
+                return None
+
+            async def on_close(session_id, session, openai_ws):
+                logging.info('on_close called with session_id: %s', session_id)
+                if openai_ws.open:
+                    await openai_ws.close()
+                logging.info('Client disconnected (%s).', session_id)
+                transcript = session.transcript.render()
+                # Every turn was already logged as it happened; the full text is only repeated when debugging
+                logging.info('Transcript (%s): %d turns, %d characters', session.call_sid, len(session.transcript), len(transcript))
+                logging.debug('Full Transcript:\n%s', transcript)
+
+                logging.info('Final Caller Number: %s', session.contact_number)
+
+                # The extraction workers fill in the loan details from the transcript and then store the row
+                logging.info("Queueing call for extraction")
+                await extraction_pipeline.submit({
+                    "call_sid": session.call_sid,
+                    "name": session.name,
+                    "contact_number": session.contact_number,
+                    "transcript": transcript
+                }, session.transcript.messages())
+
+            async def send_error_response():
+                to_openai.put(json_codec.dumps({
+                    "type": "response.create",
+                    "response": {
+                        "modalities": ["text", "audio"],
+                        "instructions": "I apologize, but I'm having trouble processing your request right now. Is there anything else I can help you with?",
+                    }
+                }))
+
+            # Whichever side finishes first (caller hung up, OpenAI closed, a send failed) ends the call for both
+            tasks = [
+                asyncio.create_task(receive_from_twilio()),
+                asyncio.create_task(send_to_twilio()),
+                asyncio.create_task(to_openai.run()),
+                asyncio.create_task(to_twilio.run()),
+            ]
+            try:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                for result in await asyncio.gather(*tasks, return_exceptions=True):
+                    # A peer hanging up mid-send is the normal end of a call, not a relay failure
+                    if isinstance(result, Exception) and not isinstance(result, (WebSocketDisconnect, websockets.exceptions.ConnectionClosed)):
+                        logging.error('Error relaying call %s: %s', session_id, str(result))
+                active_streams.pop(session, None)
+                logging.info('Send queues for %s: %s', session_id, {"to_openai": to_openai.stats(), "to_twilio": to_twilio.stats()})
+                await on_close(session_id, session, openai_ws)
+    finally:
+        metrics.session_ended()
 
 logging.basicConfig(level=logging.INFO)
 async def store_in_database(data):
-    logging.info("Inserting data into database: %s", data)
-    conn = sqlite3.connect('callbot.db', check_same_thread=False)
-    try:
-        c = conn.cursor()
-        c.execute('''
-            INSERT INTO call_details (name, contact_number, interested_in_home_loan, time_period_of_loan, location_of_home, any_other_home_loan, transcript)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (data['name'], data['contact_number'], data['interested_in_home_loan'], data['time_period_of_loan'], data['location_of_home'], data['any_other_home_loan'], data['transcript']))
-        conn.commit()
-        logging.info("Data inserted into call_details table: %s", data)
-    except Exception as e:
-        logging.error("Error inserting data into database: %s", str(e))
-    finally:
-        conn.close()
+    """Queue a call_details row; the writer inserts it with the next batch."""
+    logging.info("Queueing data for database: %s", data)
+    await call_writer.submit(data)
+
+# Post-call field extraction: regex first, then (optionally) an LLM for whatever is still missing
+if EXTRACTION_LLM:
+    extractor = ChainedExtractor(RegexExtractor(), LLMExtractor())
+else:
+    extractor = RegexExtractor()
+extraction_pipeline = ExtractionPipeline(extractor, store_in_database, workers=EXTRACTION_WORKERS)
 
 async def send_initial_conversation_item(openai_ws):
     """Send initial conversation item if AI talks first."""
@@ -433,21 +727,32 @@ async def send_initial_conversation_item(openai_ws):
             "content": [
                 {
                     "type": "input_text",
-                    "text": "Hello there! I am an AI voice assistant powered by Twilio and the OpenAI Realtime API. I will ask you a few questions to assist our loan officer. Are you interested in a home loan?"
+                    "text": UTTERANCES["greeting"]
                 }
             ]
         }
     }
-    await openai_ws.send(json.dumps(initial_conversation_item))
-    await openai_ws.send(json.dumps({"type": "response.create"}))
+    await openai_ws.send(json_codec.dumps(initial_conversation_item))
+    await openai_ws.send(json_codec.dumps({"type": "response.create"}))
+
 
+async def connect_realtime():
+    """Open a websocket to the OpenAI Realtime API."""
+    return await websockets.connect(
+        OPENAI_REALTIME_URL,
+        extra_headers={
+            "Authorization": f"Bearer {OPENAI_API_KEY}",
+            "OpenAI-Beta": "realtime=v1"
+        }
+    )
 
-async def initialize_session(openai_ws):
+async def initialize_session(openai_ws, greet=True):
     """Send initial session with OpenAI."""
     session_update = {
         "type": "session.update",
         "session": {
             "turn_detection": {"type": "server_vad"},
+            "input_audio_transcription": {"model": TRANSCRIPTION_MODEL},
             "input_audio_format": "g711_ulaw",
             "output_audio_format": "g711_ulaw",
             "voice": VOICE,
@@ -457,10 +762,20 @@ async def initialize_session(openai_ws):
         }
     }
     print('Sending session update:', json.dumps(session_update))
-    await openai_ws.send(json.dumps(session_update))
+    await openai_ws.send(json_codec.dumps(session_update))
 
     # Uncomment the next line to have the AI speak first
-    await send_initial_conversation_item(openai_ws)
+    if greet:
+        await send_initial_conversation_item(openai_ws)
+
+# Pooled sockets skip the greeting: it would be generated (and billed) before anyone is on the line
+realtime_pool = RealtimePool(
+    connect_realtime,
+    lambda openai_ws: initialize_session(openai_ws, greet=False),
+    size=REALTIME_POOL_SIZE,
+    max_age=REALTIME_POOL_MAX_AGE,
+    check_interval=REALTIME_POOL_CHECK_INTERVAL
+)
 
 if __name__ == "__main__":
     import uvicorn
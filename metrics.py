@@ -0,0 +1,157 @@
+import time
+import bisect
+from collections import deque
+
+# Histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+# (histogram, start mark, end mark) for each stage of a caller turn
+TURN_STAGES = (
+    ("transcription", "speech_stopped", "transcribed"),
+    ("embedding", "transcribed", "embedded"),
+    ("retrieval", "embedded", "retrieved"),
+    ("response_create", "retrieved", "response_created"),
+    ("first_audio", "response_created", "first_audio"),
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is a bisect and two additions."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value_ms):
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def snapshot(self):
+        # A quantile in the overflow bucket has no finite bound; report it as null
+        def bound(value):
+            return None if value == float("inf") else value
+
+        return {
+            "count": self.count,
+            "mean_ms": self.sum / self.count if self.count else 0.0,
+            "p50_ms": bound(self.quantile(0.5)),
+            "p90_ms": bound(self.quantile(0.9)),
+            "p99_ms": bound(self.quantile(0.99)),
+            "buckets": {("+Inf" if bound == float("inf") else str(bound)): count
+                        for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class RateCounter:
+    """Monotonic counter that also keeps per-second buckets for a recent rate."""
+
+    def __init__(self, window=60):
+        self.total = 0
+        self._window = window
+        self._second = 0
+        self._current = 0
+        self._history = deque(maxlen=window)
+
+    def add(self, n=1):
+        second = int(time.monotonic())
+        if second != self._second:
+            self._roll(second)
+        self._current += n
+        self.total += n
+
+    def _roll(self, second):
+        if self._second:
+            self._history.append(self._current)
+            # Seconds without any traffic still count towards the window
+            for _ in range(min(second - self._second - 1, self._window)):
+                self._history.append(0)
+        self._second = second
+        self._current = 0
+
+    def rate(self):
+        """Average per second over the completed seconds in the window."""
+        if int(time.monotonic()) != self._second:
+            self._roll(int(time.monotonic()))
+        return sum(self._history) / len(self._history) if self._history else 0.0
+
+
+class Metrics:
+    """Process-wide call metrics exposed on /metrics."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {name: Histogram() for name, _, _ in TURN_STAGES}
+        self.stages["turn_total"] = Histogram()
+        self.active_sessions = 0
+        self.sessions_total = 0
+        self.frames_in = RateCounter()
+        self.frames_out = RateCounter()
+        self.counters = {}
+
+    def session_started(self):
+        self.active_sessions += 1
+        self.sessions_total += 1
+
+    def session_ended(self):
+        self.active_sessions -= 1
+
+    def snapshot(self):
+        return {
+            "uptime_s": time.time() - self.started,
+            "active_sessions": self.active_sessions,
+            "sessions_total": self.sessions_total,
+            "frames_in": {"total": self.frames_in.total, "per_second": self.frames_in.rate()},
+            "frames_out": {"total": self.frames_out.total, "per_second": self.frames_out.rate()},
+            "turn_latency": {name: histogram.snapshot() for name, histogram in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+metrics = Metrics()
+
+
+class TurnTimer:
+    """Per-session timestamps for the current caller turn, folded into the stage histograms."""
+
+    def __init__(self, registry=metrics):
+        self.registry = registry
+        self.marks = {}
+        self.total_recorded = False
+
+    def mark(self, name, at=None):
+        if name == "speech_stopped":
+            # A new caller turn starts; drop whatever the last one didn't finish
+            self.marks = {}
+            self.total_recorded = False
+        self.marks[name] = at if at is not None else time.perf_counter()
+
+    def audio_delta(self):
+        """Call on every response.audio.delta; only the first one per turn does any work."""
+        if not self.marks:
+            return
+        now = time.perf_counter()
+        if not self.total_recorded and "speech_stopped" in self.marks:
+            self.registry.stages["turn_total"].observe((now - self.marks["speech_stopped"]) * 1000)
+            self.total_recorded = True
+        if "response_created" in self.marks:
+            self.marks["first_audio"] = now
+            for name, start, end in TURN_STAGES:
+                # A reused speculative lookup can finish before the stage that would normally precede it
+                if start in self.marks and end in self.marks and self.marks[end] >= self.marks[start]:
+                    self.registry.stages[name].observe((self.marks[end] - self.marks[start]) * 1000)
+            self.marks = {}
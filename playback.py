@@ -0,0 +1,99 @@
+import time
+from collections import deque
+
+# g711 u-law at 8 kHz: one byte per sample
+ULAW_BYTES_PER_MS = 8
+
+
+# Function to get the duration of a base64 u-law payload without decoding it
+def payload_ms(payload):
+    padding = len(payload) - len(payload.rstrip("="))
+    return (len(payload) * 3 // 4 - padding) / ULAW_BYTES_PER_MS
+
+
+class PlaybackTracker:
+    """Follows how far Twilio has played the response audio sent on one stream.
+
+    Positions are milliseconds of audio since the stream started (or was last cleared). A mark is
+    requested every mark_interval_ms of audio and at the end of each response; Twilio echoes it
+    back when playback reaches it, which re-anchors the estimate. Between echoes, playback is
+    assumed to advance in real time and never past the audio that was sent. Audio is accounted for
+    when the send queue actually sends it, so audio it drops under backpressure never counts.
+    """
+
+    def __init__(self, mark_interval_ms=500, clock=time.monotonic):
+        self.mark_interval_ms = mark_interval_ms
+        self.clock = clock
+        self.marks_sent = 0
+        self._sequence = 0
+        self.reset()
+
+    def reset(self):
+        """Forget all queued audio, e.g. after a clear."""
+        self.sent_ms = 0.0
+        self._pending = deque()  # (mark name, position) sent but not yet echoed
+        self._last_mark_ms = 0.0
+        self._anchor_ms = 0.0
+        self._anchor_at = self.clock()
+        self._item_start_ms = 0.0
+        self.item_id = None
+
+    def start_item(self, item_id=None):
+        """A new assistant item's audio starts at the current end of the sent audio."""
+        self.item_id = item_id
+        self._item_start_ms = self.sent_ms
+
+    def add_audio(self, payload):
+        """Account for an audio delta sent to Twilio; returns a mark name to send after it, or None."""
+        now = self.clock()
+        if self.position(now) >= self.sent_ms:
+            # Twilio ran out of audio, so playback resumes with this delta
+            self._anchor_ms = self.sent_ms
+            self._anchor_at = now
+        self.sent_ms += payload_ms(payload)
+        if self.mark_interval_ms and self.sent_ms - self._last_mark_ms >= self.mark_interval_ms:
+            return self._mark()
+        return None
+
+    def end_of_response(self):
+        """Returns a mark name covering the audio sent since the last mark, or None if there is none."""
+        if self.sent_ms > self._last_mark_ms:
+            return self._mark()
+        return None
+
+    def acknowledge(self, name):
+        """Twilio played up to the mark `name`; marks from before a reset are ignored."""
+        if not any(pending == name for pending, _ in self._pending):
+            return
+        while self._pending:
+            pending, position = self._pending.popleft()
+            if pending == name:
+                self._anchor_ms = position
+                self._anchor_at = self.clock()
+                return
+
+    def position(self, now=None):
+        """Estimated playback position in ms."""
+        if now is None:
+            now = self.clock()
+        return min(self.sent_ms, self._anchor_ms + (now - self._anchor_at) * 1000)
+
+    def playing(self):
+        return bool(self._pending) or self.position() < self.sent_ms
+
+    def item_elapsed_ms(self, item_id=None):
+        """How much of the current item's audio has been played, for conversation.item.truncate.
+
+        0 for an item other than the one started last, i.e. one none of whose audio has been sent yet.
+        """
+        if item_id is not None and item_id != self.item_id:
+            return 0
+        return max(0, int(self.position() - self._item_start_ms))
+
+    def _mark(self):
+        self._sequence += 1
+        self.marks_sent += 1
+        name = f"audio-{self._sequence}"
+        self._pending.append((name, self.sent_ms))
+        self._last_mark_ms = self.sent_ms
+        return name
@@ -0,0 +1,130 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class RealtimePool:
+    """Keeps `size` Realtime API sockets connected and initialized so a new call doesn't wait for the handshake.
+
+    connect() opens a socket and initialize(ws) prepares it (session.update). Idle sockets are
+    pinged every check_interval seconds and recycled after max_age seconds; the pool is refilled
+    in the background whenever a socket is handed out.
+    """
+
+    def __init__(self, connect, initialize, size=2, max_age=90, check_interval=15, ping_timeout=5):
+        self.connect = connect
+        self.initialize = initialize
+        self.size = size
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.ping_timeout = ping_timeout
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self._idle = deque()  # (ws, opened_at)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._stopping = False
+
+    async def start(self):
+        self._stopping = False
+        if self.size > 0:
+            self._task = asyncio.create_task(self._maintain())
+
+    async def stop(self):
+        # On Python < 3.12, wait_for() swallows a cancel that lands as the wakeup event fires, so
+        # the maintenance loop also checks this flag rather than relying on the cancel alone
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._idle:
+            ws, _ = self._idle.popleft()
+            await self._close(ws)
+
+    async def acquire(self):
+        """A ready socket from the pool, or a freshly opened one if none is available."""
+        while self._idle:
+            ws, opened = self._idle.popleft()
+            self._wakeup.set()
+            if ws.open and time.monotonic() - opened < self.max_age:
+                self.hits += 1
+                return ws
+            self.recycled += 1
+            await self._close(ws)
+        self.misses += 1
+        return await self._open()
+
+    @asynccontextmanager
+    async def connection(self):
+        """acquire() a socket for the duration of a call and close it afterwards; sockets are never reused."""
+        ws = await self.acquire()
+        try:
+            yield ws
+        finally:
+            await self._close(ws)
+
+    def stats(self):
+        return {"idle": len(self._idle), "hits": self.hits, "misses": self.misses, "recycled": self.recycled}
+
+    async def _open(self):
+        ws = await self.connect()
+        try:
+            await self.initialize(ws)
+        except Exception:
+            await self._close(ws)
+            raise
+        return ws
+
+    async def _close(self, ws):
+        try:
+            await ws.close()
+        except Exception:
+            pass
+
+    async def _maintain(self):
+        backoff = 1.0
+        while not self._stopping:
+            await self._check_idle()
+            missing = self.size - len(self._idle)
+            if missing > 0:
+                opened = await asyncio.gather(*(self._open() for _ in range(missing)), return_exceptions=True)
+                failures = 0
+                for ws in opened:
+                    if isinstance(ws, BaseException):
+                        failures += 1
+                        logging.error("Error pre-connecting Realtime socket: %s", str(ws))
+                    else:
+                        self._idle.append((ws, time.monotonic()))
+                if failures:
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 60.0)
+                    continue
+                backoff = 1.0
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _check_idle(self):
+        """Drop idle sockets that are too old or don't answer a ping."""
+        now = time.monotonic()
+        for _ in range(len(self._idle)):
+            ws, opened = self._idle.popleft()
+            healthy = ws.open and now - opened < self.max_age
+            if healthy:
+                try:
+                    pong = await ws.ping()
+                    await asyncio.wait_for(pong, self.ping_timeout)
+                except Exception:
+                    healthy = False
+            if healthy:
+                self._idle.append((ws, opened))
+            else:
+                self.recycled += 1
+                await self._close(ws)
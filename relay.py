@@ -0,0 +1,46 @@
+from json_codec import dumps
+
+# Twilio media frames look like
+#   {"event":"media","sequenceNumber":"3","media":{"track":"inbound","chunk":"1","timestamp":"5","payload":"..."},"streamSid":"MZ..."}
+# The payload is base64, so it never contains a quote or backslash and can be sliced out and spliced in as-is.
+_MEDIA_EVENT = '"event":"media"'
+_PAYLOAD_KEY = '"payload":"'
+_TIMESTAMP_KEY = '"timestamp":"'
+
+
+# Function to pull the payload and timestamp out of a Twilio media frame without parsing it
+def extract_media(message):
+    """Returns (payload, timestamp) for a media frame, or None if the message should be parsed normally."""
+    if _MEDIA_EVENT not in message[:40]:
+        return None
+    start = message.find(_PAYLOAD_KEY)
+    if start == -1:
+        return None
+    start += len(_PAYLOAD_KEY)
+    end = message.find('"', start)
+    timestamp_start = message.find(_TIMESTAMP_KEY)
+    if end == -1 or timestamp_start == -1:
+        return None
+    timestamp_start += len(_TIMESTAMP_KEY)
+    timestamp_end = message.find('"', timestamp_start)
+    try:
+        timestamp = int(message[timestamp_start:timestamp_end])
+    except ValueError:
+        return None
+    return message[start:end], timestamp
+
+
+# Function to build an input_audio_buffer.append event around an untouched payload
+def input_audio_append(payload):
+    """Returns the OpenAI Realtime append event for a base64 audio payload."""
+    return '{"type":"input_audio_buffer.append","audio":"' + payload + '"}'
+
+
+class MediaFrameTemplate:
+    """Pre-rendered outbound Twilio media frame for one stream; only the payload changes per frame."""
+
+    def __init__(self, stream_sid):
+        self.prefix = '{"event":"media","streamSid":' + dumps(stream_sid) + ',"media":{"payload":"'
+
+    def render(self, payload):
+        return self.prefix + payload + '"}}'
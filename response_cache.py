@@ -0,0 +1,71 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """LRU of finished retrieval answers with a TTL, tied to a catalog version.
+
+    Entries are looked up with the version of the catalog they must come from; when the version
+    changes (the catalog was re-upserted) everything cached for the old one is dropped.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires, value)
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key, version):
+        """Return the cached value for key under this catalog version, or None."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, version):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            # An answer computed while the catalog was being replaced belongs to neither version
+            if self._version is not None and version != self._version:
+                return
+            self._version = version
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "invalidations": self.invalidations,
+            }
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
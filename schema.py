@@ -0,0 +1,119 @@
+# Columns of call_details in their current order; created_at is filled in by SQLite on insert
+CALL_DETAILS_COLUMNS = (
+    "id",
+    "call_sid",
+    "created_at",
+    "name",
+    "contact_number",
+    "interested_in_home_loan",
+    "time_period_of_loan",
+    "location_of_home",
+    "any_other_home_loan",
+    "transcript",
+)
+
+CREATE_CALL_DETAILS = '''
+CREATE TABLE {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    call_sid TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    name TEXT,
+    contact_number TEXT,
+    interested_in_home_loan TEXT,
+    time_period_of_loan TEXT,
+    location_of_home TEXT,
+    any_other_home_loan TEXT,
+    transcript TEXT
+)
+'''
+
+
+# Function to list the columns a table currently has (empty if it doesn't exist)
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+# Function to create call_details, the table setup_db.py was meant to create
+def create_call_details(conn):
+    if not table_columns(conn, "call_details"):
+        conn.execute(CREATE_CALL_DETAILS.format(table="call_details"))
+
+
+# Function to rebuild call_details with transcript, call_sid and created_at columns
+def rebuild_call_details(conn):
+    """SQLite can't drop NOT NULL or add a column with a CURRENT_TIMESTAMP default in place, so copy into a new table.
+
+    Older tables required every field, which rejected calls the extractor couldn't fill in and calls
+    that weren't placed through /make-call.
+    Rows that predate the migration keep a NULL created_at and call_sid.
+    """
+    existing = table_columns(conn, "call_details")
+    if existing == list(CALL_DETAILS_COLUMNS):
+        return
+    copied = [column for column in CALL_DETAILS_COLUMNS if column in existing]
+    conn.execute("DROP TABLE IF EXISTS call_details_new")
+    conn.execute(CREATE_CALL_DETAILS.format(table="call_details_new"))
+    # created_at is selected explicitly so old rows don't all get the migration time
+    columns = copied + [column for column in ("created_at",) if column not in copied]
+    select = [column if column in existing else "NULL" for column in columns]
+    conn.execute(f"INSERT INTO call_details_new ({', '.join(columns)}) SELECT {', '.join(select)} FROM call_details")
+    conn.execute("DROP TABLE call_details")
+    conn.execute("ALTER TABLE call_details_new RENAME TO call_details")
+
+
+# Function to index call_details for lookups by caller and reporting by date
+def index_call_details(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_call_details_contact_number ON call_details (contact_number)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_call_details_created_at ON call_details (created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_call_details_call_sid ON call_details (call_sid)")
+
+
+# Applied in order; the database's PRAGMA user_version is the number of migrations it has. Only ever append.
+MIGRATIONS = [
+    ("create call_details", create_call_details),
+    ("add transcript, call_sid and created_at to call_details", rebuild_call_details),
+    ("index call_details by contact number, date and call SID", index_call_details),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+# Function to read the schema version of a database
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+# Function to bring a database up to SCHEMA_VERSION
+def migrate(conn):
+    """Apply the pending migrations in one write transaction; returns the descriptions of those applied.
+
+    BEGIN IMMEDIATE takes the write lock before the version is read, so workers starting together
+    apply each migration once.
+    """
+    previous = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = schema_version(conn)
+            if version > SCHEMA_VERSION:
+                raise RuntimeError(f"Database schema version {version} is newer than this code ({SCHEMA_VERSION}).")
+            applied = []
+            for description, apply in MIGRATIONS[version:]:
+                apply(conn)
+                applied.append(description)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = previous
+    return applied
+
+
+# Function to fail early when a database hasn't been migrated
+def require_current(conn):
+    version = schema_version(conn)
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(f"Database schema version is {version}, expected {SCHEMA_VERSION}; run `python setup_db.py` first.")
+
@@ -0,0 +1,139 @@
+import base64
+import asyncio
+from collections import deque
+
+POLICIES = ("drop_oldest", "drop_newest", "coalesce")
+
+
+# Function to merge base64 audio chunks into one payload
+def join_audio(parts):
+    """Returns one base64 payload for a list of base64 payloads (decoded and re-encoded unless there is only one)."""
+    if len(parts) == 1:
+        return parts[0]
+    return base64.b64encode(b"".join(base64.b64decode(part) for part in parts)).decode("ascii")
+
+
+class SendQueue:
+    """Bounded outbound queue for one direction of a call, drained by run() so a slow peer can't stall the other side.
+
+    Audio is queued as base64 payloads and rendered into a message with render(payload) when sent;
+    anything else is queued as a ready message. Either can carry an on_sent() callback, run once the
+    message has actually been sent (never for dropped or cleared audio); a message it returns is sent
+    right behind it. Only audio counts against max_size. When the queue is full, `policy` decides
+    what happens to audio:
+      drop_oldest  - discard the oldest queued audio (keeps latency bounded)
+      drop_newest  - discard the incoming audio
+      coalesce     - append it to the last queued audio message, up to max_coalesce_bytes, then drop_oldest
+    """
+
+    def __init__(self, send, render, max_size=100, policy="coalesce", max_coalesce_bytes=16000, stats=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown send queue policy '{policy}', expected one of {', '.join(POLICIES)}.")
+        self.send = send
+        self.render = render
+        self.max_size = max_size
+        self.policy = policy
+        self.max_coalesce_bytes = max_coalesce_bytes
+        self.stats_counters = stats
+        self._items = deque()
+        self._audio = 0
+        self._ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, message, on_sent=None):
+        """Queue a non-audio message; these are never dropped. message may be None to only run on_sent in order."""
+        self._items.append((message, on_sent))
+        self._queued()
+
+    def put_audio(self, payload, on_sent=None):
+        """Queue a base64 audio payload, applying the overflow policy if the queue is full; False if it was dropped."""
+        if self._audio >= self.max_size:
+            if self.policy == "drop_newest":
+                self._count_drop()
+                return False
+            if self.policy == "coalesce" and self._coalesce(payload, on_sent):
+                return True
+            self._drop_oldest_audio()
+        self._items.append([(payload, on_sent)])
+        self._audio += 1
+        self._queued()
+        return True
+
+    def clear(self):
+        """Discard everything not yet sent, e.g. audio the caller just talked over."""
+        self.flushed += len(self._items)
+        self._items.clear()
+        self._audio = 0
+
+    async def run(self):
+        """Send queued messages in order until cancelled; a failed send ends the task."""
+        while True:
+            while not self._items:
+                self._ready.clear()
+                await self._ready.wait()
+            item = self._items.popleft()
+            if isinstance(item, list):
+                self._audio -= 1
+                message = self.render(join_audio([payload for payload, _ in item]))
+                callbacks = [on_sent for _, on_sent in item]
+            else:
+                message, on_sent = item
+                callbacks = [on_sent]
+            if message is not None:
+                await self.send(message)
+                self.sent += 1
+            for on_sent in callbacks:
+                follow_up = on_sent() if on_sent is not None else None
+                if follow_up is not None:
+                    await self.send(follow_up)
+                    self.sent += 1
+
+    def stats(self):
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+        }
+
+    def _queued(self):
+        depth = len(self._items)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self._ready.set()
+
+    def _coalesce(self, payload, on_sent):
+        # Only the tail can be extended without reordering audio around a queued control message
+        tail = self._items[-1] if self._items else None
+        if not isinstance(tail, list):
+            return False
+        # base64 is 4 characters per 3 bytes
+        if sum(len(part) for part, _ in tail) * 3 // 4 + len(payload) * 3 // 4 > self.max_coalesce_bytes:
+            return False
+        tail.append((payload, on_sent))
+        self.coalesced += 1
+        if self.stats_counters is not None:
+            self.stats_counters["audio_coalesced"] = self.stats_counters.get("audio_coalesced", 0) + 1
+        return True
+
+    def _drop_oldest_audio(self):
+        for index, item in enumerate(self._items):
+            if isinstance(item, list):
+                del self._items[index]
+                self._audio -= 1
+                self._count_drop()
+                return
+
+    def _count_drop(self):
+        self.dropped += 1
+        if self.stats_counters is not None:
+            self.stats_counters["audio_dropped"] = self.stats_counters.get("audio_dropped", 0) + 1
@@ -0,0 +1,207 @@
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from transcript import Transcript
+
+
+class Session:
+    """Per-call state created by /make-call and picked up by /media-stream."""
+
+    __slots__ = ("call_sid", "name", "contact_number", "transcript", "stream_sid", "created")
+
+    def __init__(self, call_sid, name=None, contact_number=None, created=None):
+        self.call_sid = call_sid
+        self.name = name
+        self.contact_number = contact_number
+        self.transcript = Transcript(call_sid)
+        self.stream_sid = None
+        self.created = created if created is not None else time.time()
+
+
+class SessionStore(ABC):
+    """Pending sessions keyed by call SID, bounded by size and expired after ttl seconds.
+
+    A session only lives here between /make-call and the media stream starting; the
+    stream claims (removes) it, so calls that never connect are the only thing the
+    reaper has to clean up. Subclasses decide where the sessions are kept.
+    """
+
+    def __init__(self, ttl=300, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.expired = 0
+        self.evicted = 0
+
+    @abstractmethod
+    def __len__(self):
+        """Number of pending sessions."""
+
+    @abstractmethod
+    def put(self, session):
+        """Add or replace the pending session for session.call_sid."""
+
+    @abstractmethod
+    def claim(self, call_sid):
+        """Remove and return the pending session for call_sid, or None if unknown or expired."""
+
+    @abstractmethod
+    def reap(self):
+        """Drop expired sessions and return how many were removed."""
+
+    async def _call(self, method, *args):
+        """Runs a store method for the async API; stores that block on I/O run it off the event loop."""
+        return method(*args)
+
+    async def put_async(self, session):
+        return await self._call(self.put, session)
+
+    async def claim_async(self, call_sid):
+        return await self._call(self.claim, call_sid)
+
+    async def reap_async(self):
+        return await self._call(self.reap)
+
+    async def stats_async(self):
+        return await self._call(self.stats)
+
+    async def run_reaper(self, interval=30):
+        """Background task that reaps expired sessions every interval seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.reap_async()
+
+    def stats(self):
+        return {"pending": len(self), "expired": self.expired, "evicted": self.evicted}
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions in this process's memory; only works with a single worker."""
+
+    def __init__(self, ttl=300, max_size=10000):
+        super().__init__(ttl, max_size)
+        self._sessions = OrderedDict()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def put(self, session):
+        self._sessions[session.call_sid] = session
+        self._sessions.move_to_end(session.call_sid)
+        while len(self._sessions) > self.max_size:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def claim(self, call_sid):
+        session = self._sessions.pop(call_sid, None)
+        if session is not None and time.time() - session.created > self.ttl:
+            self.expired += 1
+            return None
+        return session
+
+    def reap(self):
+        # Sessions are in creation order, so stop at the first live one
+        cutoff = time.time() - self.ttl
+        reaped = 0
+        while self._sessions:
+            call_sid, session = next(iter(self._sessions.items()))
+            if session.created > cutoff:
+                break
+            del self._sessions[call_sid]
+            reaped += 1
+        self.expired += reaped
+        return reaped
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a shared SQLite file, so /make-call and /media-stream can land on different workers."""
+
+    def __init__(self, path, ttl=300, max_size=10000):
+        super().__init__(ttl, max_size)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode; claim() opens its own write transaction
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS pending_sessions (
+                call_sid TEXT PRIMARY KEY,
+                name TEXT,
+                contact_number TEXT,
+                created REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pending_sessions_created ON pending_sessions (created)")
+
+    async def _call(self, method, *args):
+        # claim() can wait up to the 5 s busy timeout on another worker's write lock; keep that off the event loop
+        return await asyncio.to_thread(method, *args)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_sessions").fetchone()[0]
+
+    def put(self, session):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pending_sessions (call_sid, name, contact_number, created) VALUES (?, ?, ?, ?)",
+                (session.call_sid, session.name, session.contact_number, session.created)
+            )
+
+    def claim(self, call_sid):
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front so two workers can't both claim the call
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT name, contact_number, created FROM pending_sessions WHERE call_sid = ?", (call_sid,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("DELETE FROM pending_sessions WHERE call_sid = ?", (call_sid,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        name, contact_number, created = row
+        if time.time() - created > self.ttl:
+            self.expired += 1
+            return None
+        return Session(call_sid, name=name, contact_number=contact_number, created=created)
+
+    def reap(self):
+        with self._lock:
+            reaped = self._conn.execute(
+                "DELETE FROM pending_sessions WHERE created < ?", (time.time() - self.ttl,)
+            ).rowcount
+            # Enforce max_size here rather than on every put
+            evicted = self._conn.execute('''
+                DELETE FROM pending_sessions WHERE call_sid IN (
+                    SELECT call_sid FROM pending_sessions ORDER BY created DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_size,)).rowcount
+        self.expired += reaped
+        self.evicted += evicted
+        return reaped
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Function to pick the session backend from configuration
+def create_session_store(backend="memory", path="sessions.db", ttl=300, max_size=10000):
+    """Returns a MemorySessionStore for "memory" or a SQLiteSessionStore for "sqlite"."""
+    if backend == "memory":
+        return MemorySessionStore(ttl=ttl, max_size=max_size)
+    if backend == "sqlite":
+        return SQLiteSessionStore(path, ttl=ttl, max_size=max_size)
+    raise ValueError(f"Unknown session backend: {backend}")
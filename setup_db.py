@@ -1,21 +1,14 @@
+import os
 import sqlite3
 
-conn = sqlite3.connect('callbot.db')
-c = conn.cursor()
+from schema import migrate, schema_version
 
-# Create table
-c.execute('''
-CREATE TABLE IF NOT EXISTS call_details (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    contact_number TEXT NOT NULL,
-    interested_in_home_loan TEXT,
-    time_period_of_loan TEXT,
-    location_of_home TEXT,
-    any_other_home_loan TEXT,
-    # transcript TEXT
-)
-''')
+conn = sqlite3.connect(os.getenv('CALL_DB_PATH', 'callbot.db'))
 
-conn.commit()
-conn.close()
\ No newline at end of file
+# Create or upgrade the call_details table; the callbot also does this when it starts
+applied = migrate(conn)
+for description in applied:
+    print(f"Applied: {description}")
+print(f"Schema version {schema_version(conn)}")
+
+conn.close()
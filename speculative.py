@@ -0,0 +1,91 @@
+import asyncio
+import difflib
+
+
+# Function to turn a caller utterance into the retrieval query (same rule for partial and final transcripts)
+def normalize_query(text):
+    return text.lower().replace("query", "").strip()
+
+
+class SpeculativeRetriever:
+    """Starts retrieval on a partial transcript and reuses it if the final transcript is close enough.
+
+    retrieve(query, timings) is the real lookup coroutine. Partial transcripts come from
+    conversation.item.input_audio_transcription.delta events; when the completed transcript
+    arrives, result() either awaits the speculative task or cancels it and looks up afresh.
+    """
+
+    def __init__(self, retrieve, min_words=3, threshold=0.85, max_starts=4, stats=None):
+        self.retrieve = retrieve
+        self.min_words = min_words
+        self.threshold = threshold
+        self.max_starts = max_starts
+        self.stats = stats if stats is not None else {}
+        self._item_id = None
+        self._partial = ""
+        self._starts = 0
+        self._query = None
+        self._timings = None
+        self._task = None
+
+    def add_partial(self, item_id, delta):
+        """Accumulate a transcription delta and (re)start the lookup once there is enough text."""
+        if item_id != self._item_id:
+            self.cancel()
+            self._item_id = item_id
+            self._partial = ""
+            self._starts = 0
+        self._partial += delta
+
+        query = normalize_query(self._partial)
+        if len(query.split()) < self.min_words or self._starts >= self.max_starts:
+            return
+        if self._query is not None and self.similarity(query, self._query) >= self.threshold:
+            return
+        self.cancel()
+        self._start(query)
+
+    async def result(self, query, timings=None, item_id=None):
+        """Results for the final query, reusing the speculative lookup when it matches.
+
+        item_id is the final transcript's conversation item; a lookup started for another
+        item (e.g. a previous utterance whose deltas arrived late) is never reused.
+        """
+        task, speculative_query, speculative_timings = self._task, self._query, self._timings
+        speculative_item = self._item_id
+        self._task = self._query = self._timings = None
+        self._item_id = None
+
+        if task is not None:
+            same_item = item_id is None or item_id == speculative_item
+            if same_item and self.similarity(query, speculative_query) >= self.threshold:
+                self._count("speculative_used")
+                results = await task
+                if timings is not None:
+                    timings.update(speculative_timings)
+                return results
+            task.cancel()
+            self._count("speculative_discarded")
+        return await self.retrieve(query, timings)
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._count("speculative_discarded")
+        self._task = self._query = self._timings = None
+
+    @staticmethod
+    def similarity(a, b):
+        return difflib.SequenceMatcher(None, a, b).ratio()
+
+    def _start(self, query):
+        self._starts += 1
+        self._query = query
+        self._timings = {}
+        self._task = asyncio.create_task(self.retrieve(query, self._timings))
+        # A discarded lookup may still fail later; don't let that surface as "exception never retrieved"
+        self._task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        self._count("speculative_started")
+
+    def _count(self, name):
+        self.stats[name] = self.stats.get(name, 0) + 1
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The modules live at the repository root; database.py builds its Pinecone client at import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PINECONE_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
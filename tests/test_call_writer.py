@@ -0,0 +1,91 @@
+import sqlite3
+import asyncio
+
+from call_writer import CallDetailsWriter
+
+
+def record(number):
+    return {"call_sid": f"CA{number}", "name": f"Caller {number}", "transcript": "Agent: Hello!"}
+
+
+def recording_batches(writer):
+    """Wraps the writer's insert to record the size of every batch it writes."""
+    batches = []
+    insert = writer._insert
+
+    def spy(batch):
+        batches.append(len(batch))
+        insert(batch)
+
+    writer._insert = spy
+    return batches
+
+
+def rows(path):
+    with sqlite3.connect(path) as conn:
+        return [row[0] for row in conn.execute("SELECT call_sid FROM call_details ORDER BY id")]
+
+
+def test_full_batches_are_written_and_stop_flushes_the_rest(tmp_path):
+    path = str(tmp_path / "callbot.db")
+    writer = CallDetailsWriter(path, batch_size=3, flush_interval=10)
+    batches = recording_batches(writer)
+
+    async def main():
+        await writer.start()
+        for number in range(7):
+            await writer.submit(record(number))
+        # Two full batches go out without waiting for flush_interval
+        while len(batches) < 2:
+            await asyncio.sleep(0.01)
+        written_before_stop = rows(path)
+        await writer.stop()
+        return written_before_stop
+
+    assert asyncio.run(main()) == [f"CA{number}" for number in range(6)]
+    assert batches == [3, 3, 1]
+    assert rows(path) == [f"CA{number}" for number in range(7)]
+    assert writer.stats() == {"queued": 0, "written": 7, "failed": 0}
+
+
+def test_partial_batch_is_written_after_flush_interval(tmp_path):
+    path = str(tmp_path / "callbot.db")
+    writer = CallDetailsWriter(path, batch_size=100, flush_interval=0.05)
+    batches = recording_batches(writer)
+
+    async def main():
+        await writer.start()
+        await writer.submit(record(1))
+        await writer.submit(record(2))
+        await asyncio.sleep(0.3)
+        written = rows(path)
+        await writer.stop()
+        return written
+
+    assert asyncio.run(main()) == ["CA1", "CA2"]
+    assert batches == [2]
+
+
+def test_failed_batch_is_counted_and_the_writer_keeps_going(tmp_path):
+    path = str(tmp_path / "callbot.db")
+    writer = CallDetailsWriter(path, batch_size=1, flush_interval=10)
+    insert = writer._insert
+    calls = []
+
+    def flaky(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        insert(batch)
+
+    writer._insert = flaky
+
+    async def main():
+        await writer.start()
+        await writer.submit(record(1))
+        await writer.submit(record(2))
+        await writer.stop()
+
+    asyncio.run(main())
+    assert rows(path) == ["CA2"]
+    assert writer.stats() == {"queued": 0, "written": 1, "failed": 1}
@@ -0,0 +1,121 @@
+import time
+import asyncio
+
+import pytest
+
+from campaigns import CampaignDialer, RateLimiter, is_retryable, parse_leads
+
+LEADS = [{"to": f"+1555010{number}", "name": f"Lead {number}"} for number in range(4)]
+
+
+class TwilioError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+def test_parse_leads_csv_and_jsonl():
+    assert parse_leads(b"to,name\n+15550100,Asha\n") == [{"to": "+15550100", "name": "Asha"}]
+    assert parse_leads('{"to": "+15550100", "name": "Asha"}\n', "application/jsonl") == [{"to": "+15550100", "name": "Asha"}]
+    with pytest.raises(ValueError):
+        parse_leads("to,name\n+15550100,\n")
+
+
+def test_only_throttling_and_server_errors_are_retried():
+    assert is_retryable(TwilioError(429))
+    assert is_retryable(TwilioError(503))
+    assert not is_retryable(TwilioError(400))
+    # No status (e.g. a read timeout): the call may already exist
+    assert not is_retryable(TimeoutError("read timed out"))
+
+
+def test_rate_limiter_spaces_acquisitions():
+    async def main():
+        limiter = RateLimiter(20)
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+        return time.monotonic() - started
+
+    # The first acquisition is immediate, the other four wait 50 ms each
+    assert 0.19 <= asyncio.run(main()) < 1.0
+
+
+def run_campaign(place_call, leads=LEADS, max_attempts=3, **options):
+    async def main():
+        dialer = CampaignDialer(place_call, max_attempts=max_attempts, backoff=0.001)
+        campaign = dialer.start(leads, **options)
+        await campaign.task
+        return campaign
+
+    return asyncio.run(main())
+
+
+def test_campaign_places_every_lead():
+    async def place_call(to, name, variant):
+        return f"CA{to}"
+
+    campaign = run_campaign(place_call, calls_per_second=0, concurrency=2, variant="spanish")
+    progress = campaign.progress()
+    assert (progress["status"], progress["placed"], progress["failed"], progress["pending"]) == ("completed", 4, 0, 0)
+    assert sorted(campaign.call_sids) == sorted(f"CA{lead['to']}" for lead in LEADS)
+
+
+def test_retryable_errors_are_retried_with_backoff():
+    attempts = []
+
+    async def place_call(to, name, variant):
+        attempts.append(to)
+        if attempts.count(to) < 3:
+            raise TwilioError(429)
+        return "CA1"
+
+    campaign = run_campaign(place_call, leads=LEADS[:1], calls_per_second=0)
+    assert (campaign.placed, campaign.failed, campaign.retries) == (1, 0, 2)
+    assert len(attempts) == 3
+
+
+def test_gives_up_after_max_attempts():
+    attempts = []
+
+    async def place_call(to, name, variant):
+        attempts.append(to)
+        raise TwilioError(500)
+
+    campaign = run_campaign(place_call, leads=LEADS[:1], max_attempts=2, calls_per_second=0)
+    assert (campaign.placed, campaign.failed, campaign.retries) == (0, 1, 1)
+    assert len(attempts) == 2
+
+
+def test_non_retryable_errors_are_not_retried():
+    attempts = []
+
+    async def place_call(to, name, variant):
+        attempts.append(to)
+        raise TimeoutError("read timed out")
+
+    campaign = run_campaign(place_call, leads=LEADS[:1], calls_per_second=0)
+    assert (campaign.placed, campaign.failed, campaign.retries) == (0, 1, 0)
+    assert attempts == [LEADS[0]["to"]]
+    assert campaign.errors == [{"to": LEADS[0]["to"], "error": "read timed out"}]
+
+
+def test_cancel_stops_dialing():
+    async def main():
+        placed = asyncio.Event()
+
+        async def place_call(to, name, variant):
+            placed.set()
+            await asyncio.sleep(10)
+            return "CA1"
+
+        dialer = CampaignDialer(place_call)
+        campaign = dialer.start(LEADS, calls_per_second=0, concurrency=1)
+        await placed.wait()
+        assert dialer.cancel(campaign.id) is campaign
+        await asyncio.gather(campaign.task, return_exceptions=True)
+        return campaign
+
+    campaign = asyncio.run(main())
+    assert campaign.status == "cancelled"
+    assert campaign.finished is not None
+    assert campaign.progress()["pending"] == 4
@@ -0,0 +1,54 @@
+import base64
+import asyncio
+
+from canned_audio import FRAME_BYTES, CannedAudio, FileSynthesizer, build_canned_audio, to_frames
+
+UTTERANCES = {"greeting": "Hello there!", "error": "Sorry, something went wrong."}
+
+
+def write_recordings(directory, lengths):
+    directory.mkdir()
+    for name, length in lengths.items():
+        (directory / f"{name}.ulaw").write_bytes(bytes([0x10]) * length)
+    return str(directory)
+
+
+def test_to_frames_pads_the_last_frame_with_silence():
+    frames = [base64.b64decode(frame) for frame in to_frames(b"\x10" * (FRAME_BYTES + 10))]
+    assert [len(frame) for frame in frames] == [FRAME_BYTES, FRAME_BYTES]
+    assert frames[1] == b"\x10" * 10 + b"\xff" * (FRAME_BYTES - 10)
+
+
+def test_build_then_load(tmp_path):
+    recordings = write_recordings(tmp_path / "recordings", {"greeting": 800, "error": 400})
+    out = str(tmp_path / "canned")
+
+    built = asyncio.run(build_canned_audio(FileSynthesizer(recordings), out, UTTERANCES, "alloy"))
+    assert built == ["greeting", "error"]
+
+    audio = CannedAudio.load(out, UTTERANCES, "alloy")
+    assert len(audio) == 2
+    assert len(audio.frames("greeting")) == 800 // FRAME_BYTES
+    assert "error" in audio
+
+
+def test_rebuild_only_touches_stale_entries(tmp_path):
+    recordings = write_recordings(tmp_path / "recordings", {"greeting": 800, "error": 400})
+    out = str(tmp_path / "canned")
+    asyncio.run(build_canned_audio(FileSynthesizer(recordings), out, UTTERANCES, "alloy"))
+
+    assert asyncio.run(build_canned_audio(FileSynthesizer(recordings), out, UTTERANCES, "alloy")) == []
+    changed = dict(UTTERANCES, greeting="Hi, welcome back!")
+    assert asyncio.run(build_canned_audio(FileSynthesizer(recordings), out, changed, "alloy")) == ["greeting"]
+    assert asyncio.run(build_canned_audio(FileSynthesizer(recordings), out, changed, "alloy", force=True)) == ["greeting", "error"]
+
+
+def test_load_skips_entries_built_for_another_text_or_voice(tmp_path):
+    recordings = write_recordings(tmp_path / "recordings", {"greeting": 800, "error": 400})
+    out = str(tmp_path / "canned")
+    asyncio.run(build_canned_audio(FileSynthesizer(recordings), out, UTTERANCES, "alloy"))
+
+    assert len(CannedAudio.load(out, UTTERANCES, "shimmer")) == 0
+    audio = CannedAudio.load(out, dict(UTTERANCES, greeting="Something else"), "alloy")
+    assert "greeting" not in audio and "error" in audio
+    assert len(CannedAudio.load(str(tmp_path / "missing"), UTTERANCES, "alloy")) == 0
@@ -0,0 +1,60 @@
+import math
+
+from catalog import ProductCatalog, merge_results, parse_product_line
+
+LINES = [
+    "Home Loan A: Interest rate 5.0%, Fixed for 2 years, Max Loan Amount $500,000",
+    "Home Loan B: Interest rate 3.75%, 30 years term, No prepayment penalty",
+    "Home Loan C: Interest rate 4.5%, Fixed for 5 years, Max Loan Amount $600,000",
+    "Home Loan D: Interest rate 3.8%, 15 years term, 20% Down payment",
+    "Home Loan E: Interest rate 4.25%, 15 years term, Max Loan Amount $400,000",
+]
+
+
+def catalog():
+    return ProductCatalog([f"product_{i}" for i in range(len(LINES))], LINES)
+
+
+def names(results):
+    return [result["metadata"]["product_info"].split(":")[0] for result in results]
+
+
+def test_parse_product_line():
+    row = parse_product_line(LINES[3])
+    assert row["name"] == "Home Loan D"
+    assert (row["rate"], row["term_years"], row["down_payment"]) == (3.8, 15, 20)
+    assert math.isnan(row["max_amount"])
+    assert parse_product_line(LINES[1])["flags"] == ["No prepayment penalty"]
+
+
+def test_lowest_rate_for_a_term():
+    assert names(catalog().answer("what's the lowest rate for 15 years")) == ["Home Loan D", "Home Loan E"]
+    # Voice transcripts spell the number out
+    assert names(catalog().answer("lowest rate for fifteen years")) == ["Home Loan D", "Home Loan E"]
+    assert names(catalog().answer("anything for thirty-year terms")) == ["Home Loan B"]
+
+
+def test_fixed_period_uses_fixed_years():
+    assert names(catalog().answer("anything fixed for 5 years?")) == ["Home Loan C"]
+
+
+def test_rate_and_amount_filters():
+    assert names(catalog().answer("loans under 4 percent", top_k=5)) == ["Home Loan B", "Home Loan D"]
+    # Filtered rows without a sort intent come back cheapest first
+    assert names(catalog().answer("can I borrow at least $450,000", top_k=5)) == ["Home Loan C", "Home Loan A"]
+    assert names(catalog().answer("what is the highest loan amount")) == ["Home Loan C", "Home Loan A", "Home Loan E"]
+
+
+def test_queries_without_attribute_intent_are_left_to_search():
+    assert catalog().answer("tell me about prepayment") == []
+
+
+def test_range_excludes_missing_attributes():
+    assert sorted(catalog().range("max_amount").tolist()) == [0, 2, 4]
+
+
+def test_merge_results_puts_structured_first_without_duplicates():
+    structured = [{"id": "a"}, {"id": "b"}]
+    vector = [{"id": "b"}, {"id": "c"}, {"id": "d"}]
+    assert [result["id"] for result in merge_results(structured, vector, top_k=3)] == ["a", "b", "c"]
+    assert merge_results([], None) == []
@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+
+import database
+from local_index import LocalVectorIndex
+
+
+def write_index(path, lines, mtime_ns):
+    ids = [database.product_id(line) for line in lines]
+    LocalVectorIndex.build(ids, np.eye(len(lines), 4, dtype=np.float32), [{"product_info": line} for line in lines]).save(path)
+    os.utime(f"{path}.json", ns=(mtime_ns, mtime_ns))
+
+
+def test_reupserted_index_is_reloaded(tmp_path, monkeypatch):
+    # The reload replaces these module globals; monkeypatch puts the originals back afterwards
+    for name in ("_catalog", "_lexical_index", "_local_index", "_loaded_index_mtime", "_catalog_generation"):
+        monkeypatch.setattr(database, name, getattr(database, name))
+    path = str(tmp_path / "product_index")
+    write_index(path, ["Home Loan A: Interest rate 5.0%, No PMI", "Home Loan B: Interest rate 3.75%, No closing costs"], 1_000_000_000)
+    first = database.catalog_version(path)
+    assert database._catalog.names == ["Home Loan A", "Home Loan B"]
+
+    # Unchanged file: same version, nothing reloaded
+    assert database.catalog_version(path) == first
+    assert not database.catalog_stale(path)
+
+    # Another process re-upserts with an edited line
+    write_index(path, ["Home Loan A: Interest rate 4.5%, No PMI", "Home Loan B: Interest rate 3.75%, No closing costs"], 2_000_000_000)
+    assert database.catalog_stale(path)
+    second = database.catalog_version(path)
+    assert second != first
+    assert database._catalog.lines[0] == "Home Loan A: Interest rate 4.5%, No PMI"
+    assert database._lexical_index.search("no pmi")[0]["metadata"]["product_info"].startswith("Home Loan A: Interest rate 4.5%")
+    assert len(database._local_index) == 2
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+import database
+
+LINES = ["Home Loan A: Interest rate 5.0%, No PMI", "Home Loan B: Interest rate 3.75%, No closing costs"]
+
+
+class ListingIndex:
+    """Serverless index: list() pages through the ids."""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def list(self, namespace):
+        yield self.ids[:1]
+        yield self.ids[1:]
+
+
+class PodIndex:
+    """Pod-based index: list() isn't supported, only the vector count is."""
+
+    def __init__(self, count):
+        self.count = count
+
+    def list(self, namespace):
+        raise RuntimeError("list is only supported for serverless indexes")
+
+    def describe_index_stats(self):
+        return SimpleNamespace(namespaces={"product_info": SimpleNamespace(vector_count=self.count)})
+
+
+@pytest.fixture
+def baseline_deployment(tmp_path, monkeypatch):
+    """No manifest and no local index, as after the original full upsert."""
+    catalog = tmp_path / "product_info.txt"
+    catalog.write_text("\n".join(LINES) + "\n")
+    monkeypatch.setattr(database, "read_manifest", lambda: None)
+    monkeypatch.setattr(database, "load_local_index", lambda: None)
+    return str(catalog)
+
+
+def test_sync_without_manifest_deletes_the_ids_pinecone_lists(baseline_deployment):
+    plan = database.plan_catalog_sync(baseline_deployment, index=ListingIndex(["product_1", "product_2"]))
+    assert plan["to_delete"] == ["product_1", "product_2"]
+    assert plan["to_upsert"] == [database.product_id(line) for line in LINES]
+
+
+def test_sync_without_manifest_keeps_ids_still_in_the_catalog(baseline_deployment):
+    current = database.product_id(LINES[0])
+    plan = database.plan_catalog_sync(baseline_deployment, index=ListingIndex([current, "product_1"]))
+    assert plan["to_delete"] == ["product_1"]
+
+
+def test_sync_without_manifest_on_a_pod_index_deletes_the_positional_ids(baseline_deployment):
+    plan = database.plan_catalog_sync(baseline_deployment, index=PodIndex(3))
+    assert plan["to_delete"] == ["product_1", "product_2", "product_3"]
@@ -0,0 +1,53 @@
+import pytest
+
+from embedding_cache import EmbeddingCache, normalize_text
+
+MODEL = "text-embedding-ada-002"
+
+
+def test_normalize_text():
+    assert normalize_text("  What is the\n  RATE ") == "what is the rate"
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = EmbeddingCache(None, max_memory_entries=2)
+    cache.put("first", MODEL, [1.0])
+    cache.put("second", MODEL, [2.0])
+    assert cache.get("first", MODEL) == [1.0]  # first is now the most recently used
+    cache.put("third", MODEL, [3.0])
+
+    assert cache.get("second", MODEL) is None
+    assert cache.get("FIRST ", MODEL) == [1.0]
+    assert cache.get("third", MODEL) == [3.0]
+    assert cache.get("third", "another-model") is None
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"], stats["memory_entries"]) == (3, 0, 2, 2)
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache(path)
+    cache.put("what is the rate", MODEL, [0.5, 0.25])
+    cache.close()
+
+    reopened = EmbeddingCache(path)
+    assert reopened.get("What is the rate", MODEL) == [0.5, 0.25]
+    assert reopened.get("what is the rate", MODEL) == [0.5, 0.25]
+    assert reopened.get("something else", MODEL) is None
+    stats = reopened.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+    reopened.close()
+
+
+def test_disk_tier_drops_least_recently_used(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache(path, max_memory_entries=1, max_disk_entries=50)
+    for number in range(100):
+        cache.put(f"query {number}", MODEL, [float(number)])
+    # The trim runs every 100 writes and keeps the most recently used max_disk_entries
+    count = cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert count == 50
+    assert cache.get("query 10", MODEL) is None
+    assert cache.get("query 99", MODEL) == [99.0]
+    cache.close()
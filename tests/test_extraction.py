@@ -0,0 +1,135 @@
+import json
+import asyncio
+
+import pytest
+
+from extraction import (
+    EXTRACTED_FIELDS, ChainedExtractor, ExtractionPipeline, FieldExtractor, LLMExtractor, RegexExtractor,
+)
+
+INTERESTED_CALL = [
+    ("Agent", "Hello! Are you interested in a home loan?"),
+    ("User", "Yes, I am looking to buy a flat."),
+    ("Agent", "For how long would you need the loan?"),
+    ("User", "Probably fifteen years."),
+    ("Agent", "Where is the home located?"),
+    ("User", "It's in Pune, near the station."),
+    ("Agent", "Do you have any other existing loan?"),
+    ("User", "No, nothing right now."),
+]
+
+NOT_INTERESTED_CALL = [
+    ("Agent", "Are you interested in a home loan?"),
+    ("User", "Not really, I already have a loan with another bank."),
+]
+
+
+def test_regex_extractor_reads_answers_from_the_turns():
+    assert RegexExtractor().extract(INTERESTED_CALL) == {
+        "interested_in_home_loan": "Yes",
+        "time_period_of_loan": "15 years",
+        "location_of_home": "Pune",
+        "any_other_home_loan": "No",
+    }
+
+
+def test_regex_extractor_handles_negation_and_missing_fields():
+    fields = RegexExtractor().extract(NOT_INTERESTED_CALL)
+    assert fields == {"interested_in_home_loan": "No", "any_other_home_loan": "Yes"}
+    assert RegexExtractor().extract([("User", "A 20 yrs loan for a flat in New Delhi")]) == {
+        "time_period_of_loan": "20 years",
+        "location_of_home": "New Delhi",
+    }
+
+
+def test_years_only_count_when_they_are_about_the_loan():
+    lived_here = [
+        ("Agent", "Where is the home located?"),
+        ("User", "In Pune, I've lived here 10 years."),
+    ]
+    assert "time_period_of_loan" not in RegexExtractor().extract(lived_here)
+    assert RegexExtractor().extract([("User", "I've lived in Pune for 10 years and need a loan for twenty years")]) == {
+        "time_period_of_loan": "20 years",
+        "location_of_home": "Pune",
+    }
+
+
+def test_chained_extractor_only_asks_the_llm_for_missing_fields():
+    prompts = []
+
+    def complete(prompt):
+        prompts.append(prompt)
+        return json.dumps({
+            "interested_in_home_loan": "Yes",  # already found by the regex pass; must not override it
+            "time_period_of_loan": "10 years",
+            "location_of_home": "Chennai",
+            "any_other_home_loan": None,
+        })
+
+    fields = ChainedExtractor(RegexExtractor(), LLMExtractor(complete=complete)).extract(NOT_INTERESTED_CALL)
+    assert fields == {
+        "interested_in_home_loan": "No",
+        "any_other_home_loan": "Yes",
+        "time_period_of_loan": "10 years",
+        "location_of_home": "Chennai",
+    }
+    assert len(prompts) == 1
+    assert "User: Not really, I already have a loan with another bank." in prompts[0]
+
+
+def test_chained_extractor_skips_the_llm_when_regex_found_everything():
+    def complete(prompt):
+        raise AssertionError("LLM should not be called")
+
+    fields = ChainedExtractor(RegexExtractor(), LLMExtractor(complete=complete)).extract(INTERESTED_CALL)
+    assert set(fields) == set(EXTRACTED_FIELDS)
+
+
+def test_llm_extractor_reads_a_fenced_reply():
+    reply = '```json\n{"location_of_home": "Chennai", "time_period_of_loan": null}\n```'
+    assert LLMExtractor(complete=lambda prompt: reply).extract(INTERESTED_CALL) == {"location_of_home": "Chennai"}
+
+
+def test_llm_extractor_survives_a_bad_reply():
+    assert LLMExtractor(complete=lambda prompt: "not json").extract(INTERESTED_CALL) == {}
+
+
+class FailingExtractor(FieldExtractor):
+    def extract(self, turns):
+        raise ValueError("boom")
+
+
+def run_pipeline(extractor, calls):
+    stored = []
+
+    async def on_result(record):
+        stored.append(record)
+
+    async def main():
+        pipeline = ExtractionPipeline(extractor, on_result, workers=2)
+        await pipeline.start()
+        for number, turns in enumerate(calls):
+            await pipeline.submit({"name": f"caller {number}"}, turns)
+        await pipeline.stop()
+        return pipeline.stats()
+
+    return stored, asyncio.run(main())
+
+
+def test_pipeline_drains_every_queued_call_on_stop():
+    stored, stats = run_pipeline(RegexExtractor(), [INTERESTED_CALL] * 5 + [NOT_INTERESTED_CALL])
+    assert stats == {"queued": 0, "processed": 6, "failed": 0}
+    assert sorted(record["name"] for record in stored) == [f"caller {number}" for number in range(6)]
+    pune = [record for record in stored if record["location_of_home"] == "Pune"]
+    assert len(pune) == 5
+
+
+def test_pipeline_stores_the_record_when_extraction_fails():
+    stored, stats = run_pipeline(FailingExtractor(), [INTERESTED_CALL])
+    assert stats["failed"] == 1
+    assert stored == [{"name": "caller 0", **{field: None for field in EXTRACTED_FIELDS}}]
+
+
+def test_field_extractor_is_abstract():
+    with pytest.raises(TypeError):
+        FieldExtractor()
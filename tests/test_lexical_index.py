@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from lexical_index import BM25Index, fuse_rankings, strip_name, tokenize
+
+CATALOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "product_info.txt")
+
+
+@pytest.fixture(scope="module")
+def index():
+    with open(CATALOG, "r") as file:
+        lines = [line.strip() for line in file if line.strip()]
+    return BM25Index([f"product_{i}" for i in range(len(lines))], lines)
+
+
+def decisive(index, query):
+    return index.is_decisive(query, index.search(query))
+
+
+def best_line(index, query):
+    return index.search(query)[0]["metadata"]["product_info"]
+
+
+def test_product_name_is_not_indexed():
+    assert strip_name("Home Loan AM: Interest rate 4.1%, No PMI") == " Interest rate 4.1%, No PMI"
+    assert "am" not in tokenize(strip_name("Home Loan AM: No PMI"))
+
+
+@pytest.mark.parametrize("query", [
+    "I am not interested",
+    "what about my credit card debt",
+    "do you have first time buyer programs",
+    "what is the interest rate",
+    "tell me about home loan B",
+])
+def test_off_catalog_and_generic_queries_are_not_decisive(index, query):
+    assert not decisive(index, query)
+
+
+@pytest.mark.parametrize("query, phrase", [
+    ("no PMI", "No PMI"),
+    ("no closing costs", "No closing costs"),
+    ("low credit score accepted", "Low credit score accepted"),
+    ("first-time homebuyer program", "First-time homebuyer program"),
+    ("no prepayment penalty", "No prepayment penalty"),
+])
+def test_keyword_queries_are_decisive(index, query, phrase):
+    assert decisive(index, query)
+    assert phrase in best_line(index, query)
+
+
+def test_margin_is_over_the_best_partial_match():
+    lines = ["Loan A: no closing costs", "Loan B: no closing fees"] + [f"Loan {n}: quick processing" for n in range(8)]
+    index = BM25Index([str(n) for n in range(len(lines))], lines)
+    # B has "closing" but not "costs", so A has to beat it by the margin
+    results = index.search("closing costs")
+    assert index.is_decisive("closing costs", results, min_score=0.0)
+    assert not index.is_decisive("closing costs", results, min_score=0.0, min_margin=10.0)
+    # Both lines cover "closing"; a tie between full matches is still decisive
+    assert index.is_decisive("closing", index.search("closing"), min_score=0.0, min_margin=10.0)
+
+
+def test_fuse_rankings_sums_reciprocal_ranks():
+    first = [{"id": "a", "score": 9.0, "metadata": {}}, {"id": "b", "score": 1.0, "metadata": {}}]
+    second = [{"id": "b", "score": 0.9, "metadata": {}}]
+    fused = fuse_rankings(first, second, k=60)
+    assert [result["id"] for result in fused] == ["b", "a"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from local_index import LocalVectorIndex, normalize_embeddings
+
+IDS = ["product_a", "product_b", "product_c"]
+METADATA = [{"product_info": f"Home Loan {name}"} for name in "ABC"]
+EMBEDDINGS = [[1.0, 0.0, 0.0], [0.6, 0.8, 0.0], [0.0, 0.0, 2.0]]
+
+
+def test_normalize_embeddings():
+    matrix = normalize_embeddings([[3.0, 4.0], [0.0, 0.0]])
+    assert matrix.dtype == np.float32
+    assert np.allclose(matrix, [[0.6, 0.8], [0.0, 0.0]])
+    assert normalize_embeddings([3.0, 4.0]).shape == (1, 2)
+
+
+def test_query_returns_best_matches_first():
+    index = LocalVectorIndex.build(IDS, EMBEDDINGS, METADATA)
+    results = index.query([1.0, 0.1, 0.0], top_k=2)
+    assert [result["id"] for result in results] == ["product_a", "product_b"]
+    assert results[0]["score"] > results[1]["score"]
+    assert results[0]["metadata"] == {"product_info": "Home Loan A"}
+    # top_k larger than the index returns everything
+    assert [result["id"] for result in index.query([0.0, 0.0, 1.0], top_k=10)] == ["product_c", "product_a", "product_b"]
+
+
+def test_save_then_load_round_trips(tmp_path):
+    path = str(tmp_path / "index" / "product_index")
+    assert not LocalVectorIndex.exists(path)
+    LocalVectorIndex.build(IDS, EMBEDDINGS, METADATA).save(path)
+    assert LocalVectorIndex.exists(path)
+
+    loaded = LocalVectorIndex.load(path)
+    assert isinstance(loaded.matrix, np.memmap)
+    assert loaded.ids == IDS
+    assert loaded.metadata == METADATA
+    assert len(loaded) == 3
+    assert [result["id"] for result in loaded.query([0.6, 0.8, 0.0])] == ["product_b", "product_a", "product_c"]
+    assert not isinstance(LocalVectorIndex.load(path, mmap=False).matrix, np.memmap)
+
+
+def test_empty_index():
+    assert LocalVectorIndex.build([], np.zeros((0, 3)), []).query([1.0, 0.0, 0.0]) == []
@@ -0,0 +1,88 @@
+import pytest
+
+from metrics import Histogram, Metrics, TurnTimer
+
+
+def test_histogram_quantiles_are_bucket_bounds():
+    histogram = Histogram(buckets=(10, 100, float("inf")))
+    for value in (1, 5, 50, 50, 5000):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["mean_ms"] == pytest.approx(1021.2)
+    assert (snapshot["p50_ms"], snapshot["p90_ms"]) == (100, None)
+    assert snapshot["buckets"] == {"10": 2, "100": 2, "+Inf": 1}
+    assert Histogram().snapshot()["p50_ms"] == 0.0
+
+
+def test_turn_timer_records_every_stage_at_first_audio():
+    registry = Metrics()
+    timer = TurnTimer(registry)
+    for at, name in enumerate(("speech_stopped", "transcribed", "embedded", "retrieved", "response_created")):
+        timer.mark(name, at * 0.1)
+    timer.audio_delta()
+    timer.audio_delta()  # later deltas of the same response add nothing
+
+    latency = registry.snapshot()["turn_latency"]
+    for stage in ("transcription", "embedding", "retrieval", "response_create"):
+        assert latency[stage]["count"] == 1
+        assert latency[stage]["mean_ms"] == pytest.approx(100)
+    assert latency["first_audio"]["count"] == 1
+    assert latency["turn_total"]["count"] == 1
+
+
+def test_turn_timer_skips_stages_that_ran_out_of_order():
+    registry = Metrics()
+    timer = TurnTimer(registry)
+    timer.mark("speech_stopped", 0.0)
+    # A speculative lookup embedded the query before the final transcript arrived
+    timer.mark("embedded", 0.05)
+    timer.mark("transcribed", 0.1)
+    timer.mark("retrieved", 0.15)
+    timer.mark("response_created", 0.2)
+    timer.audio_delta()
+
+    latency = registry.snapshot()["turn_latency"]
+    assert latency["embedding"]["count"] == 0
+    assert latency["retrieval"]["count"] == 1
+
+
+def test_a_new_turn_drops_the_unfinished_one():
+    registry = Metrics()
+    timer = TurnTimer(registry)
+    timer.mark("speech_stopped", 0.0)
+    timer.mark("transcribed", 0.1)
+    timer.mark("speech_stopped", 1.0)
+    assert timer.marks == {"speech_stopped": 1.0}
+    # Audio without a response in progress (e.g. the greeting) only closes turn_total
+    timer.audio_delta()
+    latency = registry.snapshot()["turn_latency"]
+    assert latency["turn_total"]["count"] == 1
+    assert latency["transcription"]["count"] == 0
+
+
+def test_session_counters():
+    registry = Metrics()
+    registry.session_started()
+    registry.session_started()
+    registry.session_ended()
+    registry.frames_in.add(3)
+    snapshot = registry.snapshot()
+    assert (snapshot["active_sessions"], snapshot["sessions_total"]) == (1, 2)
+    assert snapshot["frames_in"]["total"] == 3
+
+
+def test_turn_without_an_embedding_records_a_zero_embedding_stage():
+    registry = Metrics()
+    timer = TurnTimer(registry)
+    timer.mark("speech_stopped", 0.0)
+    timer.mark("transcribed", 0.1)
+    # What main.py does for a cached or lexical answer: embedded at the transcription time
+    timer.mark("embedded", timer.marks["transcribed"])
+    timer.mark("retrieved", 0.12)
+    timer.mark("response_created", 0.2)
+    timer.audio_delta()
+
+    latency = registry.snapshot()["turn_latency"]
+    assert (latency["embedding"]["count"], latency["embedding"]["mean_ms"]) == (1, 0.0)
+    assert latency["retrieval"]["mean_ms"] == pytest.approx(20)
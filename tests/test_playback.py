@@ -0,0 +1,90 @@
+import base64
+
+import pytest
+
+from playback import PlaybackTracker, payload_ms
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms / 1000
+
+
+def audio_ms(ms):
+    return base64.b64encode(b"\xff" * (ms * 8)).decode("ascii")
+
+
+def test_payload_ms_accounts_for_padding():
+    assert payload_ms(audio_ms(20)) == 20
+    assert payload_ms(base64.b64encode(b"\xff" * 7).decode("ascii")) == 7 / 8
+
+
+def test_marks_every_interval_and_at_end_of_response():
+    tracker = PlaybackTracker(mark_interval_ms=100, clock=FakeClock())
+    names = [tracker.add_audio(audio_ms(20)) for _ in range(12)]
+    assert [name for name in names if name] == ["audio-1", "audio-2"]
+    assert tracker.end_of_response() == "audio-3"
+    assert tracker.end_of_response() is None
+
+
+def test_position_follows_real_time_and_is_capped_at_sent_audio():
+    clock = FakeClock()
+    tracker = PlaybackTracker(mark_interval_ms=0, clock=clock)
+    tracker.add_audio(audio_ms(200))
+    clock.advance(50)
+    assert tracker.position() == pytest.approx(50)
+    assert tracker.playing()
+    clock.advance(500)
+    assert tracker.position() == pytest.approx(200)
+    assert not tracker.playing()
+
+
+def test_acknowledged_mark_reanchors_the_position():
+    clock = FakeClock()
+    tracker = PlaybackTracker(mark_interval_ms=100, clock=clock)
+    for _ in range(10):
+        tracker.add_audio(audio_ms(20))
+    # Twilio is behind real time: 150 ms passed but it only just reached the first mark (100 ms)
+    clock.advance(150)
+    tracker.acknowledge("audio-1")
+    assert tracker.position() == pytest.approx(100)
+    clock.advance(30)
+    assert tracker.position() == pytest.approx(130)
+
+
+def test_item_elapsed_and_reset():
+    clock = FakeClock()
+    tracker = PlaybackTracker(mark_interval_ms=0, clock=clock)
+    tracker.add_audio(audio_ms(100))
+    tracker.start_item()
+    tracker.add_audio(audio_ms(100))
+    clock.advance(160)
+    assert tracker.item_elapsed_ms() == 60
+
+    tracker.reset()
+    assert tracker.sent_ms == 0 and not tracker.playing()
+    # Marks from before the reset are ignored
+    tracker.acknowledge("audio-1")
+    assert tracker.position() == pytest.approx(0)
+
+
+def test_item_elapsed_is_zero_until_the_items_audio_is_sent():
+    clock = FakeClock()
+    tracker = PlaybackTracker(mark_interval_ms=0, clock=clock)
+    tracker.start_item("item_1")
+    tracker.add_audio(audio_ms(300))
+    clock.advance(100)
+    assert tracker.item_elapsed_ms("item_1") == 100
+    # item_2's deltas are queued but none has been sent yet
+    assert tracker.item_elapsed_ms("item_2") == 0
+
+    tracker.start_item("item_2")
+    tracker.add_audio(audio_ms(300))
+    clock.advance(300)
+    assert tracker.item_elapsed_ms("item_2") == 100
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from realtime_pool import RealtimePool
+
+
+class FakeSocket:
+    def __init__(self, number, answers_ping=True):
+        self.number = number
+        self.open = True
+        self.answers_ping = answers_ping
+        self.initialized = False
+
+    async def ping(self):
+        pong = asyncio.get_running_loop().create_future()
+        if self.answers_ping:
+            pong.set_result(None)
+        return pong
+
+    async def close(self):
+        self.open = False
+
+
+class Connector:
+    def __init__(self, answers_ping=True):
+        self.answers_ping = answers_ping
+        self.sockets = []
+
+    async def connect(self):
+        ws = FakeSocket(len(self.sockets), self.answers_ping)
+        self.sockets.append(ws)
+        return ws
+
+    async def initialize(self, ws):
+        ws.initialized = True
+
+
+async def wait_for_idle(pool, count):
+    for _ in range(200):
+        if len(pool._idle) == count:
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"pool has {len(pool._idle)} idle sockets, expected {count}")
+
+
+def test_pool_fills_and_refills_after_acquire():
+    connector = Connector()
+
+    async def main():
+        pool = RealtimePool(connector.connect, connector.initialize, size=2)
+        await pool.start()
+        await wait_for_idle(pool, 2)
+        ws = await pool.acquire()
+        await wait_for_idle(pool, 2)
+        await pool.stop()
+        return pool, ws
+
+    pool, ws = asyncio.run(main())
+    assert ws.initialized and ws.open
+    assert len(connector.sockets) == 3
+    assert pool.stats() == {"idle": 0, "hits": 1, "misses": 0, "recycled": 0}
+    # stop() closes the idle sockets but not the one a call took
+    assert [socket.open for socket in connector.sockets] == [True, False, False]
+
+
+def test_closed_sockets_are_discarded_on_acquire():
+    connector = Connector()
+
+    async def main():
+        pool = RealtimePool(connector.connect, connector.initialize, size=1)
+        await pool.start()
+        await wait_for_idle(pool, 1)
+        connector.sockets[0].open = False
+        ws = await pool.acquire()
+        await pool.stop()
+        return pool, ws
+
+    pool, ws = asyncio.run(main())
+    assert ws.open and ws is not connector.sockets[0]
+    assert pool.recycled == 1
+    assert pool.hits + pool.misses == 1
+
+
+def test_old_sockets_are_replaced_in_the_background():
+    connector = Connector()
+
+    async def main():
+        pool = RealtimePool(connector.connect, connector.initialize, size=1, max_age=0.05, check_interval=0.02)
+        await pool.start()
+        await asyncio.sleep(0.2)
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(main())
+    assert pool.recycled >= 2
+    assert len(connector.sockets) == pool.recycled + 1
+    assert not any(socket.open for socket in connector.sockets)
+
+
+def test_sockets_that_miss_a_ping_are_replaced():
+    connector = Connector(answers_ping=False)
+
+    async def main():
+        pool = RealtimePool(connector.connect, connector.initialize, size=1, check_interval=0.02, ping_timeout=0.01)
+        await pool.start()
+        await asyncio.sleep(0.2)
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(main())
+    assert pool.recycled >= 2
+    assert not connector.sockets[0].open
+
+
+def test_without_a_pool_each_call_connects_and_closes():
+    connector = Connector()
+
+    async def main():
+        pool = RealtimePool(connector.connect, connector.initialize, size=0)
+        await pool.start()
+        async with pool.connection() as ws:
+            assert ws.open and ws.initialized
+        await pool.stop()
+        return pool, ws
+
+    pool, ws = asyncio.run(main())
+    assert not ws.open
+    assert pool.stats() == {"idle": 0, "hits": 0, "misses": 1, "recycled": 0}
+
+
+def test_failed_initialize_closes_the_socket():
+    connector = Connector()
+
+    async def initialize(ws):
+        raise RuntimeError("session.update rejected")
+
+    async def main():
+        pool = RealtimePool(connector.connect, initialize, size=0)
+        with pytest.raises(RuntimeError):
+            await pool.acquire()
+
+    asyncio.run(main())
+    assert not connector.sockets[0].open
@@ -0,0 +1,27 @@
+import json
+
+from relay import MediaFrameTemplate, extract_media, input_audio_append
+
+MEDIA_FRAME = ('{"event":"media","sequenceNumber":"3","media":{"track":"inbound","chunk":"1",'
+               '"timestamp":"5120","payload":"f39/fw=="},"streamSid":"MZ123"}')
+
+
+def test_extract_media_slices_payload_and_timestamp():
+    assert extract_media(MEDIA_FRAME) == ("f39/fw==", 5120)
+
+
+def test_other_events_are_left_for_the_json_parser():
+    assert extract_media('{"event":"start","start":{"streamSid":"MZ123","callSid":"CA1"}}') is None
+    assert extract_media('{"event":"mark","mark":{"name":"response-1"}}') is None
+    # Malformed media frames fall back too
+    assert extract_media('{"event":"media","media":{"timestamp":"5"}}') is None
+    assert extract_media('{"event":"media","media":{"timestamp":"soon","payload":"AAAA"}}') is None
+
+
+def test_input_audio_append_is_valid_json():
+    assert json.loads(input_audio_append("f39/fw==")) == {"type": "input_audio_buffer.append", "audio": "f39/fw=="}
+
+
+def test_media_frame_template_renders_twilio_frames():
+    frame = json.loads(MediaFrameTemplate("MZ123").render("f39/fw=="))
+    assert frame == {"event": "media", "streamSid": "MZ123", "media": {"payload": "f39/fw=="}}
@@ -0,0 +1,46 @@
+from response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_miss_and_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=10, ttl=60, clock=clock)
+    assert cache.get("rates", 1) is None
+    cache.put("rates", "answer", 1)
+    assert cache.get("rates", 1) == "answer"
+    clock.now = 61
+    assert cache.get("rates", 1) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2, ttl=60, clock=FakeClock())
+    cache.put("a", 1, "v1")
+    cache.put("b", 2, "v1")
+    cache.get("a", "v1")
+    cache.put("c", 3, "v1")
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1") == 1 and cache.get("c", "v1") == 3
+
+
+def test_new_catalog_version_drops_old_answers():
+    cache = ResponseCache(max_entries=10, ttl=60, clock=FakeClock())
+    cache.put("a", 1, "v1")
+    assert cache.get("a", "v2") is None
+    assert cache.stats()["invalidations"] == 1
+    # An answer computed from the old catalog arriving late is not stored under the new version
+    cache.put("a", 1, "v1")
+    assert cache.get("a", "v2") is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResponseCache(max_entries=0, clock=FakeClock())
+    cache.put("a", 1, "v1")
+    assert cache.get("a", "v1") is None
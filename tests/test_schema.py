@@ -0,0 +1,93 @@
+import io
+import json
+import sqlite3
+
+import pytest
+
+from export_calls import iter_calls, write_csv, write_jsonl
+from schema import CALL_DETAILS_COLUMNS, SCHEMA_VERSION, migrate, require_current, schema_version, table_columns
+
+LEGACY_TABLE = '''
+CREATE TABLE call_details (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    contact_number TEXT NOT NULL,
+    interested_in_home_loan TEXT NOT NULL,
+    time_period_of_loan TEXT NOT NULL,
+    location_of_home TEXT NOT NULL,
+    any_other_home_loan TEXT NOT NULL
+)
+'''
+
+
+def test_fresh_database_gets_the_current_schema():
+    conn = sqlite3.connect(":memory:")
+    assert len(migrate(conn)) == SCHEMA_VERSION
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert table_columns(conn, "call_details") == list(CALL_DETAILS_COLUMNS)
+    assert migrate(conn) == []
+    require_current(conn)
+
+
+def test_legacy_table_is_rebuilt_keeping_its_rows():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(LEGACY_TABLE)
+    conn.execute("INSERT INTO call_details (name, contact_number, interested_in_home_loan, time_period_of_loan, "
+                 "location_of_home, any_other_home_loan) VALUES ('Asha', '+15550001', 'Yes', '15 years', 'Pune', 'No')")
+    conn.commit()
+    with pytest.raises(RuntimeError):
+        require_current(conn)
+
+    migrate(conn)
+    row = dict(zip(CALL_DETAILS_COLUMNS, conn.execute("SELECT * FROM call_details").fetchone()))
+    assert row["name"] == "Asha" and row["location_of_home"] == "Pune"
+    assert row["created_at"] is None and row["call_sid"] is None and row["transcript"] is None
+
+    # Calls with no extracted fields (or no caller details) can now be stored, and get a timestamp
+    conn.execute("INSERT INTO call_details (call_sid, transcript) VALUES ('CA1', 'hello')")
+    assert conn.execute("SELECT created_at FROM call_details WHERE call_sid = 'CA1'").fetchone()[0] is not None
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(call_details)")}
+    assert {"idx_call_details_contact_number", "idx_call_details_created_at", "idx_call_details_call_sid"} <= indexes
+
+
+def test_newer_database_is_refused():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    with pytest.raises(RuntimeError):
+        migrate(conn)
+
+
+@pytest.fixture
+def calls():
+    conn = sqlite3.connect(":memory:")
+    migrate(conn)
+    conn.executemany(
+        "INSERT INTO call_details (call_sid, created_at, name, contact_number) VALUES (?, ?, ?, ?)",
+        [(f"CA{i}", f"2024-06-{1 + i % 3:02d} 10:00:00", f"caller {i}", "+1555" if i % 2 else "+1666") for i in range(10)]
+    )
+    conn.commit()
+    return conn
+
+
+def test_iter_calls_pages_through_every_row(calls):
+    assert [row[0] for row in iter_calls(calls, page_size=3)] == list(range(1, 11))
+
+
+def test_iter_calls_filters_by_date_and_contact(calls):
+    rows = list(iter_calls(calls, since="2024-06-02", until="2024-06-03", page_size=2))
+    assert [row[1] for row in rows] == ["CA1", "CA4", "CA7"]
+    rows = list(iter_calls(calls, since="2024-06-02", contact_number="+1555", page_size=2))
+    # Date ranges come back in date order
+    assert [row[1] for row in rows] == ["CA1", "CA7", "CA5"]
+
+
+def test_writers(calls):
+    rows = list(iter_calls(calls, contact_number="+1555"))
+    out = io.StringIO()
+    assert write_csv(rows, out) == 5
+    lines = out.getvalue().splitlines()
+    assert lines[0] == ",".join(CALL_DETAILS_COLUMNS) and len(lines) == 6
+
+    out = io.StringIO()
+    assert write_jsonl(rows, out) == 5
+    assert json.loads(out.getvalue().splitlines()[0])["call_sid"] == "CA1"
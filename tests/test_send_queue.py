@@ -0,0 +1,149 @@
+import base64
+import asyncio
+
+import pytest
+
+from send_queue import SendQueue, join_audio
+
+
+def audio(byte, length=160):
+    return base64.b64encode(bytes([byte]) * length).decode("ascii")
+
+
+def drain(queue):
+    """Run the queue until it is empty; returns what was sent."""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def main():
+        queue.send = send
+        task = asyncio.create_task(queue.run())
+        while queue.stats()["depth"]:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        task.cancel()
+
+    asyncio.run(main())
+    return sent
+
+
+def make_queue(**kwargs):
+    return SendQueue(None, lambda payload: ("media", payload), **kwargs)
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        make_queue(policy="block")
+
+
+def test_messages_are_sent_in_order():
+    queue = make_queue(max_size=10)
+    queue.put_audio(audio(1))
+    queue.put("mark")
+    queue.put_audio(audio(2))
+    assert drain(queue) == [("media", audio(1)), "mark", ("media", audio(2))]
+    assert queue.stats()["sent"] == 3
+
+
+def test_drop_oldest_keeps_the_newest_audio_and_control_messages():
+    queue = make_queue(max_size=2, policy="drop_oldest")
+    queue.put("start")
+    for byte in (1, 2, 3):
+        queue.put_audio(audio(byte))
+    assert drain(queue) == ["start", ("media", audio(2)), ("media", audio(3))]
+    assert queue.dropped == 1
+
+
+def test_drop_newest_discards_the_incoming_audio():
+    queue = make_queue(max_size=2, policy="drop_newest")
+    for byte in (1, 2, 3):
+        queue.put_audio(audio(byte))
+    assert drain(queue) == [("media", audio(1)), ("media", audio(2))]
+    assert queue.dropped == 1
+
+
+def test_coalesce_merges_into_the_tail_up_to_the_byte_limit():
+    stats = {}
+    queue = make_queue(max_size=1, policy="coalesce", max_coalesce_bytes=400, stats=stats)
+    for byte in (1, 2, 3):
+        queue.put_audio(audio(byte))
+    # 1 and 2 fit in one 400-byte message; 3 would exceed it, so the oldest audio is dropped for it
+    assert drain(queue) == [("media", audio(3))]
+    assert stats == {"audio_coalesced": 1, "audio_dropped": 1}
+
+    queue = make_queue(max_size=1, policy="coalesce")
+    queue.put_audio(audio(1))
+    queue.put_audio(audio(2))
+    assert drain(queue) == [("media", join_audio([audio(1), audio(2)]))]
+
+
+def test_coalesce_does_not_reach_past_a_control_message():
+    queue = make_queue(max_size=1, policy="coalesce")
+    queue.put_audio(audio(1))
+    queue.put("mark")
+    queue.put_audio(audio(2))
+    assert drain(queue) == ["mark", ("media", audio(2))]
+
+
+def test_clear_flushes_everything_queued():
+    queue = make_queue()
+    queue.put_audio(audio(1))
+    queue.put("mark")
+    queue.clear()
+    queue.put("clear")
+    assert drain(queue) == ["clear"]
+    assert queue.stats()["flushed"] == 2
+
+
+def test_join_audio_concatenates_payloads():
+    assert base64.b64decode(join_audio([audio(1, 3), audio(2, 2)])) == b"\x01\x01\x01\x02\x02"
+
+
+def test_on_sent_runs_only_for_audio_that_was_sent():
+    sent_payloads = []
+
+    def on_sent(byte):
+        def callback():
+            sent_payloads.append(byte)
+            return f"mark-{byte}"
+        return callback
+
+    queue = make_queue(max_size=2, policy="drop_oldest")
+    assert queue.put_audio(audio(1), on_sent(1))
+    assert queue.put_audio(audio(2), on_sent(2))
+    assert queue.put_audio(audio(3), on_sent(3))  # drops audio 1
+    assert drain(queue) == [("media", audio(2)), "mark-2", ("media", audio(3)), "mark-3"]
+    assert sent_payloads == [2, 3]
+
+    queue = make_queue(max_size=1, policy="drop_newest")
+    assert queue.put_audio(audio(1), on_sent(1))
+    assert not queue.put_audio(audio(2), on_sent(2))
+    queue.put_audio(audio(3))
+    assert drain(queue) == [("media", audio(1)), "mark-1"]
+
+
+def test_on_sent_runs_for_each_coalesced_payload_after_the_merged_message():
+    calls = []
+    queue = make_queue(max_size=1, policy="coalesce")
+    queue.put_audio(audio(1), lambda: calls.append(1))
+    queue.put_audio(audio(2), lambda: calls.append(2) or "mark")
+    assert drain(queue) == [("media", join_audio([audio(1), audio(2)])), "mark"]
+    assert calls == [1, 2]
+
+
+def test_callback_only_items_run_in_order():
+    queue = make_queue()
+    order = []
+    queue.put_audio(audio(1), lambda: order.append("audio"))
+    queue.put(None, lambda: order.append("done") or "end-mark")
+    queue.clear()
+    assert drain(queue) == []
+    assert order == []
+
+    queue.put_audio(audio(1), lambda: order.append("audio"))
+    queue.put(None, lambda: order.append("done") or "end-mark")
+    assert len(queue) == 2
+    assert drain(queue) == [("media", audio(1)), "end-mark"]
+    assert order == ["audio", "done"]
@@ -0,0 +1,109 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from session_store import MemorySessionStore, Session, SessionStore, SQLiteSessionStore, create_session_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make(ttl=300, max_size=10000):
+        store = create_session_store(request.param, str(tmp_path / "sessions.db"), ttl=ttl, max_size=max_size)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        if isinstance(store, SQLiteSessionStore):
+            store.close()
+
+
+def test_claim_returns_the_session_once(make_store):
+    store = make_store()
+    store.put(Session("CA1", name="Asha", contact_number="+15550100"))
+    assert len(store) == 1
+
+    session = store.claim("CA1")
+    assert (session.call_sid, session.name, session.contact_number) == ("CA1", "Asha", "+15550100")
+    assert store.claim("CA1") is None
+    assert store.claim("unknown") is None
+    assert len(store) == 0
+
+
+def test_expired_sessions_are_not_claimed(make_store):
+    store = make_store(ttl=60)
+    store.put(Session("CA1", created=time.time() - 120))
+    assert store.claim("CA1") is None
+    assert store.stats() == {"pending": 0, "expired": 1, "evicted": 0}
+
+
+def test_reap_drops_only_expired_sessions(make_store):
+    store = make_store(ttl=60)
+    store.put(Session("old", created=time.time() - 120))
+    store.put(Session("new"))
+    assert store.reap() == 1
+    assert store.claim("old") is None
+    assert store.claim("new") is not None
+    assert store.expired == 1
+
+
+def test_max_size_evicts_the_oldest(make_store):
+    store = make_store(max_size=2)
+    now = time.time()
+    for number in range(3):
+        store.put(Session(f"CA{number}", created=now + number))
+    # The memory store evicts on put, the SQLite store on the next reap
+    store.reap()
+    assert len(store) == 2
+    assert store.evicted == 1
+    assert store.claim("CA0") is None
+    assert store.claim("CA2") is not None
+
+
+def test_async_api(make_store):
+    store = make_store(ttl=60)
+
+    async def main():
+        await store.put_async(Session("stale", created=time.time() - 120))
+        await store.put_async(Session("CA1", name="Ravi"))
+        assert (await store.stats_async())["pending"] == 2
+        assert await store.reap_async() == 1
+        return await store.claim_async("CA1")
+
+    assert asyncio.run(main()).name == "Ravi"
+
+
+def test_sqlite_store_runs_blocking_calls_off_the_event_loop(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    threads = []
+    claim = store.claim
+    store.claim = lambda call_sid: threads.append(threading.current_thread()) or claim(call_sid)
+
+    asyncio.run(store.claim_async("CA1"))
+    assert threads and threads[0] is not threading.main_thread()
+    store.close()
+
+
+def test_sqlite_sessions_are_shared_between_stores(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    maker, streamer = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    maker.put(Session("CA1", name="Meera"))
+    assert streamer.claim("CA1").name == "Meera"
+    assert maker.claim("CA1") is None
+    maker.close()
+    streamer.close()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_session_store("redis")
+    assert isinstance(create_session_store("memory"), MemorySessionStore)
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
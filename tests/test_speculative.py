@@ -0,0 +1,125 @@
+import asyncio
+
+from speculative import SpeculativeRetriever, normalize_query
+
+
+class Lookups:
+    """Stands in for the retrieval coroutine; records every query it is started with."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.started = []
+        self.finished = []
+
+    async def __call__(self, query, timings=None):
+        self.started.append(query)
+        await asyncio.sleep(self.delay)
+        if timings is not None:
+            timings["embedded"] = 1.0
+        self.finished.append(query)
+        return {"query": query}
+
+
+async def feed(retriever, item_id, text):
+    """Streams text one word per delta, letting any lookup that was (re)started begin."""
+    for word in text.split():
+        retriever.add_partial(item_id, word + " ")
+        await asyncio.sleep(0)
+
+
+def test_normalize_query():
+    assert normalize_query("  What is the Query RATE ") == "what is the  rate"
+
+
+def test_matching_final_transcript_reuses_the_lookup():
+    lookups = Lookups()
+    stats = {}
+
+    async def main():
+        retriever = SpeculativeRetriever(lookups, stats=stats)
+        await feed(retriever, "item_1", "what is the interest rate")
+        timings = {}
+        results = await retriever.result("what is the interest rate?", timings, "item_1")
+        return results, timings
+
+    results, timings = asyncio.run(main())
+    # The lookup restarted once as the partial grew past "what is the", then stayed close enough
+    assert results == {"query": "what is the interest"}
+    assert timings == {"embedded": 1.0}
+    assert lookups.started == ["what is the", "what is the interest"]
+    assert stats == {"speculative_started": 2, "speculative_discarded": 1, "speculative_used": 1}
+
+
+def test_divergent_final_transcript_is_looked_up_afresh():
+    lookups = Lookups()
+    stats = {}
+
+    async def main():
+        retriever = SpeculativeRetriever(lookups, stats=stats)
+        await feed(retriever, "item_1", "what is the")
+        return await retriever.result("which loan has no closing costs", None, "item_1")
+
+    assert asyncio.run(main()) == {"query": "which loan has no closing costs"}
+    assert lookups.finished == ["which loan has no closing costs"]
+    assert stats["speculative_discarded"] == 1
+
+
+def test_lookup_from_another_item_is_not_reused():
+    lookups = Lookups()
+
+    async def main():
+        retriever = SpeculativeRetriever(lookups)
+        await feed(retriever, "item_1", "what is the interest rate")
+        # Same words, but the final transcript belongs to the next utterance
+        return await retriever.result("what is the", None, "item_2")
+
+    assert asyncio.run(main()) == {"query": "what is the"}
+    assert lookups.started[-1] == "what is the"
+    assert lookups.finished == ["what is the"]
+
+
+def test_cancel_drops_the_running_lookup():
+    lookups = Lookups(delay=10)
+    stats = {}
+
+    async def main():
+        retriever = SpeculativeRetriever(lookups, stats=stats)
+        await feed(retriever, "item_1", "what is the")
+        task = retriever._task
+        retriever.cancel()
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(main())
+    assert task.cancelled()
+    assert lookups.finished == []
+    assert stats == {"speculative_started": 1, "speculative_discarded": 1}
+
+
+def test_restarts_are_capped_at_max_starts():
+    lookups = Lookups(delay=10)
+    stats = {}
+
+    async def main():
+        retriever = SpeculativeRetriever(lookups, min_words=1, threshold=0.99, max_starts=2, stats=stats)
+        await feed(retriever, "item_1", "which loan product has the lowest fixed rate for thirty years")
+        started = list(lookups.started)
+        retriever.cancel()
+        return started
+
+    assert asyncio.run(main()) == ["which", "which loan"]
+    assert stats["speculative_started"] == 2
+
+
+def test_a_new_item_resets_the_start_count():
+    lookups = Lookups(delay=10)
+
+    async def main():
+        retriever = SpeculativeRetriever(lookups, min_words=1, max_starts=1)
+        await feed(retriever, "item_1", "first question here")
+        await feed(retriever, "item_2", "second question here")
+        started = list(lookups.started)
+        retriever.cancel()
+        return started
+
+    assert asyncio.run(main()) == ["first", "second"]
@@ -0,0 +1,82 @@
+import os
+import json
+
+from twiml_cache import TwimlCache, etag_matches, stream_url_for
+
+STREAM_URL = "wss://example.com/media-stream"
+
+
+def make_cache(**options):
+    return TwimlCache(STREAM_URL, "Hello!", "Connecting you now.", "alice", **options)
+
+
+def test_stream_url_for_strips_the_scheme():
+    assert stream_url_for("https://example.com/") == STREAM_URL
+    assert stream_url_for("http://example.com") == STREAM_URL
+    assert stream_url_for("example.com") == STREAM_URL
+
+
+def test_document_is_rendered_once():
+    cache = make_cache()
+    body, etag = cache.get()
+    assert b'<Say voice="alice">Hello!</Say>' in body
+    assert f'<Stream url="{STREAM_URL}"'.encode() in body
+    assert cache.get() == (body, etag)
+    assert cache.stats() == {"cached": 1, "variants": 0, "renders": 1}
+
+
+def test_etag_matches():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"other", "abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_variants_are_reloaded_when_the_file_changes(tmp_path):
+    path = tmp_path / "greetings.json"
+    path.write_text(json.dumps({"spanish": "Hola!"}))
+    cache = make_cache(variants_path=str(path), check_interval=0)
+
+    assert cache.has_variant("spanish")
+    spanish, spanish_etag = cache.get("spanish")
+    assert b"Hola!" in spanish
+    # Unknown variants get the default greeting
+    assert cache.get("klingon") == cache.get()
+
+    path.write_text(json.dumps({"spanish": "Buenos dias!"}))
+    os.utime(path, (1, 1))
+    body, etag = cache.get("spanish")
+    assert b"Buenos dias!" in body and etag != spanish_etag
+
+
+def test_bad_variants_file_keeps_the_previous_variants(tmp_path):
+    path = tmp_path / "greetings.json"
+    path.write_text(json.dumps({"spanish": "Hola!"}))
+    cache = make_cache(variants_path=str(path), check_interval=0)
+    assert cache.has_variant("spanish")
+
+    path.write_text("{not json")
+    os.utime(path, (1, 1))
+    assert cache.has_variant("spanish")
+
+
+def test_twiml_endpoint_answers_304_for_a_matching_etag(tmp_path, monkeypatch):
+    for key, value in {"HOSTNAME": "https://example.com", "TWILIO_ACCOUNT_SID": "ACtest", "TWILIO_AUTH_TOKEN": "test",
+                       "TWILIO_PHONE_NUMBER": "+15550100", "CALL_DB_PATH": str(tmp_path / "callbot.db"),
+                       "SESSION_BACKEND": "memory", "CANNED_AUDIO_DIR": str(tmp_path / "canned_audio")}.items():
+        monkeypatch.setenv(key, value)
+    from fastapi.testclient import TestClient
+    import main
+
+    # No `with`: the app's startup hooks (index loading, Realtime pool) aren't needed for /twiml
+    client = TestClient(main.app)
+    response = client.get("/twiml")
+    assert response.status_code == 200
+    assert b"<Connect>" in response.content
+    cached = client.get("/twiml", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == response.headers["etag"]
+    assert client.get("/twiml", headers={"If-None-Match": '"stale"'}).status_code == 200
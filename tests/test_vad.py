@@ -0,0 +1,63 @@
+import base64
+
+import numpy as np
+
+from bench.frames import FRAME_BYTES, encode_ulaw
+from vad import LocalVAD, decode_ulaw, frame_features
+
+SAMPLE_RATE = 8000
+SILENCE = b"\xff" * FRAME_BYTES
+
+
+def tone(level_db, frames=1, frequency=200):
+    """A sine at level_db dBFS (RMS), as `frames` 20 ms u-law frames in a 2-D array."""
+    n = np.arange(frames * FRAME_BYTES) / SAMPLE_RATE
+    samples = np.sqrt(2) * 32768 * 10 ** (level_db / 20) * np.sin(2 * np.pi * frequency * n)
+    return np.frombuffer(encode_ulaw(samples), dtype=np.uint8).reshape(frames, FRAME_BYTES)
+
+
+def hiss(level_db, frames=1):
+    samples = np.random.default_rng(3).normal(0, 32768 * 10 ** (level_db / 20), frames * FRAME_BYTES)
+    return np.frombuffer(encode_ulaw(samples), dtype=np.uint8).reshape(frames, FRAME_BYTES)
+
+
+def test_ulaw_silence_decodes_to_zero():
+    assert not decode_ulaw(SILENCE).any()
+    assert decode_ulaw(b"\x00").tolist() == [-32124]
+    assert decode_ulaw(b"\x80").tolist() == [32124]
+
+
+def test_frame_features_measure_level_and_zero_crossings():
+    energy_db, zcr = frame_features(np.vstack([np.frombuffer(SILENCE, dtype=np.uint8), tone(-20)[0], hiss(-20)[0]]))
+    assert energy_db[0] < -80
+    assert abs(energy_db[1] - -20) < 1.0
+    # A 200 Hz tone crosses zero 400 times a second, 5% of 8 kHz samples; white noise about half
+    assert zcr[1] < 0.1 and zcr[2] > 0.4
+
+
+def test_speech_starts_after_start_ms_and_stops_after_stop_ms():
+    vad = LocalVAD(threshold_db=-30, start_ms=60, stop_ms=100)
+    quiet = np.frombuffer(SILENCE * 10, dtype=np.uint8).reshape(10, FRAME_BYTES)
+    frames = np.vstack([quiet, tone(-20, frames=10), quiet])
+    # Third voiced frame (60 ms) starts speech, fifth quiet frame (100 ms) stops it
+    assert vad.detect(frames) == [(12, "start"), (24, "stop")]
+    assert not vad.speaking
+
+
+def test_quiet_speech_and_hiss_do_not_trigger():
+    vad = LocalVAD(threshold_db=-30)
+    assert vad.detect(tone(-40, frames=20)) == []
+    assert vad.detect(hiss(-20, frames=20)) == []
+
+
+def test_hysteresis_keeps_speech_going_through_a_dip():
+    vad = LocalVAD(threshold_db=-30, hysteresis_db=6, start_ms=20, stop_ms=60)
+    # -33 dB is under the start threshold but within the hysteresis, so it isn't quiet
+    assert vad.detect(np.vstack([tone(-20), tone(-33, frames=10)])) == [(0, "start")]
+    assert vad.speaking
+
+
+def test_process_takes_base64_payloads():
+    vad = LocalVAD(threshold_db=-30, start_ms=20)
+    assert vad.process(base64.b64encode(SILENCE).decode()) is None
+    assert vad.process(base64.b64encode(tone(-20)[0].tobytes()).decode()) == "start"
@@ -0,0 +1,30 @@
+import time
+import logging
+
+
+class Transcript:
+    """Append-only list of (role, timestamp, text) turns; the full text is only built when asked for."""
+
+    __slots__ = ("call_sid", "turns")
+
+    def __init__(self, call_sid=None):
+        self.call_sid = call_sid
+        self.turns = []
+
+    def __len__(self):
+        return len(self.turns)
+
+    def add(self, role, text):
+        """Record one turn and log just that turn."""
+        self.turns.append((role, time.time(), text))
+        logging.info('%s (%s): %s', role, self.call_sid, text)
+
+    def messages(self):
+        """(role, text) pairs, e.g. for post-call extraction."""
+        return [(role, text) for role, _, text in self.turns]
+
+    def render(self):
+        return "\n".join(f"{role}: {text}" for role, _, text in self.turns)
+
+    def __str__(self):
+        return self.render()
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from twilio.twiml.voice_response import VoiceResponse, Connect
+
+
+# Function to turn the public HOSTNAME (with or without a scheme) into the media stream URL
+def stream_url_for(hostname):
+    """wss://<host>/media-stream for an `https://host`, `http://host` or bare `host` value."""
+    host = hostname or ""
+    for scheme in ("https://", "http://", "wss://", "ws://"):
+        if host.startswith(scheme):
+            host = host[len(scheme):]
+            break
+    return f"wss://{host.rstrip('/')}/media-stream"
+
+
+# Function to render one TwiML document: greeting, a short pause, then connect the call to the media stream
+def render_twiml(stream_url, greeting, connecting_message, voice):
+    response = VoiceResponse()
+    response.say(greeting, voice=voice)
+    response.pause(length=1)
+    if connecting_message:
+        response.say(connecting_message, voice=voice)
+    connect = Connect()
+    connect.stream(url=stream_url)
+    response.append(connect)
+    return str(response).encode("utf-8")
+
+
+# Function to check an If-None-Match header against an ETag
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class TwimlCache:
+    """Rendered TwiML bytes and ETags per greeting variant.
+
+    The default greeting, voice and stream URL are read once at startup, so only a change to the
+    variants re-renders. Variants come from an optional JSON file mapping a name (tenant, campaign,
+    language...) to its greeting text; the file is re-read when its modification time changes,
+    checked at most every check_interval seconds.
+    """
+
+    def __init__(self, stream_url, greeting, connecting_message, voice, variants_path=None, check_interval=5.0):
+        self.variants_path = variants_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._documents = {}
+        self._variants = {}
+        self._variants_mtime = None
+        self._checked = 0.0
+        self.renders = 0
+        self._config = {"stream_url": stream_url, "greeting": greeting, "connecting_message": connecting_message, "voice": voice}
+
+    def has_variant(self, variant):
+        self._reload_variants()
+        return variant in self._variants
+
+    def get(self, variant=None):
+        """Return (body, etag) for a variant; unknown variants get the default greeting."""
+        self._reload_variants()
+        with self._lock:
+            if variant not in self._variants:
+                variant = None
+            document = self._documents.get(variant)
+            if document is None:
+                greeting = self._variants[variant] if variant is not None else self._config["greeting"]
+                body = render_twiml(self._config["stream_url"], greeting, self._config["connecting_message"], self._config["voice"])
+                document = (body, '"%s"' % hashlib.sha1(body).hexdigest())
+                self._documents[variant] = document
+                self.renders += 1
+            return document
+
+    def stats(self):
+        with self._lock:
+            return {"cached": len(self._documents), "variants": len(self._variants), "renders": self.renders}
+
+    def _reload_variants(self):
+        if not self.variants_path:
+            return
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.path.getmtime(self.variants_path)
+        except OSError:
+            mtime = None
+        if mtime == self._variants_mtime:
+            return
+
+        variants = {}
+        if mtime is not None:
+            try:
+                with open(self.variants_path, "r") as file:
+                    variants = {str(name): str(text) for name, text in json.load(file).items()}
+            except (OSError, ValueError, AttributeError) as e:
+                logging.error("Error loading greeting variants from %s: %s", self.variants_path, str(e))
+                return
+        with self._lock:
+            self._variants = variants
+            self._variants_mtime = mtime
+            self._documents.clear()
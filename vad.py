@@ -0,0 +1,97 @@
+import base64
+import numpy as np
+
+FRAME_MS = 20
+
+
+# Function to build the G.711 u-law -> 16-bit PCM lookup table
+def _ulaw_table():
+    codes = ~np.arange(256, dtype=np.uint8)
+    exponent = (codes >> 4) & 0x07
+    mantissa = (codes & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+ULAW_TO_PCM = _ulaw_table()
+
+
+# Function to decode raw u-law bytes with a single table lookup
+def decode_ulaw(data):
+    return ULAW_TO_PCM[np.frombuffer(data, dtype=np.uint8)]
+
+
+# Function to compute per-frame energy and zero-crossing rate for a batch of frames
+def frame_features(frames):
+    """frames is a 2-D uint8 array of u-law samples, one frame per row; returns (energy in dBFS, zero-crossing rate)."""
+    pcm = ULAW_TO_PCM[frames].astype(np.float32)
+    rms = np.sqrt(np.mean(pcm * pcm, axis=1))
+    energy_db = 20 * np.log10(np.maximum(rms, 1.0) / 32768.0)
+    negative = np.signbit(pcm)
+    zcr = np.mean(negative[:, 1:] != negative[:, :-1], axis=1)
+    return energy_db, zcr
+
+
+class LocalVAD:
+    """Energy/zero-crossing voice activity detector with hysteresis, fed one 20 ms Twilio frame at a time.
+
+    A frame is voiced when it is at least threshold_db loud (or noise_margin_db above the tracked
+    noise floor, whichever is higher) and its zero-crossing rate is at most zcr_max, which rejects
+    hiss and clicks. Speech starts after start_ms of consecutive voiced frames and stops after
+    stop_ms of frames hysteresis_db below the start threshold.
+    """
+
+    def __init__(self, threshold_db=-30.0, hysteresis_db=6.0, zcr_max=0.4, start_ms=60, stop_ms=300, noise_margin_db=10.0):
+        self.threshold_db = threshold_db
+        self.hysteresis_db = hysteresis_db
+        self.zcr_max = zcr_max
+        self.start_frames = max(1, int(start_ms // FRAME_MS))
+        self.stop_frames = max(1, int(stop_ms // FRAME_MS))
+        self.noise_margin_db = noise_margin_db
+        self.noise_db = None
+        self.speaking = False
+        self._run = 0
+
+    def process(self, payload):
+        """Feed one base64 u-law payload; returns "start", "stop" or None."""
+        frame = np.frombuffer(base64.b64decode(payload), dtype=np.uint8).reshape(1, -1)
+        energy_db, zcr = frame_features(frame)
+        return self.update(float(energy_db[0]), float(zcr[0]))
+
+    def detect(self, frames):
+        """Run over a 2-D array of frames (features computed in one pass); returns [(frame index, event)]."""
+        energy_db, zcr = frame_features(frames)
+        events = []
+        for index in range(len(energy_db)):
+            event = self.update(float(energy_db[index]), float(zcr[index]))
+            if event:
+                events.append((index, event))
+        return events
+
+    def threshold(self):
+        if self.noise_db is None:
+            return self.threshold_db
+        return max(self.threshold_db, self.noise_db + self.noise_margin_db)
+
+    def update(self, energy_db, zcr):
+        threshold = self.threshold()
+        if not self.speaking:
+            voiced = energy_db >= threshold and zcr <= self.zcr_max
+            if voiced:
+                self._run += 1
+            else:
+                self._run = 0
+                # Follow the line noise slowly so a noisy call doesn't trigger on its own background
+                self.noise_db = energy_db if self.noise_db is None else self.noise_db + 0.05 * (energy_db - self.noise_db)
+            if self._run >= self.start_frames:
+                self.speaking = True
+                self._run = 0
+                return "start"
+        else:
+            quiet = energy_db < threshold - self.hysteresis_db
+            self._run = self._run + 1 if quiet else 0
+            if self._run >= self.stop_frames:
+                self.speaking = False
+                self._run = 0
+                return "stop"
+        return None
@@ -1,29 +1,33 @@
+import os
 import sqlite3
 
+from schema import require_current
+from export_calls import iter_calls
+
 def view_database():
-    conn = sqlite3.connect('callbot.db')
-    c = conn.cursor()
+    conn = sqlite3.connect(f"file:{os.getenv('CALL_DB_PATH', 'callbot.db')}?mode=ro", uri=True)
+    require_current(conn)
 
-    # Retrieve data from the call_details table
-    c.execute('SELECT * FROM call_details')
-    rows = c.fetchall()
+    # Page through the call_details table; use export_calls.py for CSV or JSONL
+    found = False
+    for row in iter_calls(conn):
+        found = True
+        print(f"ID: {row[0]}")
+        print(f"Call SID: {row[1]}")
+        print(f"Created At: {row[2]}")
+        print(f"Name: {row[3]}")
+        print(f"Contact Number: {row[4]}")
+        print(f"Interested in Home Loan: {row[5]}")
+        print(f"Time Period of Loan: {row[6]}")
+        print(f"Location of Home: {row[7]}")
+        print(f"Any Other Home Loan: {row[8]}")
+        print(f"Transcript: {row[9]}")
+        print("-" * 40)
 
-    if not rows:
+    if not found:
         print("No data found in the call_details table.")
-    else:
-        # Print the data
-        for row in rows:
-            print(f"ID: {row[0]}")
-            print(f"Name: {row[1]}")
-            print(f"Contact Number: {row[2]}")
-            print(f"Interested in Home Loan: {row[3]}")
-            print(f"Time Period of Loan: {row[4]}")
-            print(f"Location of Home: {row[5]}")
-            print(f"Any Other Home Loan: {row[6]}")
-            print(f"Transcript: {row[7]}")
-            print("-" * 40)
 
     conn.close()
 
 if __name__ == "__main__":
-    view_database()
\ No newline at end of file
+    view_database()